@@ -1,22 +1,32 @@
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 import logging
 import sys
 import re
 import shutil
 from datetime import datetime, timedelta, timezone
+from enum import Enum
 
 import typer
 from rich.console import Console
 from rich.logging import RichHandler
 
 from .main import analyze
+from .git.repo import CLONE_FILTERS
+from .github.api import FORK_SORTS, MAX_COMPARE_COMMITS
+from .github.branch_filter import BranchFilter, DEFAULT_EXCLUDED_BRANCHES
+from .report.generator import DEFAULT_API_ONLY_MAX_AHEAD
 from .config import _get_config_path, setup_config_interactive, _save_config
 
 app = typer.Typer()
 console = Console()
 logger = logging.getLogger(__name__)
 
+# Choices for --fork-sort and --clone-filter, so typer rejects anything else
+# before any work is done
+ForkSort = Enum("ForkSort", {sort: sort for sort in FORK_SORTS}, type=str)
+CloneFilter = Enum("CloneFilter", {f: f for f in CLONE_FILTERS}, type=str)
+
 
 def parse_time_duration(duration: str) -> timedelta:
     """Parse a human-readable time duration into a timedelta.
@@ -141,11 +151,75 @@ def main(
         "--max-forks",
         help="Maximum number of forks to analyze (default: no limit)",
     ),
+    fork_sort: ForkSort = typer.Option(
+        ForkSort.newest,
+        "--fork-sort",
+        help="Order in which forks are listed and --max-forks applied: newest, oldest, "
+        "stargazers, updated, or triage (ranks forks by how likely they are to carry "
+        "work of their own; updated and triage have to list every fork first)",
+    ),
+    fork_depth: int = typer.Option(
+        1,
+        "--fork-depth",
+        min=1,
+        help="How far down the fork network to look (1 = direct forks only, "
+        "2 = also forks of forks, ...)",
+    ),
     max_branches_per_fork: Optional[int] = typer.Option(
         3,
         "--max-branches-per-fork",
         help="Maximum diverged branches to keep per fork, by commits ahead "
-        "(every branch is still compared; set to 0 to disable the cap)",
+        "(every branch passing the branch filters is still compared; set to 0 to disable the cap)",
+    ),
+    include_branches: Optional[List[str]] = typer.Option(
+        None,
+        "--include-branch",
+        help="Only compare fork branches whose names match this glob (repeatable, "
+        "e.g. 'feature/*')",
+    ),
+    exclude_branches: Optional[List[str]] = typer.Option(
+        None,
+        "--exclude-branch",
+        help="Don't compare fork branches whose names match this glob (repeatable). "
+        f"Replaces the default: {', '.join(DEFAULT_EXCLUDED_BRANCHES)}. "
+        "Pass --exclude-branch '' to compare every branch",
+    ),
+    branches_since: Optional[datetime] = typer.Option(
+        None,
+        "--branches-since",
+        formats=["%Y-%m-%d"],
+        help="Don't compare fork branches whose head commit is older than this date "
+        "(YYYY-MM-DD)",
+    ),
+    api_only_max_ahead: int = typer.Option(
+        DEFAULT_API_ONLY_MAX_AHEAD,
+        "--api-only-max-ahead",
+        min=0,
+        max=MAX_COMPARE_COMMITS,
+        help="Analyze forks at most this many commits ahead from the GitHub API "
+        f"instead of fetching them with git (0 = always fetch, at most {MAX_COMPARE_COMMITS})",
+    ),
+    fetch_pull_refs: bool = typer.Option(
+        False,
+        "--fetch-pull-refs",
+        help="Fetch the heads of all the repository's pull requests in one go, so "
+        "fork branches with pull requests are compared and analyzed without "
+        "fetching each fork",
+    ),
+    clone_filter: Optional[CloneFilter] = typer.Option(
+        None,
+        "--clone-filter",
+        help="Cache the repository as a partial clone: blob:none fetches file contents "
+        "only when a diff needs them, tree:0 also defers directory trees (best when "
+        "most forks are compared rather than diffed). Applies to new clones only",
+    ),
+    graphql: bool = typer.Option(
+        False,
+        "--graphql",
+        help="Discover forks, branches and pull requests with batched GitHub GraphQL "
+        "queries (uses far fewer API requests on large fork networks). Comparisons come "
+        "with the fork listing, so the comparison cache, fork store and pull request "
+        "index aren't read, but the first two are updated",
     ),
     output_formats: Optional[str] = typer.Option(
         None,
@@ -206,6 +280,20 @@ def main(
                 logger.error(f"Invalid active-within format: {e}")
                 sys.exit(1)
 
+        branch_filter = BranchFilter(
+            include=tuple(include_branches or ()),
+            exclude=(
+                tuple(p for p in exclude_branches if p)
+                if exclude_branches is not None
+                else DEFAULT_EXCLUDED_BRANCHES
+            ),
+            since=(
+                branches_since.replace(tzinfo=timezone.utc)
+                if branches_since is not None
+                else None
+            ),
+        )
+
         analyze(
             repo_url=repo_url,
             output=output,
@@ -219,7 +307,14 @@ def main(
             verbose=verbose,
             clear_cache=clear_cache,
             max_forks=max_forks,
+            fork_sort=fork_sort.value,
+            fork_depth=fork_depth,
+            branch_filter=branch_filter,
+            api_only_max_ahead=api_only_max_ahead,
+            fetch_pull_refs=fetch_pull_refs,
+            clone_filter=clone_filter.value if clone_filter is not None else None,
             max_branches_per_fork=max_branches_per_fork or None,
+            use_graphql=graphql,
             output_formats=output_formats,
             activity_threshold=activity_threshold,
             force_fetch=force_fetch,
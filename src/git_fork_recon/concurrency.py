@@ -0,0 +1,94 @@
+"""Bounded concurrency helpers shared by fork discovery and report generation."""
+
+from typing import (
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+)
+import asyncio
+import logging
+import statistics
+import time
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# How many of the slowest units to name in the timing summary
+SLOWEST_REPORTED = 3
+
+
+async def aiter_items(items: Iterable[T]) -> AsyncIterator[T]:
+    """Wrap a plain iterable as an async iterator."""
+    for item in items:
+        yield item
+
+
+async def bounded_as_completed(
+    items: Union[Iterable[T], AsyncIterable[T]],
+    worker: Callable[[T], Awaitable[R]],
+    limit: int,
+    describe: Callable[[T], str] = str,
+    unit: str = "items",
+) -> AsyncIterator[Tuple[T, R]]:
+    """Run `worker` over `items` with up to `limit` in flight, yielding as each finishes.
+
+    Unlike gathering fixed-size batches, a new item is started as soon as any
+    running one finishes, so one slow item doesn't hold up the others. `items`
+    may be an async iterable (eg. a paginated listing), which is only advanced
+    when there is a free slot.
+
+    Yields (item, result) pairs in completion order. The time taken by each
+    item is logged at debug level, and a summary naming the slowest items is
+    logged at the end. If a worker raises, the remaining work is cancelled and
+    the exception propagates.
+    """
+    source = items.__aiter__() if isinstance(items, AsyncIterable) else aiter_items(items)
+    pending: Dict["asyncio.Future[R]", Tuple[T, float]] = {}
+    timings: List[Tuple[float, str]] = []
+    exhausted = False
+    started_at = time.monotonic()
+
+    try:
+        while True:
+            while not exhausted and len(pending) < max(limit, 1):
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(worker(item))] = (item, time.monotonic())
+            if not pending:
+                break
+
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                item, item_started = pending.pop(future)
+                elapsed = time.monotonic() - item_started
+                timings.append((elapsed, describe(item)))
+                logger.debug(f"{describe(item)} took {elapsed:.1f}s")
+                yield item, future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+        _log_timings(timings, time.monotonic() - started_at, unit)
+
+
+def _log_timings(timings: List[Tuple[float, str]], total: float, unit: str) -> None:
+    if not timings:
+        return
+    slowest = sorted(timings, reverse=True)[:SLOWEST_REPORTED]
+    logger.info(
+        f"Processed {len(timings)} {unit} in {total:.1f}s "
+        f"(median {statistics.median(t for t, _ in timings):.1f}s, slowest: "
+        + ", ".join(f"{label} {t:.1f}s" for t, label in slowest)
+        + ")"
+    )
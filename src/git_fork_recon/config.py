@@ -24,6 +24,17 @@ console = Console()
 
 class Config(BaseModel):
     github_token: str = Field(..., description="GitHub API token")
+    github_tokens: list[str] = Field(
+        default_factory=list,
+        description="Additional GitHub API tokens, pooled with github_token to spread rate limits",
+    )
+    github_api_url: str = Field(
+        default="https://api.github.com",
+        description=(
+            "GitHub API base URL (eg. https://HOST/api/v3 for GitHub Enterprise Server, "
+            "or a fake API for benchmarking)"
+        ),
+    )
     openai_api_key: str = Field(..., description="OpenAI-compatible API key")
     api_key_source: str = Field(
         ..., description="Environment variable that provided the API key"
@@ -40,6 +51,14 @@ class Config(BaseModel):
         default=Path(user_cache_dir("git-fork-recon/reports")),
         description="Directory for caching report data",
     )
+    cache_api: Path = Field(
+        default=Path(user_cache_dir("git-fork-recon/api")),
+        description="Directory for caching GitHub API responses",
+    )
+    cache_http_max_mb: int = Field(
+        default=256,
+        description="Maximum size of the on-disk GitHub HTTP response cache, in MB",
+    )
     model: str = Field(
         default="deepseek/deepseek-chat-v3-0324:free",
         description="Model to use",
@@ -384,11 +403,18 @@ model = {_escape_toml_string(model)}
     toml_content += f"""
 [github]
 token = {_escape_toml_string(github_token)}
+# Additional tokens to pool with `token`, for large fork networks (each token has its own rate limit)
+# tokens = ["$GITHUB_TOKEN_2", "$GITHUB_TOKEN_3"]
+# API base URL, eg. for GitHub Enterprise or a local fake API (git-fork-recon-fake-github)
+# api_url = "https://api.github.com"
 
 [cache]
 # Supports $HOME and ~ expansion
 repo = {_escape_toml_string(cache_repo)}
 report = {_escape_toml_string(cache_report)}
+# GitHub API response cache (default: "api" alongside the repo cache)
+# api = "$HOME/.cache/git-fork-recon/api"
+# http_max_mb = 256
 
 # =============================================================================
 # Server Configuration (for git-fork-recon-server)
@@ -448,6 +474,11 @@ def load_config(
     openai_base_url = _resolve_env_var(endpoint.get("base_url", "https://openrouter.ai/api/v1"))
     openai_api_key = _resolve_env_var(endpoint.get("api_key", ""))
     github_token = _resolve_env_var(github.get("token", ""))
+    github_tokens_value = github.get("tokens", [])
+    if isinstance(github_tokens_value, str):
+        github_tokens_value = github_tokens_value.split(",")
+    github_tokens = [_resolve_env_var(t.strip()) for t in github_tokens_value if t.strip()]
+    github_api_url = _resolve_env_var(github.get("api_url", "https://api.github.com"))
     
     # Handle API key source
     api_key_source = "manual"
@@ -500,6 +531,14 @@ def load_config(
     
     cache_repo = Path(cache_repo_expanded)
     cache_report = Path(cache_report_expanded)
+
+    # The API response cache defaults to a sibling of the repository cache
+    cache_api_str = cache.get("api")
+    if cache_api_str:
+        cache_api = Path(_expand_path(_resolve_env_var(str(cache_api_str))))
+    else:
+        cache_api = cache_repo.parent / "api"
+    cache_http_max_mb = int(cache.get("http_max_mb", 256))
     
     # Get model and context_length
     model = endpoint.get("model", "deepseek/deepseek-chat-v3-0324:free")
@@ -572,12 +611,22 @@ def load_config(
         except ValueError:
             logger.warning(f"Invalid PARALLEL_TASKS value: {parallel_tasks_env}, using default: {server_parallel_tasks}")
     
+    github_api_url_env = os.getenv("GITHUB_API_URL")
+    if github_api_url_env:
+        github_api_url = github_api_url_env
+
+    github_tokens_env = os.getenv("GITHUB_TOKENS")
+    if github_tokens_env:
+        github_tokens = [t.strip() for t in github_tokens_env.split(",") if t.strip()]
+
     disable_ui_env = os.getenv("DISABLE_UI")
     if disable_ui_env:
         disable_ui_env = disable_ui_env.strip().lower()
         server_disable_ui = disable_ui_env in ("1", "true", "yes")
     
     # Validate required fields
+    if not github_token and github_tokens:
+        github_token = github_tokens[0]
     if not github_token:
         logger.error("GITHUB_TOKEN is required in config or environment")
         sys.exit(1)
@@ -588,11 +637,15 @@ def load_config(
     return Config.model_validate(
         {
             "github_token": github_token,
+            "github_tokens": github_tokens,
+            "github_api_url": github_api_url,
             "openai_api_key": openai_api_key,
             "api_key_source": api_key_source,
             "openai_base_url": openai_base_url,
             "cache_repo": cache_repo,
             "cache_report": cache_report,
+            "cache_api": cache_api,
+            "cache_http_max_mb": cache_http_max_mb,
             "model": model,
             "context_length": context_length,
             "server_allowed_models": server_allowed_models,
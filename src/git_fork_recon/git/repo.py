@@ -1,10 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import json
 import logging
+import os
 from pathlib import Path
+import re
 import shutil
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+import uuid
 
-from git import Repo, Remote
+from git import Commit, Repo, Remote
 from git.exc import GitCommandError
 
 from ..github.api import RepoInfo, ForkInfo
@@ -12,8 +23,59 @@ from ..config import Config
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a remote to list its branches
+LS_REMOTE_TIMEOUT = 30
 
-@dataclass
+# Where the heads of the parent's pull requests (refs/pull/N/head) are fetched to
+PULL_REFS = "refs/fork-recon/pull"
+
+# Partial clone filters accepted for the repository cache: blob:none leaves out
+# file contents until a diff needs them, tree:0 also leaves out directory trees
+# (enough for comparing commits, but every diff then fetches trees on demand)
+CLONE_FILTERS = ("blob:none", "tree:0")
+
+# Where fork branches are fetched to, as FORK_REFS/<owner>/<branch>, and the
+# file in the git directory recording the clone URL they came from
+FORK_REFS = "refs/fork-recon/forks"
+FORK_INDEX = "fork-recon-forks.json"
+
+# Forks fetched at once, overall and from any one host
+FETCH_WORKERS = 8
+FETCH_PER_HOST = 4
+
+# Final progress line of a fetch, eg. "Receiving objects: 100% (12/12), 4.20 KiB | ..."
+_RECEIVED_RE = re.compile(
+    r"(?:Receiving|Unpacking) objects: 100% \(\d+/\d+\), ([\d.]+) (bytes|KiB|MiB|GiB)"
+)
+_UNITS = {"bytes": 1, "KiB": 1024, "MiB": 1024**2, "GiB": 1024**3}
+
+
+def _received_bytes(progress: str) -> Optional[int]:
+    """Bytes received according to git fetch's progress output, if it says."""
+    matches = _RECEIVED_RE.findall(progress)
+    if not matches:
+        return None
+    size, unit = matches[-1]
+    return int(float(size) * _UNITS[unit])
+
+
+def _normalize_url(url: str) -> str:
+    """Strip trailing slashes and .git, for comparing clone URLs."""
+    url = url.rstrip("/")
+    return url[:-4] if url.endswith(".git") else url
+
+
+def _format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "size unknown"
+    for unit in ("bytes", "KiB", "MiB"):
+        if size < 1024 or unit == "MiB":
+            break
+        size /= 1024
+    return f"{size:.0f} {unit}" if unit == "bytes" else f"{size:.1f} {unit}"
+
+
+@dataclass(frozen=True, slots=True)
 class CommitInfo:
     """Information about a commit."""
 
@@ -21,28 +83,131 @@ class CommitInfo:
     message: str
     author: str
     date: str
-    files_changed: List[str]
+    files_changed: Tuple[str, ...]
     insertions: int
     deletions: int
 
+    @classmethod
+    def from_git(cls, commit: Commit) -> "CommitInfo":
+        """Build from a GitPython commit.
+
+        Authors and file paths repeat across the commits of a fork network, so
+        they are interned to share one string each.
+        """
+        stats = commit.stats
+        return cls(
+            hash=commit.hexsha,
+            message=commit.message.strip(),
+            author=sys.intern(f"{commit.author.name} <{commit.author.email}>"),
+            date=commit.committed_datetime.isoformat(),
+            files_changed=tuple(sys.intern(str(path)) for path in stats.files),
+            insertions=stats.total["insertions"],
+            deletions=stats.total["deletions"],
+        )
+
+    @classmethod
+    def from_github(cls, commit: Dict[str, Any]) -> "CommitInfo":
+        """Build from a commit as returned by the GitHub commits API.
+
+        Only `sha`, `commit` and `files` are needed, so a commit listed in a
+        compare payload can be used too, given the files it changed.
+        """
+        author = commit["commit"]["author"]
+        committed_at = commit["commit"]["committer"]["date"].replace("Z", "+00:00")
+        files = commit.get("files") or []
+        # The commits API lists at most 300 files, but its stats cover them all
+        stats = commit.get("stats") or {
+            "additions": sum(f.get("additions", 0) for f in files),
+            "deletions": sum(f.get("deletions", 0) for f in files),
+        }
+        return cls(
+            hash=commit["sha"],
+            message=commit["commit"]["message"].strip(),
+            author=sys.intern(f"{author['name']} <{author['email']}>"),
+            date=datetime.fromisoformat(committed_at).isoformat(),
+            files_changed=tuple(sys.intern(f["filename"]) for f in files),
+            insertions=stats["additions"],
+            deletions=stats["deletions"],
+        )
+
+
+@dataclass
+class FetchStats:
+    """How fetching one fork went."""
+
+    # The fork's owner
+    fork: str
+    seconds: float
+    # As reported by git; None if nothing was received or git didn't say
+    bytes_received: Optional[int]
+    error: Optional[str] = None
+
 
 class GitRepo:
-    def __init__(self, repo_info: RepoInfo, config: Config, force_fetch: bool = False):
+    def __init__(
+        self,
+        repo_info: RepoInfo,
+        config: Config,
+        force_fetch: bool = False,
+        fetch_pull_refs: bool = False,
+        clone_filter: Optional[str] = None,
+    ):
+        if clone_filter is not None and clone_filter not in CLONE_FILTERS:
+            raise ValueError(
+                f"Unknown clone filter {clone_filter!r}, expected one of: {', '.join(CLONE_FILTERS)}"
+            )
         self.repo_info = repo_info
         self.cache_dir = config.cache_repo
         self.repo_dir = self.cache_dir / repo_info.owner / repo_info.name
         self.force_fetch = force_fetch
-        self._ensure_repo()
+        # Why each fork that failed in fetch_forks() failed, by owner, so the
+        # analysis of that fork doesn't try again
+        self.fetch_errors: Dict[str, str] = {}
+        self._ensure_repo(clone_filter)
+        # The filter the cache was actually cloned with, which pull request
+        # heads are fetched with too; an existing clone keeps its filter
+        self.clone_filter = self._partial_clone_filter()
+        # Forks are fetched by URL into FORK_REFS rather than as remotes, which
+        # would each add a section to .git/config. The clone URL each fork's
+        # refs were fetched from is kept in this index, by owner.
+        self.fork_index_path = Path(self.repo.git_dir) / FORK_INDEX
+        self.fork_index = self._load_fork_index()
+        self._migrate_fork_remotes()
+        if fetch_pull_refs:
+            self.fetch_pull_heads()
+
+    def _ensure_repo(self, clone_filter: Optional[str] = None) -> None:
+        """Ensure the repository is cloned and up to date.
 
-    def _ensure_repo(self) -> None:
-        """Ensure the repository is cloned and up to date."""
+        With `clone_filter`, a new clone is a partial clone: objects left out by
+        the filter are fetched from the remote on demand, when a diff or commit
+        stats need them. Nothing is checked out, since only refs are read.
+        """
         if not self.repo_dir.exists():
-            logger.info(f"Cloning {self.repo_info.clone_url}")
             self.cache_dir.mkdir(parents=True, exist_ok=True)
-            self.repo = Repo.clone_from(self.repo_info.clone_url, self.repo_dir)
+            started = time.monotonic()
+            if clone_filter is not None:
+                logger.info(f"Cloning {self.repo_info.clone_url} (--filter={clone_filter})")
+                self.repo = Repo.clone_from(
+                    self.repo_info.clone_url,
+                    self.repo_dir,
+                    multi_options=[f"--filter={clone_filter}", "--no-checkout"],
+                )
+            else:
+                logger.info(f"Cloning {self.repo_info.clone_url}")
+                self.repo = Repo.clone_from(self.repo_info.clone_url, self.repo_dir)
+            logger.info(
+                f"Cloned in {time.monotonic() - started:.1f}s, "
+                f"{_format_bytes(self._object_store_size())} of objects on disk"
+            )
         else:
             logger.info(f"Using existing clone at {self.repo_dir}")
             self.repo = Repo(self.repo_dir)
+            if clone_filter is not None and self._partial_clone_filter() is None:
+                logger.info(
+                    "The cached clone is a full clone, so --clone-filter has no effect "
+                    "until it is cleared (--clear-cache)"
+                )
             if self.force_fetch:
                 try:
                     self.repo.remotes.origin.fetch()
@@ -51,107 +216,484 @@ class GitRepo:
             else:
                 logger.info("Cached repository found, skipping fetch")
 
-    def add_fork(self, fork: ForkInfo) -> None:
-        """Add a fork as a remote and fetch its contents."""
-        remote_name = f"fork-{fork.repo_info.owner}"
+    def _load_fork_index(self) -> Dict[str, str]:
+        try:
+            return json.loads(self.fork_index_path.read_text())
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            logger.warning(f"Ignoring unreadable fork index {self.fork_index_path}: {e}")
+            return {}
+
+    def _save_fork_index(self) -> None:
+        tmp_path = self.fork_index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self.fork_index, sort_keys=True))
+        tmp_path.replace(self.fork_index_path)
 
+    def _pack_refs(self) -> None:
+        """Move loose refs into packed-refs, so lookups don't scale with the number of forks."""
         try:
-            # Check if remote already exists
-            remote = self.repo.remote(remote_name)
-            logger.debug(
-                f"Remote {remote_name} already exists, checking if URL matches"
-            )
-            logger.debug(f"Remote URL: {remote.url}, Fork URL: {fork.repo_info.clone_url}")
+            self._git("pack-refs", "--all")
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"git pack-refs failed: {e.stderr}")
 
-            # Normalize URLs for comparison (strip trailing .git and trailing slashes)
-            def normalize_url(url: str) -> str:
-                url = url.rstrip("/")
-                if url.endswith(".git"):
-                    url = url[:-4]
-                return url
+    def _delete_refs(self, prefix: str) -> None:
+        commands = self._git("for-each-ref", "--format=delete %(refname)", prefix)
+        if commands:
+            self._git("update-ref", "--stdin", input=commands)
 
-            remote_url_normalized = normalize_url(str(remote.url))
-            fork_url_normalized = normalize_url(fork.repo_info.clone_url)
+    def _migrate_fork_remotes(self) -> None:
+        """Move the fork-<owner> remotes made by earlier versions into FORK_REFS."""
+        remotes = {
+            remote.name: remote.url
+            for remote in self.repo.remotes
+            if remote.name.startswith("fork-")
+        }
+        if not remotes:
+            return
+        commands = []
+        for remote_name, url in remotes.items():
+            owner = remote_name.removeprefix("fork-")
+            prefix = f"refs/remotes/{remote_name}/"
+            refs = self._git("for-each-ref", "--format=%(objectname) %(refname)", prefix)
+            for line in refs.splitlines():
+                sha, ref = line.split(" ", 1)
+                commands.append(f"update {FORK_REFS}/{owner}/{ref.removeprefix(prefix)} {sha}")
+                commands.append(f"delete {ref}")
+            self.fork_index[owner] = url
+        if commands:
+            self._git("update-ref", "--stdin", input="\n".join(commands) + "\n")
+        for remote_name in remotes:
+            self._git("config", "--remove-section", f"remote.{remote_name}")
+        self._save_fork_index()
+        self._pack_refs()
+        logger.info(f"Moved {len(remotes)} fork remotes into {FORK_REFS}")
 
-            # Check if the remote URL matches
-            if remote_url_normalized == fork_url_normalized or remote.url == fork.repo_info.clone_url:
-                logger.info(
-                    f"Fork {fork.repo_info.owner}/{fork.repo_info.name} already cached as remote {remote_name}, skipping fetch"
-                )
-                if self.force_fetch:
-                    logger.info(f"Force fetching remote {remote_name}")
-                    try:
-                        remote.fetch()
-                        return
-                    except GitCommandError as e:
-                        logger.warning(
-                            f"Failed to fetch existing remote {remote_name}: {e}"
-                        )
-                else:
-                    return
+    def _is_new_fork(self, fork: ForkInfo) -> bool:
+        """Whether a fork hasn't been fetched from its clone URL before.
+
+        A fork previously fetched from a different URL (eg. since renamed) has
+        its refs dropped, so it is fetched afresh.
+        """
+        owner, clone_url = fork.repo_info.owner, fork.repo_info.clone_url
+        known_url = self.fork_index.get(owner)
+        if known_url is None:
+            return True
+        if _normalize_url(known_url) == _normalize_url(clone_url):
+            return False
+        logger.info(
+            f"Fork {owner} was fetched from {known_url} but is now at {clone_url}, "
+            f"dropping its refs"
+        )
+        self._delete_refs(f"{FORK_REFS}/{owner}/")
+        del self.fork_index[owner]
+        return True
+
+    def _ref_exists(self, ref: str) -> bool:
+        try:
+            self._git("show-ref", "--verify", "--quiet", ref)
+        except subprocess.CalledProcessError:
+            return False
+        return True
 
-            # If URL doesn't match or fetch failed, remove the remote
+    def _needs_fetch(self, fork: ForkInfo, new: bool) -> bool:
+        """Whether the fork's branch has to be fetched.
+
+        It does for a new fork, with force_fetch, if the branch hasn't been
+        fetched before, or if its head commit isn't in the local object store.
+        """
+        if new:
+            return True
+        if self.force_fetch:
+            logger.info(f"Force fetching {fork.repo_info.owner}/{fork.repo_info.name}:{fork.branch}")
+            return True
+        if fork.head_sha is None and self._ref_exists(
+            f"{FORK_REFS}/{fork.repo_info.owner}/{fork.branch}"
+        ):
             logger.info(
-                f"Remote {remote_name} exists but URL doesn't match (remote: {remote.url}, fork: {fork.repo_info.clone_url}), removing and re-adding"
+                f"Fork {fork.repo_info.owner}/{fork.repo_info.name}:{fork.branch} already "
+                f"cached, skipping fetch"
             )
-            remote.remove()
+            return False
+        return self._local_head(fork) is None
+
+    def _fetch_fork(self, owner: str, clone_url: str, branches: Iterable[str]) -> FetchStats:
+        """Fetch some branches of one fork by URL, timing it and reading the
+        bytes received from git's progress.
 
-        except ValueError:
-            # Remote doesn't exist, which is fine
-            logger.debug(f"Remote {remote_name} doesn't exist, will create new remote")
-            pass
+        Only the given branches are fetched, into FORK_REFS/<owner>/, and no
+        tags, so refreshing a fork only downloads what changed on the branches
+        being analyzed. No remote is configured for the fork. The fetch isn't
+        filtered even in a partial clone: a filtered fetch by URL would record
+        the URL as a promisor remote in the config, and negotiating against the
+        parent's commits already limits it to the fork's own objects.
 
-        # Add new remote (always fetch new remotes)
-        logger.info(f"Adding new remote {remote_name} for {fork.repo_info.clone_url}")
-        remote = self.repo.create_remote(remote_name, fork.repo_info.clone_url)
+        Safe to call from worker threads for different forks: FETCH_HEAD isn't
+        written and automatic gc is left for afterwards, so concurrent fetches
+        don't contend for them.
+        """
+        refspecs = [
+            f"+refs/heads/{branch}:{FORK_REFS}/{owner}/{branch}"
+            for branch in dict.fromkeys(branches)
+        ]
+        started = time.monotonic()
         try:
-            remote.fetch()
-        except GitCommandError as e:
-            logger.warning(f"Failed to fetch {remote_name}: {e}")
-            remote.remove()
-            raise
+            result = subprocess.run(
+                [
+                    "git",
+                    "fetch",
+                    "--progress",
+                    "--no-write-fetch-head",
+                    "--no-auto-gc",
+                    "--no-tags",
+                    clone_url,
+                    *refspecs,
+                ],
+                cwd=self.repo_dir,
+                capture_output=True,
+                text=True,
+                check=True,
+                env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
+            )
+        except subprocess.CalledProcessError as e:
+            # Report git's fatal error rather than the hints that follow it
+            lines = e.stderr.strip().splitlines()
+            fatal = [line for line in lines if line.startswith("fatal:")]
+            error = (fatal or lines or [f"exit code {e.returncode}"])[0]
+            return FetchStats(owner, time.monotonic() - started, None, error)
+        return FetchStats(owner, time.monotonic() - started, _received_bytes(result.stderr))
 
-    def get_fork_commits(self, fork: ForkInfo) -> List[CommitInfo]:
-        """Get commits that exist in the fork but not in the parent."""
-        remote_name = f"fork-{fork.repo_info.owner}"
+    def add_fork(self, fork: ForkInfo) -> None:
+        """Fetch a fork's branch into FORK_REFS."""
+        owner, clone_url = fork.repo_info.owner, fork.repo_info.clone_url
+        if not self._needs_fetch(fork, self._is_new_fork(fork)):
+            return
+        logger.info(f"Fetching {owner}/{fork.repo_info.name}:{fork.branch}")
+        stats = self._fetch_fork(owner, clone_url, [fork.branch])
+        if stats.error is not None:
+            logger.warning(f"Failed to fetch {owner}/{fork.repo_info.name}: {stats.error}")
+            raise GitCommandError(["git", "fetch", clone_url], 1, stats.error)
+        self.fork_index[owner] = clone_url
+        self._save_fork_index()
+
+    def fetch_forks(
+        self,
+        forks: Iterable[ForkInfo],
+        max_workers: int = FETCH_WORKERS,
+        per_host: int = FETCH_PER_HOST,
+    ) -> Dict[str, FetchStats]:
+        """Fetch the branches of many forks concurrently, one fetch per fork.
+
+        Only the forks' own branches are fetched, and only those that need it
+        (see _needs_fetch). At most `max_workers` fetches run at once, and at
+        most `per_host` against any one host. Forks that fail to fetch are
+        retried next run but not again in this one. Afterwards the fork index
+        is saved and refs are packed. Returns FetchStats by fork owner.
+        """
+        new: Dict[str, bool] = {}
+        # Clone URL and branches to fetch, by fork owner
+        to_fetch: Dict[str, Tuple[str, List[str]]] = {}
+        for fork in forks:
+            owner = fork.repo_info.owner
+            if self._local_head(fork) is not None or owner in self.fetch_errors:
+                continue
+            if owner not in new:
+                new[owner] = self._is_new_fork(fork)
+            if self._needs_fetch(fork, new[owner]):
+                url, branches = to_fetch.setdefault(owner, (fork.repo_info.clone_url, []))
+                branches.append(fork.branch)
+        if not to_fetch:
+            return {}
+
+        host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        for url, _ in to_fetch.values():
+            host_slots.setdefault(urlparse(url).netloc, threading.BoundedSemaphore(per_host))
+
+        def fetch(owner: str) -> FetchStats:
+            url, branches = to_fetch[owner]
+            with host_slots[urlparse(url).netloc]:
+                return self._fetch_fork(owner, url, branches)
+
+        logger.info(f"Fetching {len(to_fetch)} forks, {max_workers} at a time")
+        started = time.monotonic()
+        results: Dict[str, FetchStats] = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(to_fetch))) as pool:
+            for stats in pool.map(fetch, to_fetch):
+                results[stats.fork] = stats
+                if stats.error is not None:
+                    logger.warning(f"Failed to fetch fork {stats.fork}: {stats.error}")
+                    self.fetch_errors[stats.fork] = stats.error
+                else:
+                    self.fork_index[stats.fork] = to_fetch[stats.fork][0]
+                    logger.info(
+                        f"Fetched fork {stats.fork} in {stats.seconds:.1f}s "
+                        f"({_format_bytes(stats.bytes_received)})"
+                    )
+
+        fetched = [r for r in results.values() if r.error is None]
+        sizes = [r.bytes_received for r in fetched if r.bytes_received is not None]
+        received = f"{_format_bytes(sum(sizes))} received" if sizes else "size unknown"
+        logger.info(
+            f"Fetched {len(fetched)} of {len(results)} forks in "
+            f"{time.monotonic() - started:.1f}s ({received})"
+        )
+        self._save_fork_index()
+        self._pack_refs()
+        try:
+            self._git("gc", "--auto", "--quiet")
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"git gc --auto failed: {e.stderr}")
+        logger.info(f"{_format_bytes(self._object_store_size())} of objects on disk")
+        return results
+
+    def fetch_pull_heads(self) -> None:
+        """Fetch the head commit of every pull request against the parent at once.
+
+        GitHub exposes each pull request's head on the parent as
+        refs/pull/N/head, so one fetch from origin brings in the commits of
+        every fork branch with a pull request, without adding a remote per
+        fork. Those branches are then compared and analyzed locally.
+        """
         try:
-            remote = self.repo.remote(remote_name)
-        except ValueError:
+            self._git(
+                "fetch",
+                "--quiet",
+                "--no-tags",
+                *([f"--filter={self.clone_filter}"] if self.clone_filter else []),
+                "origin",
+                f"+refs/pull/*/head:{PULL_REFS}/*",
+            )
+        except subprocess.CalledProcessError as e:
+            logger.warning(f"Failed to fetch pull request heads: {e.stderr.strip()}")
+            return
+        fetched = self._git("for-each-ref", "--format=%(refname)", PULL_REFS).splitlines()
+        logger.info(f"Fetched the heads of {len(fetched)} pull requests")
+
+    def _local_head(self, fork: ForkInfo) -> Optional[str]:
+        """The fork branch's head commit, if it is already in the local object store.
+
+        Fork branches with pull requests usually are, once fetch_pull_heads()
+        has run.
+        """
+        if fork.head_sha is None:
+            return None
+        return fork.head_sha if self._existing_commits([fork.head_sha]) else None
+
+    def _fork_ref(self, fork: ForkInfo) -> str:
+        """A ref for the fork branch's head, fetching the branch only if the
+        head isn't available locally already."""
+        head = self._local_head(fork)
+        if head is not None:
+            logger.debug(
+                f"Head of {fork.repo_info.owner}/{fork.repo_info.name}:{fork.branch} "
+                f"is already fetched, not fetching the fork"
+            )
+            return head
+        owner = fork.repo_info.owner
+        if owner in self.fetch_errors:
+            raise GitCommandError(
+                ["git", "fetch", fork.repo_info.clone_url], 1, self.fetch_errors[owner]
+            )
+        ref = f"{FORK_REFS}/{owner}/{fork.branch}"
+        if not self._ref_exists(ref):
             self.add_fork(fork)
-            remote = self.repo.remote(remote_name)
+        return ref
 
+    def get_fork_commits(self, fork: ForkInfo) -> List[CommitInfo]:
+        """Get commits that exist in the fork but not in the parent."""
         # Get commits that are in the fork but not in parent
         parent_ref = f"origin/{self.repo_info.default_branch}"
-        fork_ref = f"{remote_name}/{fork.branch}"
-
-        commits = []
-        for commit in self.repo.iter_commits(f"{parent_ref}..{fork_ref}"):
-            # Get stats for the commit
-            stats = commit.stats.total
-
-            commits.append(
-                CommitInfo(
-                    hash=commit.hexsha,
-                    message=commit.message.strip(),
-                    author=f"{commit.author.name} <{commit.author.email}>",
-                    date=commit.committed_datetime.isoformat(),
-                    files_changed=list(commit.stats.files.keys()),
-                    insertions=stats["insertions"],
-                    deletions=stats["deletions"],
-                )
-            )
+        fork_ref = self._fork_ref(fork)
 
-        return commits
+        return [
+            CommitInfo.from_git(commit)
+            for commit in self.repo.iter_commits(f"{parent_ref}..{fork_ref}")
+        ]
 
     def get_file_diff(self, fork: ForkInfo, file_path: str) -> str:
-        """Get the diff for a specific file between parent and fork."""
-        remote_name = f"fork-{fork.repo_info.owner}"
+        """Get the diff for a specific file between parent and fork.
+
+        In a partial clone, only this file's blobs are fetched for the diff.
+        """
         parent_ref = f"origin/{self.repo_info.default_branch}"
-        fork_ref = f"{remote_name}/{fork.branch}"
+        fork_ref = self._fork_ref(fork)
 
         diff = self.repo.git.diff(parent_ref, fork_ref, "--", file_path)
         return diff
 
+    def _git(
+        self,
+        *args: str,
+        input: Optional[str] = None,
+        timeout: Optional[float] = None,
+        env: Optional[Dict[str, str]] = None,
+    ) -> str:
+        """Run a git command in the repository and return its stdout.
+
+        Uses subprocess directly rather than GitPython, so it is safe to call
+        from worker threads.
+        """
+        result = subprocess.run(
+            ["git", *args],
+            cwd=self.repo_dir,
+            input=input,
+            capture_output=True,
+            text=True,
+            check=True,
+            timeout=timeout,
+            env={**os.environ, **env} if env else None,
+        )
+        return result.stdout
+
+    def _partial_clone_filter(self) -> Optional[str]:
+        """The filter the repository was partially cloned with, or None for a full clone."""
+        try:
+            return self._git("config", "--get", "remote.origin.partialclonefilter").strip()
+        except subprocess.CalledProcessError:
+            return None
+
+    def _object_store_size(self) -> int:
+        """Bytes used by the repository's objects, loose and packed."""
+        counts = dict(
+            line.split(": ", 1) for line in self._git("count-objects", "-v").splitlines()
+        )
+        return (int(counts["size"]) + int(counts["size-pack"])) * 1024
+
+    def _ls_remote_heads(self, clone_url: str) -> Optional[Dict[str, str]]:
+        try:
+            output = self._git(
+                "ls-remote",
+                "--heads",
+                clone_url,
+                timeout=LS_REMOTE_TIMEOUT,
+                # Fail on private or deleted forks rather than asking for credentials
+                env={"GIT_TERMINAL_PROMPT": "0"},
+            )
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"Failed to list branches of {clone_url}: {e.stderr.strip()}")
+            return None
+        except subprocess.TimeoutExpired:
+            logger.debug(f"Timed out listing branches of {clone_url}")
+            return None
+        branches = {}
+        for line in output.splitlines():
+            sha, _, ref = line.partition("\t")
+            branches[ref.removeprefix("refs/heads/")] = sha
+        return branches
+
+    def list_remote_branches(
+        self, clone_urls: Iterable[str], max_workers: int = 8
+    ) -> Dict[str, Dict[str, str]]:
+        """List the branches of many remotes at once with `git ls-remote --heads`.
+
+        Returns {clone_url: {branch_name: head_sha}}. Listing a remote over git
+        costs no GitHub API quota. Remotes that can't be listed (private,
+        deleted or unreachable) are left out of the result, so callers can
+        fall back to the GitHub API for them.
+        """
+        clone_urls = list(dict.fromkeys(clone_urls))
+        if not clone_urls:
+            return {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(clone_urls))) as pool:
+            listed = zip(clone_urls, pool.map(self._ls_remote_heads, clone_urls))
+            return {url: branches for url, branches in listed if branches is not None}
+
+    def _existing_commits(self, shas: Iterable[str]) -> List[str]:
+        """Filter `shas` down to commits present in the local object store."""
+        shas = list(dict.fromkeys(shas))
+        if not shas:
+            return []
+        # Not cat-file --batch-check, which in a partial clone tries to fetch
+        # each missing object from the remote; rev-list with --missing doesn't
+        output = self._git(
+            "rev-list",
+            "--no-walk=unsorted",
+            "--missing=allow-any",
+            "--ignore-missing",
+            "--stdin",
+            input="\n".join(shas) + "\n",
+        )
+        return output.split()
+
+    def compare_commits(
+        self, base_sha: str, head_shas: Iterable[str]
+    ) -> Dict[str, Tuple[int, int, str]]:
+        """Compute (ahead, behind, committed_at) of each head commit relative to
+        `base_sha`, locally.
+
+        `committed_at` is the head's ISO 8601 committer date, so callers
+        filtering by date don't need to look it up. Only commits already in the
+        local object store (eg. from previously fetched forks) can be compared;
+        missing ones are left out of the result so callers can fall back to the
+        GitHub compare API for them. With git >= 2.41 all heads are compared in
+        a single for-each-ref call, otherwise one rev-list call is made per head.
+        """
+        head_shas = list(head_shas)
+        try:
+            present = self._existing_commits([base_sha, *head_shas])
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"Failed to check for local commits: {e.stderr}")
+            return {}
+        if base_sha not in present:
+            return {}
+        heads = [sha for sha in present if sha != base_sha]
+        counts = {base_sha: (0, 0)} if base_sha in head_shas else {}
+
+        try:
+            if len(heads) > 1 and self.repo.git.version_info >= (2, 41):
+                counts.update(self._compare_with_for_each_ref(base_sha, heads))
+            else:
+                for head in heads:
+                    # Left is base-only commits (behind), right is head-only (ahead)
+                    behind, ahead = self._git(
+                        "rev-list", "--left-right", "--count", f"{base_sha}...{head}"
+                    ).split()
+                    counts[head] = (int(ahead), int(behind))
+            dates = self._commit_dates(counts)
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"Local comparison against {base_sha} failed: {e.stderr}")
+            return {}
+        return {sha: (ahead, behind, dates[sha]) for sha, (ahead, behind) in counts.items()}
+
+    def _commit_dates(self, shas: Iterable[str]) -> Dict[str, str]:
+        """ISO 8601 committer dates of commits in the local object store, by SHA."""
+        shas = list(shas)
+        if not shas:
+            return {}
+        output = self._git(
+            "log", "--no-walk=unsorted", "--stdin", "--format=%H %cI",
+            input="\n".join(shas) + "\n",
+        )
+        return dict(line.split(" ", 1) for line in output.splitlines())
+
+    def _compare_with_for_each_ref(
+        self, base_sha: str, heads: List[str]
+    ) -> Dict[str, Tuple[int, int]]:
+        """Compare many heads at once via temporary refs and %(ahead-behind)."""
+        namespace = f"refs/fork-recon/compare/{uuid.uuid4().hex}"
+        self._git(
+            "update-ref",
+            "--stdin",
+            input="".join(f"create {namespace}/{sha} {sha}\n" for sha in heads),
+        )
+        try:
+            output = self._git(
+                "for-each-ref",
+                f"--format=%(objectname) %(ahead-behind:{base_sha})",
+                namespace,
+            )
+        finally:
+            self._git(
+                "update-ref",
+                "--stdin",
+                input="".join(f"delete {namespace}/{sha}\n" for sha in heads),
+            )
+        results = {}
+        for line in output.splitlines():
+            sha, ahead, behind = line.split()
+            results[sha] = (int(ahead), int(behind))
+        return results
+
     def cleanup(self) -> None:
         """Remove the local repository."""
         if self.repo_dir.exists():
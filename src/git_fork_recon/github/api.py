@@ -1,20 +1,30 @@
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
-import logging
+from collections import Counter
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Any, Tuple
+import logging
 import re
+import sys
 import asyncio
 from datetime import datetime
 
-from github import Github, Repository, GithubException
-from github.Repository import Repository
-from github.PullRequest import PullRequest
-from github.GithubException import UnknownObjectException
+from github import Github
+
+from ..concurrency import aiter_items, bounded_as_completed
+from .graphql import FORK_ORDER, GraphQLForkDiscovery
+from .transport import API_URL, GithubTransport, GithubAPIError
+from .http_cache import HttpCache
+from .tokens import TokenPool
+from .compare_cache import CompareCache
+from .pull_index import PullRequestIndex
+from .fork_store import ForkState, ForkStateStore
+from .branch_filter import BranchFilter
+from .triage import TriageQueue
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class RepoInfo:
     """Information about a GitHub repository."""
 
@@ -26,64 +36,621 @@ class RepoInfo:
     description: Optional[str] = None
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ForkInfo:
-    """Information about a forked repository."""
+    """Information about a forked repository.
+
+    Every branch of a fork shares the fork's RepoInfo, and every fork shares the
+    parent's, so a large network holds one RepoInfo per repository.
+    """
 
     repo_info: RepoInfo
     parent_repo: RepoInfo
     ahead_commits: int
     behind_commits: int
     has_pull_requests: bool
-    pull_request_urls: List[str]
+    pull_request_urls: Tuple[str, ...]
     last_updated: str
     # Branch this comparison was made against - may differ from repo_info.default_branch,
     # since forks often carry their changes on non-default branches
     branch: str
+    # Head commit of `branch` at the time of the comparison
+    head_sha: Optional[str] = None
+    # Parent head commit it was compared against, if known
+    base_sha: Optional[str] = None
+
+
+def _parse_github_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp from the GitHub API (which uses a 'Z' suffix)."""
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _file_diff(file: Dict[str, Any]) -> str:
+    """A unified diff for one file of a GitHub compare or commit payload.
+
+    GitHub only returns the hunks, so the file header is added to match what
+    `git diff` would show.
+    """
+    new_path = file["filename"]
+    old_path = file.get("previous_filename", new_path)
+    old = "/dev/null" if file.get("status") == "added" else f"a/{old_path}"
+    new = "/dev/null" if file.get("status") == "removed" else f"b/{new_path}"
+    return (
+        f"diff --git a/{old_path} b/{new_path}\n--- {old}\n+++ {new}\n{file['patch']}"
+    )
+
+
+# How many more times to try forks that failed because of GitHub rate limits
+FORK_RETRY_ROUNDS = 2
+
+# Orders in which forks can be listed. "newest", "oldest" and "stargazers" are
+# sorted by GitHub, so listing can stop as soon as max_forks forks have been
+# found. GitHub can't sort forks by update time, so "updated" has to list every
+# fork first, as does "triage", which ranks them by how likely they are to
+# carry work of their own (see triage.py).
+FORK_SORTS = tuple(FORK_ORDER)
+
+# Most commits the compare API lists; branches further ahead can't be analyzed
+# from the API alone
+MAX_COMPARE_COMMITS = 250
+
+
+def _inactive(pushed_at: Optional[str], activity_threshold: Optional[datetime]) -> bool:
+    """Whether a fork was last pushed to before the activity threshold."""
+    if activity_threshold is None or not pushed_at:
+        return False
+    return _parse_github_datetime(pushed_at) < activity_threshold
+
+
+def _never_pushed(created_at: Optional[str], pushed_at: Optional[str]) -> bool:
+    """Whether a fork has had nothing pushed to it since it was created.
+
+    A new fork inherits the parent's pushed_at, which predates its own
+    created_at, so such forks can't have any commits of their own.
+    """
+    if not pushed_at:
+        return True
+    if not created_at:
+        return False
+    return _parse_github_datetime(pushed_at) <= _parse_github_datetime(created_at)
+
+
+async def _walk_fork_network(
+    root: str,
+    list_forks: Callable[[str], AsyncIterator[Dict[str, Any]]],
+    describe: Callable[[Dict[str, Any]], Tuple[Any, str, int]],
+    max_depth: int = 1,
+) -> AsyncIterator[Dict[str, Any]]:
+    """Breadth-first walk of a fork network, yielding each fork once.
+
+    Args:
+        root: Full name of the repository at the root of the network
+        list_forks: Yields the direct forks of a repository, given its full name
+        describe: Returns (unique id, full name, number of forks) for a fork
+        max_depth: 1 for direct forks only, 2 to include forks of forks, etc.
+    """
+    seen = set()
+    level = [root]
+    for depth in range(1, max_depth + 1):
+        next_level = []
+        for full_name in level:
+            async for fork in list_forks(full_name):
+                repo_id, fork_full_name, fork_count = describe(fork)
+                if repo_id in seen:
+                    continue
+                seen.add(repo_id)
+                if fork_count and depth < max_depth:
+                    next_level.append(fork_full_name)
+                yield fork
+        if not next_level:
+            return
+        logger.info(
+            f"Descending into forks of {len(next_level)} forks (depth {depth + 1})"
+        )
+        level = next_level
+
+
+def _keep_most_diverged(full_name: str, branches: list, max_branches_per_fork: Optional[int]) -> list:
+    """Keep the `max_branches_per_fork` branches furthest ahead of the parent.
+
+    `branches` is a list of (branch_name, ahead_by, ...) tuples.
+    """
+    branches = sorted(branches, key=lambda b: b[1], reverse=True)
+    if max_branches_per_fork and len(branches) > max_branches_per_fork:
+        dropped = [b[0] for b in branches[max_branches_per_fork:]]
+        logger.info(
+            f"{full_name}: {len(branches)} branches ahead, "
+            f"keeping top {max_branches_per_fork} by commits ahead "
+            f"(dropped: {', '.join(dropped)})"
+        )
+        branches = branches[:max_branches_per_fork]
+    return branches
+
+
+# Computes {head_sha: (ahead, behind, committed_at)} relative to a base commit
+# without API calls, for whichever heads it can (eg. GitRepo.compare_commits).
+# committed_at is the head's ISO 8601 committer date.
+LocalCompare = Callable[[str, Iterable[str]], Dict[str, Tuple[int, int, str]]]
+
+# Lists {clone_url: {branch_name: head_sha}} without API calls, for whichever
+# remotes it can (eg. GitRepo.list_remote_branches)
+RemoteBranches = Callable[[Iterable[str]], Dict[str, Dict[str, str]]]
+
+
+@dataclass
+class _DiscoveryContext:
+    """State shared by every fork processed in one discovery run."""
+
+    transport: GithubTransport
+    parent: RepoInfo
+    parent_sha: str
+    max_branches_per_fork: Optional[int] = 3
+    local_compare: Optional[LocalCompare] = None
+    remote_branches: Optional[RemoteBranches] = None
+    # How forks' branches were listed
+    branch_listing_stats: Counter = field(default_factory=Counter)
+    # In-flight and finished comparisons against parent_sha, by head SHA, so a
+    # head shared by several forks is only compared once per run
+    comparisons: Dict[str, "asyncio.Task[Optional[Tuple[int, int]]]"] = field(
+        default_factory=dict
+    )
+    compare_stats: Counter = field(default_factory=Counter)
+    # Branch heads already claimed by a fork ("owner/name:branch"), so forks
+    # carrying the same commits (eg. a fork of a fork) are only reported once
+    claimed_heads: Dict[str, str] = field(default_factory=dict)
+    fork_stats: Counter = field(default_factory=Counter)
+    branch_filter: BranchFilter = field(default_factory=BranchFilter)
+    # Branches skipped by name or head commit date, by reason
+    branch_stats: Counter = field(default_factory=Counter)
+    # Branches whose head commit is older than this are skipped
+    activity_threshold: Optional[datetime] = None
+    head_dates: Dict[str, datetime] = field(default_factory=dict)
+    # The parent's pull requests by head label, loaded when first needed
+    pull_index: Optional["asyncio.Task[Optional[PullRequestIndex]]"] = None
+
+    @property
+    def parent_full_name(self) -> str:
+        return f"{self.parent.owner}/{self.parent.name}"
+
+    def named_branches(self, full_name: str, branches: list) -> list:
+        """Drop (branch_name, ...) tuples whose names the branch filter excludes."""
+        kept = []
+        for branch in branches:
+            reason = self.branch_filter.skip_reason(branch[0])
+            if reason is not None:
+                logger.debug(f"Skipping {full_name}:{branch[0]} - {reason}")
+                self.branch_stats[reason] += 1
+                continue
+            kept.append(branch)
+        return kept
+
+    def reusable(self, state: ForkState) -> bool:
+        """Whether a stored fork's comparisons still hold for this run."""
+        if state.parent_sha != self.parent_sha or state.branch_filter != self.branch_filter.key:
+            return False
+        # Branches pruned by an older cutoff would be pruned by this one too
+        if state.head_cutoff is None:
+            return True
+        return (
+            self.activity_threshold is not None
+            and self.activity_threshold >= _parse_github_datetime(state.head_cutoff)
+        )
+
+    def unclaimed(self, full_name: str, branches: list) -> list:
+        """Drop (branch_name, ahead_by, behind_by, head_sha) tuples whose head is
+        already reported for another fork."""
+        kept = []
+        for branch in branches:
+            owner = self.claimed_heads.get(branch[3])
+            if owner is not None:
+                logger.debug(
+                    f"Skipping {full_name}:{branch[0]} - same head as {owner}"
+                )
+                self.compare_stats["duplicate head"] += 1
+                continue
+            kept.append(branch)
+        return kept
+
+    def claim(self, full_name: str, branches: list) -> None:
+        for branch in branches:
+            self.claimed_heads.setdefault(branch[3], f"{full_name}:{branch[0]}")
+
+    def fork_state(
+        self,
+        pushed_at: str,
+        branches: List[Tuple[str, str]],
+        ahead: List[Tuple[str, int, int, str]],
+    ) -> ForkState:
+        """The state to store for a fork examined in this run."""
+        return ForkState(
+            pushed_at=pushed_at,
+            parent_sha=self.parent_sha,
+            branches=branches,
+            ahead=ahead,
+            branch_filter=self.branch_filter.key,
+            head_cutoff=(
+                self.activity_threshold.isoformat()
+                if self.activity_threshold is not None
+                else None
+            ),
+        )
+
+    def log_stats(self) -> None:
+        for label, stats in (
+            ("Forks", self.fork_stats),
+            ("Branch listings", self.branch_listing_stats),
+            ("Branches skipped", self.branch_stats),
+            ("Branch comparisons", self.compare_stats),
+        ):
+            if stats:
+                logger.info(
+                    f"{label}: "
+                    + ", ".join(f"{count} {how}" for how, count in stats.most_common())
+                )
+
+
+def _significance(fork: ForkInfo) -> Tuple[int, int, str, str]:
+    """Sort key putting the most significant fork branches (most commits
+    ahead, then most stars) first. Forks finish in no particular order, so
+    ties are broken by name to keep reports stable."""
+    return -fork.ahead_commits, -fork.repo_info.stars, fork.repo_info.owner, fork.branch
 
 
 class GithubClient:
-    def __init__(self, token: str, max_parallel: int = 5):
-        self.client = Github(token)
+    def __init__(
+        self,
+        token: str,
+        max_parallel: int = 5,
+        use_graphql: bool = False,
+        http_cache: Optional[HttpCache] = None,
+        extra_tokens: Optional[List[str]] = None,
+        compare_cache: Optional[CompareCache] = None,
+        pull_index_dir: Optional[Path] = None,
+        fork_store: Optional[ForkStateStore] = None,
+        api_url: str = API_URL,
+    ):
+        self.client = Github(token, base_url=api_url)
+        self.api_url = api_url
         self.max_parallel = max_parallel
+        self.use_graphql = use_graphql
+        self.http_cache = http_cache
+        self.compare_cache = compare_cache
+        self.pull_index_dir = pull_index_dir
+        self.fork_store = fork_store
+        # Shared across transports so quota and pacing state carry over between calls
+        self.tokens = TokenPool([token, *(extra_tokens or [])])
 
-    def _check_rate_limit(self):
-        """Check rate limit status and log warning if getting low."""
-        try:
-            rate_limit = self.client.get_rate_limit()
+    def _transport(self) -> GithubTransport:
+        """Create an async transport with a connection pool sized for max_parallel."""
+        return GithubTransport(
+            self.tokens,
+            base_url=self.api_url,
+            max_connections=self.max_parallel,
+            http_cache=self.http_cache,
+        )
 
-            # PyGithub v2.8.1+ uses resources.core structure
-            core = rate_limit.resources.core
-            remaining = core.remaining
-            total = core.limit
-            reset_time = core.reset
+    def open_transport(self) -> GithubTransport:
+        """A transport for sharing across many calls, eg. async_get_fork_changes
+        for every fork in a report, so they share one connection pool and
+        adaptive concurrency limit. Use as an async context manager."""
+        return self._transport()
 
-            reset_time_str = reset_time.strftime("%Y-%m-%d %H:%M:%S UTC")
+    async def _compare(
+        self, ctx: _DiscoveryContext, full_name: str, branch_name: str, branch_sha: str
+    ) -> Optional[Tuple[int, int]]:
+        """Compare a fork branch head against the parent head.
 
-            if remaining < 100:
+        Returns (ahead_by, behind_by), or None if the branch can't be compared.
+        A head identical to the parent needs no comparison, and a head already
+        compared (or being compared) in this run is shared rather than repeated.
+        """
+        if branch_sha == ctx.parent_sha:
+            ctx.compare_stats["identical to parent"] += 1
+            return 0, 0
+
+        task = ctx.comparisons.get(branch_sha)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._compare_uncached(ctx, full_name, branch_name, branch_sha)
+            )
+            ctx.comparisons[branch_sha] = task
+        else:
+            ctx.compare_stats["duplicate in run"] += 1
+        try:
+            return await task
+        except GithubAPIError:
+            # Don't share a rate-limited failure with later retries
+            if ctx.comparisons.get(branch_sha) is task:
+                del ctx.comparisons[branch_sha]
+            raise
+
+    async def _compare_uncached(
+        self, ctx: _DiscoveryContext, full_name: str, branch_name: str, branch_sha: str
+    ) -> Optional[Tuple[int, int]]:
+        """Compare via the persistent SHA-pair cache, then the compare API."""
+        if self.compare_cache is not None:
+            cached = self.compare_cache.get(ctx.parent_sha, branch_sha)
+            if cached is not None:
+                ctx.compare_stats["cached"] += 1
+                return cached
+
+        ctx.compare_stats["compare API"] += 1
+        try:
+            comparison = await ctx.transport.get_json(
+                f"/repos/{ctx.parent_full_name}/compare/{ctx.parent_sha}...{branch_sha}"
+            )
+        except GithubAPIError as e:
+            if e.rate_limited:
+                # Let the whole fork be retried later rather than losing the branch
+                raise
+            if e.status_code == 404:
                 logger.warning(
-                    f"GitHub API rate limit low: {remaining}/{total} requests remaining. "
-                    f"Resets at {reset_time_str}"
+                    f"Comparison failed for {full_name}:{branch_name} - "
+                    f"branch may be deleted/private: {e}"
                 )
             else:
+                # Commonly "No common ancestor" for orphan/disconnected branches
+                logger.debug(f"Skipping {full_name}:{branch_name} - not comparable: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to compare {full_name}:{branch_name}: {e}")
+            return None
+
+        if self.compare_cache is not None:
+            self.compare_cache.put(
+                ctx.parent_sha, branch_sha, comparison["ahead_by"], comparison["behind_by"]
+            )
+        # Commits come oldest first, so the head commit's date is free here
+        # unless the branch is too far ahead for the list to reach it
+        commits = comparison.get("commits") or []
+        if commits and commits[-1]["sha"] == branch_sha:
+            self._record_head_date(ctx, branch_sha, commits[-1]["commit"]["committer"]["date"])
+        return comparison["ahead_by"], comparison["behind_by"]
+
+    def _record_head_date(self, ctx: _DiscoveryContext, sha: str, committed_at: str) -> None:
+        ctx.head_dates[sha] = _parse_github_datetime(committed_at)
+        if self.compare_cache is not None:
+            self.compare_cache.put_date(sha, committed_at)
+
+    def _known_head_date(self, ctx: _DiscoveryContext, sha: str) -> Optional[datetime]:
+        """The commit date of a branch head, if it is known without a request."""
+        if sha in ctx.head_dates:
+            return ctx.head_dates[sha]
+        if self.compare_cache is not None:
+            committed_at = self.compare_cache.get_date(sha)
+            if committed_at is not None:
+                ctx.head_dates[sha] = _parse_github_datetime(committed_at)
+                return ctx.head_dates[sha]
+        return None
+
+    async def _head_date(
+        self, ctx: _DiscoveryContext, full_name: str, branch_name: str, sha: str
+    ) -> Optional[datetime]:
+        """The commit date of a branch head, or None if it can't be found."""
+        known = self._known_head_date(ctx, sha)
+        if known is not None:
+            return known
+        try:
+            commit = await ctx.transport.get_json(
+                f"/repos/{ctx.parent_full_name}/commits/{sha}"
+            )
+        except Exception as e:
+            logger.debug(f"Failed to get head commit date for {full_name}:{branch_name}: {e}")
+            return None
+        self._record_head_date(ctx, sha, commit["commit"]["committer"]["date"])
+        return ctx.head_dates[sha]
+
+    def _recent_heads(
+        self, ctx: _DiscoveryContext, full_name: str, heads: List[Tuple[str, str]]
+    ) -> List[Tuple[str, str]]:
+        """Drop (branch_name, head_sha) pairs whose head commit is known to
+        predate the activity threshold, before they are compared.
+
+        Heads whose date isn't known yet are kept; the comparison usually
+        brings their date for free, and they are checked again afterwards.
+        """
+        if ctx.activity_threshold is None:
+            return heads
+        kept = []
+        for branch_name, sha in heads:
+            head_date = self._known_head_date(ctx, sha)
+            if head_date is not None and head_date < ctx.activity_threshold:
+                logger.debug(
+                    f"Skipping {full_name}:{branch_name} - head commit from {head_date:%Y-%m-%d}"
+                )
+                ctx.branch_stats["head commit too old"] += 1
+                continue
+            kept.append((branch_name, sha))
+        return kept
+
+    async def _active_branches(
+        self, ctx: _DiscoveryContext, full_name: str, branches: list
+    ) -> list:
+        """Drop (branch_name, ahead_by, behind_by, head_sha) tuples whose head
+        commit predates the activity threshold."""
+        if ctx.activity_threshold is None:
+            return branches
+        kept = []
+        for branch in branches:
+            head_date = await self._head_date(ctx, full_name, branch[0], branch[3])
+            if head_date is not None and head_date < ctx.activity_threshold:
                 logger.debug(
-                    f"GitHub API rate limit status: {remaining}/{total} requests remaining. "
-                    f"Resets at {reset_time_str}"
+                    f"Skipping {full_name}:{branch[0]} - head commit from {head_date:%Y-%m-%d}"
                 )
+                ctx.branch_stats["head commit too old"] += 1
+                continue
+            kept.append(branch)
+        return kept
+
+    async def _pull_request_index(self, ctx: _DiscoveryContext) -> Optional[PullRequestIndex]:
+        """The parent's pull request index, built once per run on first use.
 
-            return remaining
+        Returns None if it couldn't be built, in which case pull requests are
+        looked up per branch instead.
+        """
+        if ctx.pull_index is None:
+            ctx.pull_index = asyncio.ensure_future(self._build_pull_request_index(ctx))
+        return await ctx.pull_index
 
+    async def _build_pull_request_index(
+        self, ctx: _DiscoveryContext
+    ) -> Optional[PullRequestIndex]:
+        index = PullRequestIndex(ctx.parent_full_name, self.pull_index_dir)
+        try:
+            await index.refresh(ctx.transport)
         except Exception as e:
-            logger.warning(f"Failed to check rate limit: {e}")
-            # Return a conservative estimate if we can't check
-            return 100
+            logger.warning(
+                f"Failed to index pull requests for {ctx.parent_full_name}, "
+                f"falling back to per-branch lookups: {e}"
+            )
+            return None
+        return index
 
-    async def _process_fork(
+    async def _branch_pull_requests(
+        self, ctx: _DiscoveryContext, owner: str, branch_name: str
+    ) -> List[str]:
+        """URLs of pull requests against the parent from a fork branch."""
+        index = await self._pull_request_index(ctx)
+        if index is not None:
+            return index.urls_for(owner, branch_name)
+        return [
+            pr["html_url"]
+            async for pr in ctx.transport.paginate(
+                f"/repos/{ctx.parent_full_name}/pulls",
+                {"state": "all", "head": f"{owner}:{branch_name}"},
+            )
+        ]
+
+    async def _compare_branches(
+        self, ctx: _DiscoveryContext, full_name: str, heads: List[Tuple[str, str]]
+    ) -> Tuple[List[Tuple[str, int, int, str]], bool]:
+        """Compare a fork's (branch_name, head_sha) pairs against the parent head.
+
+        Returns (branch_name, ahead_by, behind_by, head_sha) for each branch
+        ahead of the parent, and whether every branch could be compared.
+        """
+        # Branch heads already in the local repository cache can be compared
+        # with git for free; only the rest need the compare API
+        local_comparisons: Dict[str, Tuple[int, int, str]] = {}
+        if ctx.local_compare is not None:
+            try:
+                local_comparisons = await asyncio.to_thread(
+                    ctx.local_compare,
+                    ctx.parent_sha,
+                    [sha for _, sha in heads if sha != ctx.parent_sha],
+                )
+            except Exception as e:
+                logger.debug(f"Local comparison failed for {full_name}: {e}")
+            if local_comparisons:
+                logger.debug(
+                    f"{full_name}: compared {len(local_comparisons)} of "
+                    f"{len(heads)} branches locally"
+                )
+
+        branch_comparisons = []
+        complete = True
+        for branch_name, branch_sha in heads:
+            if branch_sha in local_comparisons:
+                ctx.compare_stats["local git"] += 1
+                ahead_by, behind_by, committed_at = local_comparisons[branch_sha]
+                # Keep the head's date too, so the activity filter doesn't
+                # have to request it
+                self._record_head_date(ctx, branch_sha, committed_at)
+                comparison = ahead_by, behind_by
+            else:
+                comparison = await self._compare(ctx, full_name, branch_name, branch_sha)
+            if comparison is None:
+                complete = False
+                continue
+
+            ahead_by, behind_by = comparison
+            if ahead_by > 0:
+                branch_comparisons.append((branch_name, ahead_by, behind_by, branch_sha))
+        return branch_comparisons, complete
+
+    async def _list_branches(
+        self, ctx: _DiscoveryContext, fork: Dict[str, Any]
+    ) -> Optional[List[Tuple[str, str]]]:
+        """List a fork's (branch_name, head_sha) pairs, or None if that fails.
+
+        Branches are listed with git where possible, which costs no API quota,
+        and with the branches API otherwise.
+        """
+        full_name = fork["full_name"]
+        if ctx.remote_branches is not None:
+            try:
+                listed = await asyncio.to_thread(ctx.remote_branches, [fork["clone_url"]])
+            except Exception as e:
+                logger.debug(f"Failed to list branches of {full_name} with git: {e}")
+                listed = {}
+            if fork["clone_url"] in listed:
+                ctx.branch_listing_stats["git ls-remote"] += 1
+                return sorted(listed[fork["clone_url"]].items())
+
+        ctx.branch_listing_stats["branches API"] += 1
+        try:
+            return [
+                (b["name"], b["commit"]["sha"])
+                async for b in ctx.transport.paginate(f"/repos/{full_name}/branches")
+            ]
+        except GithubAPIError as e:
+            if e.rate_limited:
+                raise
+            logger.warning(f"Failed to list branches for {full_name}: {e}")
+            return None
+        except Exception as e:
+            logger.warning(f"Failed to list branches for {full_name}: {e}")
+            return None
+
+    async def _fork_infos(
         self,
-        repo: Repository,
-        fork: Repository,
-        parent_branch,
-        max_branches_per_fork: Optional[int] = 3,
+        ctx: _DiscoveryContext,
+        fork_repo_info: RepoInfo,
+        pushed_at: str,
+        branch_comparisons: List[Tuple[str, int, int, str]],
+        pull_requests: Optional[Dict[str, List[str]]] = None,
+    ) -> List[ForkInfo]:
+        """One ForkInfo per (branch_name, ahead_by, behind_by, head_sha) tuple.
+
+        Pull requests are taken from `pull_requests` by branch name if given,
+        and looked up against the parent otherwise.
+        """
+        full_name = f"{fork_repo_info.owner}/{fork_repo_info.name}"
+        last_updated = _parse_github_datetime(pushed_at).isoformat()
+        fork_infos = []
+        for branch_name, ahead_by, behind_by, head_sha in branch_comparisons:
+            if pull_requests is not None:
+                pr_urls = pull_requests.get(branch_name, [])
+            else:
+                try:
+                    pr_urls = await self._branch_pull_requests(
+                        ctx, fork_repo_info.owner, branch_name
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to check PRs for {fork_repo_info.owner}:{branch_name}: {e}"
+                    )
+                    pr_urls = []
+
+            fork_infos.append(
+                ForkInfo(
+                    repo_info=fork_repo_info,
+                    parent_repo=ctx.parent,
+                    ahead_commits=ahead_by,
+                    behind_commits=behind_by,
+                    has_pull_requests=len(pr_urls) > 0,
+                    pull_request_urls=tuple(pr_urls),
+                    last_updated=last_updated,
+                    branch=sys.intern(branch_name),
+                    head_sha=head_sha,
+                    base_sha=ctx.parent_sha,
+                )
+            )
+            logger.info(f"Adding fork {full_name}:{branch_name} with {ahead_by} commits ahead")
+        return fork_infos
+
+    async def _process_fork(
+        self, ctx: _DiscoveryContext, fork: Dict[str, Any]
     ) -> List[ForkInfo]:
         """Process a single fork asynchronously.
 
@@ -92,217 +659,554 @@ class GithubClient:
         non-default/feature branches. Returns one ForkInfo per branch that is
         ahead, capped to the most-diverged `max_branches_per_fork` branches.
         """
+        full_name = fork["full_name"]
         try:
-            logger.debug(f"Processing fork: {fork.full_name}")
+            logger.debug(f"Processing fork: {full_name}")
 
-            try:
-                fork_branches = list(fork.get_branches())
-            except Exception as e:
-                logger.warning(f"Failed to list branches for {fork.full_name}: {e}")
-                return []
+            # A fork that hasn't been pushed to since the last run still has the
+            # same branches; if the parent hasn't moved either, the same
+            # comparisons too
+            state = None
+            if self.fork_store is not None:
+                state = self.fork_store.get(ctx.parent_full_name, full_name)
+                if state is not None and state.pushed_at != fork["pushed_at"]:
+                    state = None
 
-            branch_comparisons = []
-            for branch in fork_branches:
-                try:
-                    comparison = repo.compare(
-                        parent_branch.commit.sha, branch.commit.sha
-                    )
-                except UnknownObjectException as e:
-                    logger.warning(
-                        f"Comparison failed for {fork.full_name}:{branch.name} - "
-                        f"branch may be deleted/private: {e}"
-                    )
-                    continue
-                except GithubException as e:
-                    # Commonly a 404 "No common ancestor" for orphan/disconnected branches
-                    logger.debug(
-                        f"Skipping {fork.full_name}:{branch.name} - not comparable: {e}"
-                    )
-                    continue
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to compare {fork.full_name}:{branch.name}: {e}"
-                    )
-                    continue
+            if state is not None and ctx.reusable(state):
+                ctx.fork_stats["unchanged since last run"] += 1
+                branch_comparisons = ctx.named_branches(full_name, state.ahead)
+            else:
+                if state is not None:
+                    ctx.fork_stats["unchanged, parent or filters changed"] += 1
+                    heads = state.branches
+                else:
+                    ctx.fork_stats["examined"] += 1
+                    heads = await self._list_branches(ctx, fork)
+                    if heads is None:
+                        return []
 
-                if comparison.ahead_by > 0:
-                    branch_comparisons.append((branch.name, comparison))
+                # Prune branches before comparing them, since that's what
+                # costs requests; the store keeps every head regardless
+                branch_comparisons, complete = await self._compare_branches(
+                    ctx,
+                    full_name,
+                    self._recent_heads(ctx, full_name, ctx.named_branches(full_name, heads)),
+                )
+                if complete and self.fork_store is not None:
+                    self.fork_store.put(
+                        ctx.parent_full_name,
+                        full_name,
+                        ctx.fork_state(fork["pushed_at"], heads, branch_comparisons),
+                    )
 
+            branch_comparisons = ctx.unclaimed(full_name, branch_comparisons)
+            branch_comparisons = await self._active_branches(
+                ctx, full_name, branch_comparisons
+            )
             if not branch_comparisons:
-                logger.debug(f"Skipping fork {fork.full_name} with no changes on any branch")
+                logger.debug(f"Skipping fork {full_name} with no changes on any branch")
                 return []
 
-            branch_comparisons.sort(key=lambda b: b[1].ahead_by, reverse=True)
-            if max_branches_per_fork and len(branch_comparisons) > max_branches_per_fork:
-                dropped = [name for name, _ in branch_comparisons[max_branches_per_fork:]]
-                logger.info(
-                    f"{fork.full_name}: {len(branch_comparisons)} branches ahead, "
-                    f"keeping top {max_branches_per_fork} by commits ahead "
-                    f"(dropped: {', '.join(dropped)})"
-                )
-                branch_comparisons = branch_comparisons[:max_branches_per_fork]
-
-            fork_infos = []
-            for branch_name, comparison in branch_comparisons:
-                pr_spec = f"{fork.owner.login}:{branch_name}"
-                try:
-                    prs = repo.get_pulls(state="all", head=pr_spec)
-                    pr_urls = [pr.html_url for pr in prs]
-                    has_prs = prs.totalCount > 0
-                except Exception as e:
-                    logger.warning(f"Failed to check PRs for {pr_spec}: {e}")
-                    pr_urls, has_prs = [], False
-
-                fork_infos.append(
-                    ForkInfo(
-                        repo_info=RepoInfo(
-                            owner=fork.owner.login,
-                            name=fork.name,
-                            clone_url=fork.clone_url,
-                            default_branch=fork.default_branch,
-                            stars=fork.stargazers_count,
-                            description=fork.description,
-                        ),
-                        parent_repo=RepoInfo(
-                            owner=repo.owner.login,
-                            name=repo.name,
-                            clone_url=repo.clone_url,
-                            default_branch=repo.default_branch,
-                            stars=repo.stargazers_count,
-                            description=repo.description,
-                        ),
-                        ahead_commits=comparison.ahead_by,
-                        behind_commits=comparison.behind_by,
-                        has_pull_requests=has_prs,
-                        pull_request_urls=pr_urls,
-                        last_updated=fork.pushed_at.isoformat(),
-                        branch=branch_name,
-                    )
-                )
-                logger.info(
-                    f"Adding fork {fork.full_name}:{branch_name} with {comparison.ahead_by} commits ahead"
-                )
+            branch_comparisons = _keep_most_diverged(
+                full_name, branch_comparisons, ctx.max_branches_per_fork
+            )
+            ctx.claim(full_name, branch_comparisons)
 
-            return fork_infos
+            fork_repo_info = RepoInfo(
+                owner=fork["owner"]["login"],
+                name=sys.intern(fork["name"]),
+                clone_url=fork["clone_url"],
+                default_branch=sys.intern(fork["default_branch"]),
+                stars=fork["stargazers_count"],
+                description=fork.get("description"),
+            )
+            return await self._fork_infos(
+                ctx, fork_repo_info, fork["pushed_at"], branch_comparisons
+            )
 
+        except GithubAPIError as e:
+            if e.rate_limited:
+                raise
+            logger.warning(f"Error processing fork {full_name}: {e}", exc_info=True)
+            return []
         except Exception as e:
             logger.warning(
-                f"Error processing fork {fork.full_name}: {e}", exc_info=True
+                f"Error processing fork {full_name}: {e}", exc_info=True
             )
             return []
 
-    async def _process_fork_batch(
-        self,
-        repo: Repository,
-        forks: List[Repository],
-        parent_branch,
-        max_branches_per_fork: Optional[int] = 3,
+    async def _process_fork_or_defer(
+        self, ctx: _DiscoveryContext, fork: Dict[str, Any], deferred: List[Dict[str, Any]]
     ) -> List[ForkInfo]:
-        """Process a batch of forks in parallel."""
-        # Check rate limit before processing batch
-        remaining = self._check_rate_limit()
-
-        # Estimate requests needed: 1 to list branches, plus 1 compare + 1 PR
-        # check per branch kept. Actual comparisons made may exceed this if a
-        # fork has many branches - this is a rough guide, not a hard cap.
-        branches_per_fork_estimate = max_branches_per_fork or 3
-        requests_needed = len(forks) * (1 + branches_per_fork_estimate * 2)
-        if remaining < requests_needed:
-            logger.warning(
-                f"Rate limit may be exceeded: need ~{requests_needed} requests but only {remaining} remaining. "
-                "Processing may be incomplete."
-            )
-
-        tasks = []
-        for fork in forks:
-            tasks.append(
-                self._process_fork(repo, fork, parent_branch, max_branches_per_fork)
-            )
-
-        results = await asyncio.gather(*tasks)
-        return [fork_info for result in results for fork_info in result]
+        """Process a fork, or add it to `deferred` if GitHub rate limits get in the way."""
+        try:
+            return await self._process_fork(ctx, fork)
+        except GithubAPIError as e:
+            logger.info(f"Deferring fork {fork['full_name']} after GitHub rate limiting: {e}")
+            deferred.append(fork)
+            return []
 
     async def async_get_forks(
         self,
         repo_info: RepoInfo,
         max_forks: Optional[int] = None,
         max_branches_per_fork: Optional[int] = 3,
+        local_compare: Optional[LocalCompare] = None,
+        sort: str = "newest",
+        fork_depth: int = 1,
+        activity_threshold: Optional[datetime] = None,
+        branch_filter: Optional[BranchFilter] = None,
+        remote_branches: Optional[RemoteBranches] = None,
     ) -> List[ForkInfo]:
         """Get information about all forks of a repository asynchronously.
 
         Args:
             repo_info: Repository information
-            max_forks: Maximum number of forks to process after sorting by update time
+            max_forks: Maximum number of forks to process, in `sort` order. Forks
+                that have never been pushed to are skipped and don't count.
             max_branches_per_fork: Maximum number of diverged branches to keep per
                 fork (by commits ahead). Forks often carry changes on non-default
                 branches, so every branch is compared, but only the most-diverged
                 ones are kept to bound API usage and report size. None = no cap.
+            local_compare: Optional function to compare branch heads against the
+                parent locally (eg. GitRepo.compare_commits). Heads it can't
+                compare fall back to the GitHub compare API.
+            sort: Order in which forks are listed, one of FORK_SORTS
+            fork_depth: How far down the fork network to look - 1 for direct
+                forks only, 2 to include forks of forks, and so on. Every fork
+                is compared against repo_info, and a branch head found on
+                several forks is only reported for the first one.
+            activity_threshold: Skip forks not pushed to since this time before
+                making any requests for them, and branches whose head commit
+                is older than it.
+            branch_filter: Which branches to compare, by name and head commit
+                date. Defaults to skipping bot and GitHub Pages branches.
+            remote_branches: Optional function to list forks' branches without
+                the GitHub API (eg. GitRepo.list_remote_branches). Forks it
+                can't list fall back to the branches API. Not used with GraphQL,
+                which lists branches along with the forks.
         """
-        repo = self.client.get_repo(f"{repo_info.owner}/{repo_info.name}")
-        parent_branch = repo.get_branch(repo.default_branch)
-        forks = list(repo.get_forks())
-        logger.info(
-            f"Found {len(forks)} total forks for {repo_info.owner}/{repo_info.name}"
+        if sort not in FORK_SORTS:
+            raise ValueError(
+                f"Unknown fork sort order {sort!r}, expected one of: {', '.join(FORK_SORTS)}"
+            )
+        branch_filter = branch_filter or BranchFilter()
+        # A fork last pushed before the branch cutoff can't have a recent branch
+        # head either, so the later of the two applies to forks and branches alike
+        if branch_filter.since is not None:
+            activity_threshold = max(
+                filter(None, (activity_threshold, branch_filter.since))
+            )
+        async with self._transport() as transport:
+            try:
+                if self.use_graphql:
+                    return await self._async_get_forks_graphql(
+                        transport,
+                        repo_info,
+                        max_forks,
+                        max_branches_per_fork,
+                        sort,
+                        fork_depth,
+                        activity_threshold,
+                        branch_filter,
+                    )
+                return await self._async_get_forks_rest(
+                    transport,
+                    repo_info,
+                    max_forks,
+                    max_branches_per_fork,
+                    local_compare,
+                    sort,
+                    fork_depth,
+                    activity_threshold,
+                    branch_filter,
+                    remote_branches,
+                )
+            finally:
+                transport.concurrency.log_stats()
+                self.tokens.log_usage()
+                if self.http_cache is not None:
+                    self.http_cache.log_stats()
+
+    async def _parent_head(self, transport: GithubTransport, repo_info: RepoInfo) -> str:
+        """The head commit of the parent's default branch, which forks are compared against."""
+        branch = await transport.get_json(
+            f"/repos/{repo_info.owner}/{repo_info.name}/branches/{repo_info.default_branch}"
         )
+        return branch["commit"]["sha"]
 
-        # Sort forks by updated_at before processing
-        forks.sort(key=lambda x: x.updated_at, reverse=True)
-        logger.debug("Sorted forks by last update time")
+    async def _list_forks(
+        self, transport: GithubTransport, full_name: str, sort: str = "newest"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield the direct forks of a repository in `sort` order."""
+        params: Dict[str, Any] = {"per_page": 100}
+        if sort not in ("updated", "triage"):
+            params["sort"] = sort
+        forks = transport.paginate(f"/repos/{full_name}/forks", params)
+        if sort == "updated":
+            listed = [f async for f in forks]
+            listed.sort(key=lambda f: f["updated_at"], reverse=True)
+            forks = aiter_items(listed)
+        async for fork in forks:
+            yield fork
+
+    async def _iter_forks(
+        self,
+        transport: GithubTransport,
+        full_name: str,
+        max_forks: Optional[int] = None,
+        sort: str = "newest",
+        fork_depth: int = 1,
+        activity_threshold: Optional[datetime] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield forks that have been pushed to, in `sort` order, up to max_forks.
 
-        # Limit number of forks to process if specified
-        if max_forks and len(forks) > max_forks:
+        Forks are listed a page at a time, so with a server-side sort order only
+        as many pages as needed to find max_forks candidates are fetched. With
+        "triage", every fork is listed and queued by score first. With
+        fork_depth > 1, forks of forks are listed too, breadth first. Forks not
+        pushed to since activity_threshold are skipped, but their own forks are
+        still listed.
+        """
+        forks = _walk_fork_network(
+            full_name,
+            lambda name: self._list_forks(transport, name, sort),
+            lambda fork: (fork["id"], fork["full_name"], fork.get("forks_count", 0)),
+            fork_depth,
+        )
+        queue = None
+        if sort == "triage":
+            queue = TriageQueue(await transport.get_json(f"/repos/{full_name}"))
+        yielded = never_pushed = inactive = 0
+        async for fork in forks:
+            if _never_pushed(fork.get("created_at"), fork.get("pushed_at")):
+                never_pushed += 1
+                continue
+            if _inactive(fork.get("pushed_at"), activity_threshold):
+                inactive += 1
+                continue
+            if queue is not None:
+                queue.push(fork)
+                continue
+            yield fork
+            yielded += 1
+            if max_forks and yielded >= max_forks:
+                break
+
+        if queue is not None:
+            logger.info(f"Triaged {len(queue)} forks of {full_name} by metadata")
+            while queue and not (max_forks and yielded >= max_forks):
+                score, fork = queue.pop()
+                logger.debug(f"Triage score {score:.2f} for {fork['full_name']}")
+                yield fork
+                yielded += 1
+        message = (
+            f"Listed {yielded} forks of {full_name} ({sort} first), "
+            f"skipped {never_pushed} never pushed to"
+        )
+        if activity_threshold is not None:
+            message += f" and {inactive} not pushed to since {activity_threshold:%Y-%m-%d}"
+        logger.info(message)
+
+    async def _async_get_forks_rest(
+        self,
+        transport: GithubTransport,
+        repo_info: RepoInfo,
+        max_forks: Optional[int] = None,
+        max_branches_per_fork: Optional[int] = 3,
+        local_compare: Optional[LocalCompare] = None,
+        sort: str = "newest",
+        fork_depth: int = 1,
+        activity_threshold: Optional[datetime] = None,
+        branch_filter: Optional[BranchFilter] = None,
+        remote_branches: Optional[RemoteBranches] = None,
+    ) -> List[ForkInfo]:
+        """Get fork information using the REST API, one fork per concurrent task."""
+        full_name = f"{repo_info.owner}/{repo_info.name}"
+        ctx = _DiscoveryContext(
+            transport=transport,
+            parent=repo_info,
+            parent_sha=await self._parent_head(transport, repo_info),
+            max_branches_per_fork=max_branches_per_fork,
+            local_compare=local_compare,
+            remote_branches=remote_branches,
+            branch_filter=branch_filter or BranchFilter(),
+            activity_threshold=activity_threshold,
+        )
+
+        # Process forks as they are listed, keeping max_parallel in flight.
+        # Requests are paced by the rate limiter from response headers, so there
+        # is no need to check the remaining quota up front.
+        processed_forks = []
+        fork_count = 0
+        deferred: List[Dict[str, Any]] = []
+        async for _, fork_infos in bounded_as_completed(
+            self._iter_forks(
+                transport, full_name, max_forks, sort, fork_depth, activity_threshold
+            ),
+            lambda fork: self._process_fork_or_defer(ctx, fork, deferred),
+            self.max_parallel,
+            describe=lambda fork: fork["full_name"],
+            unit="forks",
+        ):
+            fork_count += 1
+            processed_forks.extend(fork_infos)
+
+        # Forks that were still rate limited after the transport's own retries
+        # go round again, by which time concurrency has backed off
+        for attempt in range(1, FORK_RETRY_ROUNDS + 1):
+            if not deferred:
+                break
+            retrying, deferred = deferred, []
             logger.info(
-                f"Limiting processing to {max_forks} most recently updated forks (out of {len(forks)} total)"
+                f"Retrying {len(retrying)} forks that hit GitHub rate limits "
+                f"(attempt {attempt} of {FORK_RETRY_ROUNDS})"
             )
-            forks = forks[:max_forks]
-        else:
-            logger.debug(f"Processing all {len(forks)} forks (no limit specified)")
-
-        # Check if we have enough rate limit for all forks
-        branches_per_fork_estimate = max_branches_per_fork or 3
-        requests_per_fork_estimate = 1 + branches_per_fork_estimate * 2
-        remaining = self._check_rate_limit()
-        total_requests_needed = len(forks) * requests_per_fork_estimate
-        if remaining < total_requests_needed:
+            async for _, fork_infos in bounded_as_completed(
+                retrying,
+                lambda fork: self._process_fork_or_defer(ctx, fork, deferred),
+                self.max_parallel,
+                describe=lambda fork: fork["full_name"],
+                unit="retried forks",
+            ):
+                processed_forks.extend(fork_infos)
+        if deferred:
             logger.warning(
-                f"Not enough rate limit for all forks. Need ~{total_requests_needed} requests but only have {remaining}. "
-                "Will process as many as possible."
+                f"Gave up on {len(deferred)} forks after repeated GitHub rate limiting: "
+                + ", ".join(fork["full_name"] for fork in deferred)
             )
 
-        # Process forks in batches
+        ctx.log_stats()
+        logger.info(
+            f"Found {len(processed_forks)} active fork branches with changes out of {fork_count} processed forks"
+        )
+        processed_forks.sort(key=_significance)
+        return processed_forks
+
+    async def _async_get_forks_graphql(
+        self,
+        transport: GithubTransport,
+        repo_info: RepoInfo,
+        max_forks: Optional[int] = None,
+        max_branches_per_fork: Optional[int] = 3,
+        sort: str = "newest",
+        fork_depth: int = 1,
+        activity_threshold: Optional[datetime] = None,
+        branch_filter: Optional[BranchFilter] = None,
+    ) -> List[ForkInfo]:
+        """Get fork information using batched GraphQL queries.
+
+        Forks, their branches, ahead/behind counts and pull requests come back
+        a page at a time, so this costs a few API points per page of forks
+        rather than several REST calls per fork. There is nothing left to save
+        by reading the comparison cache, fork store or pull request index, but
+        the comparisons found are written to the first two for later runs.
+        """
+        discovery = GraphQLForkDiscovery(transport)
+        ctx = _DiscoveryContext(
+            transport=transport,
+            parent=repo_info,
+            parent_sha=await self._parent_head(transport, repo_info),
+            max_branches_per_fork=max_branches_per_fork,
+            branch_filter=branch_filter or BranchFilter(),
+            activity_threshold=activity_threshold,
+        )
+        forks = _walk_fork_network(
+            ctx.parent_full_name,
+            lambda name: discovery.iter_forks(
+                *name.split("/"),
+                repo_info.default_branch,
+                sort=sort,
+                parent=ctx.parent_full_name,
+            ),
+            lambda fork: (
+                fork["id"],
+                f"{fork['owner']['login']}/{fork['name']}",
+                fork.get("forkCount", 0),
+            ),
+            fork_depth,
+        )
         processed_forks = []
-        for i in range(0, len(forks), self.max_parallel):
-            if self._check_rate_limit() < self.max_parallel * requests_per_fork_estimate:
-                logger.error(
-                    "Rate limit too low to process next batch. Stopping early."
-                )
+        # GraphQL compares against the parent's default branch by name, so what
+        # was found is only kept once the branch is known not to have moved
+        states: List[Tuple[str, ForkState]] = []
+        fork_count = never_pushed = inactive = 0
+        async for fork in forks:
+            full_name = f"{fork['owner']['login']}/{fork['name']}"
+            if _never_pushed(fork.get("createdAt"), fork.get("pushedAt")):
+                logger.debug(f"Skipping fork {full_name} that has never been pushed to")
+                never_pushed += 1
+                continue
+            if _inactive(fork.get("pushedAt"), activity_threshold):
+                inactive += 1
+                continue
+            if max_forks and fork_count >= max_forks:
                 break
+            fork_count += 1
+            ctx.fork_stats["examined"] += 1
+            processed_forks.extend(await self._process_graphql_fork(ctx, fork, states))
 
-            batch = forks[i : i + self.max_parallel]
-            batch_results = await self._process_fork_batch(
-                repo, batch, parent_branch, max_branches_per_fork
+        if await self._parent_head(transport, repo_info) == ctx.parent_sha:
+            for full_name, state in states:
+                if self.fork_store is not None:
+                    self.fork_store.put(ctx.parent_full_name, full_name, state)
+                if self.compare_cache is not None:
+                    for _, ahead_by, behind_by, head_sha in state.ahead:
+                        self.compare_cache.put(ctx.parent_sha, head_sha, ahead_by, behind_by)
+        else:
+            logger.warning(
+                f"{ctx.parent_full_name} moved during discovery, so the branches found "
+                f"aren't tied to a parent commit or kept for later runs"
             )
-            processed_forks.extend(batch_results)
+            processed_forks = [replace(f, base_sha=None) for f in processed_forks]
 
+        message = f"Skipped {never_pushed} forks that have never been pushed to"
+        if activity_threshold is not None:
+            message += f" and {inactive} not pushed to since {activity_threshold:%Y-%m-%d}"
+        logger.info(message)
+        ctx.log_stats()
         logger.info(
-            f"Found {len(processed_forks)} active fork branches with changes out of {len(forks)} processed forks"
-        )
-        # Final sort by significance (ahead commits and stars)
-        processed_forks.sort(
-            key=lambda x: (x.ahead_commits, x.repo_info.stars), reverse=True
+            f"Found {len(processed_forks)} active fork branches with changes out of {fork_count} processed forks"
         )
+        processed_forks.sort(key=_significance)
         return processed_forks
 
+    async def _process_graphql_fork(
+        self, ctx: _DiscoveryContext, fork: Dict[str, Any], states: List[Tuple[str, ForkState]]
+    ) -> List[ForkInfo]:
+        """The ForkInfos for one fork node from GraphQLForkDiscovery.
+
+        Branches are pruned and de-duplicated as in _process_fork. The fork's
+        state is appended to `states` if every branch could be compared.
+        """
+        full_name = f"{fork['owner']['login']}/{fork['name']}"
+        refs = {b["name"]: b for b in fork["refs"] if b["sha"]}
+        heads = [(name, b["sha"]) for name, b in refs.items()]
+        for b in refs.values():
+            if b["committed_at"]:
+                self._record_head_date(ctx, b["sha"], b["committed_at"])
+
+        branch_comparisons = []
+        complete = True
+        for branch_name, head_sha in self._recent_heads(
+            ctx, full_name, ctx.named_branches(full_name, heads)
+        ):
+            branch = refs[branch_name]
+            if branch["ahead_by"] is None:
+                # No common history with the parent
+                complete = False
+                continue
+            ctx.compare_stats["GraphQL"] += 1
+            if branch["ahead_by"] > 0:
+                branch_comparisons.append(
+                    (branch_name, branch["ahead_by"], branch["behind_by"], head_sha)
+                )
+        if complete:
+            states.append((full_name, ctx.fork_state(fork["pushedAt"], heads, branch_comparisons)))
+
+        branch_comparisons = ctx.unclaimed(full_name, branch_comparisons)
+        if not branch_comparisons:
+            logger.debug(f"Skipping fork {full_name} with no changes on any branch")
+            return []
+        branch_comparisons = _keep_most_diverged(
+            full_name, branch_comparisons, ctx.max_branches_per_fork
+        )
+        ctx.claim(full_name, branch_comparisons)
+
+        fork_repo_info = RepoInfo(
+            owner=fork["owner"]["login"],
+            name=sys.intern(fork["name"]),
+            clone_url=f"{fork['url']}.git",
+            default_branch=sys.intern(
+                (fork.get("defaultBranchRef") or {}).get("name", ctx.parent.default_branch)
+            ),
+            stars=fork["stargazerCount"],
+            description=fork.get("description"),
+        )
+        return await self._fork_infos(
+            ctx,
+            fork_repo_info,
+            fork["pushedAt"],
+            branch_comparisons,
+            pull_requests={name: b["pull_request_urls"] for name, b in refs.items()},
+        )
+
     def get_forks(
         self,
         repo_info: RepoInfo,
         max_forks: Optional[int] = None,
         max_branches_per_fork: Optional[int] = 3,
+        local_compare: Optional[LocalCompare] = None,
+        sort: str = "newest",
+        fork_depth: int = 1,
+        activity_threshold: Optional[datetime] = None,
+        branch_filter: Optional[BranchFilter] = None,
+        remote_branches: Optional[RemoteBranches] = None,
     ) -> List[ForkInfo]:
         """Synchronous wrapper for async_get_forks."""
         return asyncio.run(
-            self.async_get_forks(repo_info, max_forks, max_branches_per_fork)
+            self.async_get_forks(
+                repo_info,
+                max_forks,
+                max_branches_per_fork,
+                local_compare,
+                sort,
+                fork_depth,
+                activity_threshold,
+                branch_filter,
+                remote_branches,
+            )
+        )
+
+    async def async_get_fork_changes(
+        self, fork: ForkInfo, transport: Optional[GithubTransport] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+        """Get what a fork branch changed from the GitHub API, without git.
+
+        Returns the commits the branch is ahead by, newest first, as returned
+        by the commits API (with `files` and `stats`), and a unified diff of
+        the whole branch per changed file. The comparison is the same one made
+        during discovery, so with an HTTP cache it is revalidated for free.
+        A branch more than one commit ahead needs a request per commit for
+        their files, with at most max_parallel in flight.
+
+        Pass a transport from open_transport() to share it with other calls.
+        Raises ValueError for branches ahead by more commits than the compare
+        API lists (MAX_COMPARE_COMMITS), which need git instead.
+        """
+        if transport is None:
+            async with self._transport() as transport:
+                return await self.async_get_fork_changes(fork, transport)
+
+        parent_full_name = f"{fork.parent_repo.owner}/{fork.parent_repo.name}"
+        fork_full_name = f"{fork.repo_info.owner}/{fork.repo_info.name}"
+        base = fork.base_sha or fork.parent_repo.default_branch
+        head = fork.head_sha or f"{fork.repo_info.owner}:{fork.branch}"
+        comparison = await transport.get_json(
+            f"/repos/{parent_full_name}/compare/{base}...{head}"
         )
+        files = comparison.get("files") or []
+        listed = comparison.get("commits") or []
+        if comparison.get("ahead_by", len(listed)) > len(listed):
+            raise ValueError(
+                f"the comparison lists only {len(listed)} of "
+                f"{comparison['ahead_by']} commits ahead"
+            )
+        if len(listed) == 1:
+            # The branch's files are that one commit's files
+            commits = [{**listed[0], "files": files}]
+        else:
+            slots = asyncio.Semaphore(max(self.max_parallel, 1))
+
+            async def get_commit(sha: str) -> Dict[str, Any]:
+                async with slots:
+                    return await transport.get_json(f"/repos/{fork_full_name}/commits/{sha}")
+
+            commits = await asyncio.gather(*(get_commit(c["sha"]) for c in listed))
+        # Compare lists commits oldest first, git log newest first
+        commits = list(reversed(commits))
+        diffs = {f["filename"]: _file_diff(f) for f in files if f.get("patch")}
+        return commits, diffs
 
     def get_repository(self, repo_identifier: str) -> RepoInfo:
         """Get information about a GitHub repository.
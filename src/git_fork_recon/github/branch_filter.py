@@ -0,0 +1,43 @@
+"""Which fork branches are worth comparing against the parent.
+
+Forks carry plenty of branches that are never interesting in a report - bot
+dependency bumps, published sites - and each one costs a comparison. Branches
+are matched by name with shell-style globs before anything is compared, and
+can also be pruned by the age of their head commit.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+from fnmatch import fnmatchcase
+from typing import Optional, Tuple
+import json
+
+# Branches skipped unless --exclude-branch says otherwise
+DEFAULT_EXCLUDED_BRANCHES = ("dependabot/*", "renovate/*", "gh-pages")
+
+
+@dataclass(frozen=True)
+class BranchFilter:
+    """Branch name patterns and a minimum head commit date.
+
+    A branch is compared if it matches one of `include` (or `include` is
+    empty), matches none of `exclude`, and its head commit is no older than
+    `since`.
+    """
+
+    include: Tuple[str, ...] = ()
+    exclude: Tuple[str, ...] = DEFAULT_EXCLUDED_BRANCHES
+    since: Optional[datetime] = None
+
+    def skip_reason(self, name: str) -> Optional[str]:
+        """Why a branch is skipped by name, or None if it should be compared."""
+        if self.include and not any(fnmatchcase(name, p) for p in self.include):
+            return "not included by name"
+        if any(fnmatchcase(name, p) for p in self.exclude):
+            return "excluded by name"
+        return None
+
+    @property
+    def key(self) -> str:
+        """The name patterns, as stored alongside results that depend on them."""
+        return json.dumps([list(self.include), list(self.exclude)])
@@ -0,0 +1,88 @@
+"""Persistent cache of branch comparisons keyed by (base SHA, head SHA).
+
+Commits are immutable, so the ahead/behind counts between two SHAs never
+change and can be kept forever, as can a commit's date. Forks very often share branch heads with the
+parent or with each other (untouched mirrors, forks of forks), so most
+comparisons in a large network are repeats.
+"""
+
+from pathlib import Path
+from typing import Any, Optional, Tuple
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+class CompareCache:
+    """SQLite-backed store of (ahead_by, behind_by) per (base_sha, head_sha) pair."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS comparisons (
+                base_sha TEXT NOT NULL,
+                head_sha TEXT NOT NULL,
+                ahead_by INTEGER NOT NULL,
+                behind_by INTEGER NOT NULL,
+                PRIMARY KEY (base_sha, head_sha)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS commit_dates (
+                sha TEXT PRIMARY KEY,
+                committed_at TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, base_sha: str, head_sha: str) -> Optional[Tuple[int, int]]:
+        """Return the cached (ahead_by, behind_by) for a pair, if known."""
+        row = self._conn.execute(
+            "SELECT ahead_by, behind_by FROM comparisons WHERE base_sha = ? AND head_sha = ?",
+            (base_sha, head_sha),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def put(self, base_sha: str, head_sha: str, ahead_by: int, behind_by: int) -> None:
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO comparisons VALUES (?, ?, ?, ?)",
+                (base_sha, head_sha, ahead_by, behind_by),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to cache comparison {base_sha}...{head_sha}: {e}")
+
+    def get_date(self, sha: str) -> Optional[str]:
+        """Return the cached ISO 8601 commit date of a SHA, if known."""
+        row = self._conn.execute(
+            "SELECT committed_at FROM commit_dates WHERE sha = ?", (sha,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def put_date(self, sha: str, committed_at: str) -> None:
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO commit_dates VALUES (?, ?)", (sha, committed_at)
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to cache commit date for {sha}: {e}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "CompareCache":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
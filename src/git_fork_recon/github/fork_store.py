@@ -0,0 +1,111 @@
+"""Persistent per-fork state, so repeat runs only re-examine forks that changed.
+
+For each fork of a parent repository this keeps the fork's `pushed_at`, its
+branch heads, and the branches found ahead of the parent at the last run,
+along with the parent head they were compared against and the branch filter
+in effect. A fork that hasn't been pushed to since can reuse its branch list
+without asking GitHub again, and if the parent head and branch filter haven't
+changed either, its comparisons as well.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Optional, Tuple
+import json
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ForkState:
+    """What was known about a fork at the end of the last run."""
+
+    pushed_at: str
+    parent_sha: str
+    # (branch_name, head_sha) for every branch on the fork
+    branches: List[Tuple[str, str]]
+    # (branch_name, ahead_by, behind_by, head_sha) for branches ahead of parent_sha
+    ahead: List[Tuple[str, int, int, str]]
+    # BranchFilter.key of the name patterns `ahead` was found with
+    branch_filter: str = ""
+    # Branches with head commits older than this (ISO 8601) weren't compared
+    head_cutoff: Optional[str] = None
+
+
+class ForkStateStore:
+    """SQLite-backed store of ForkState, keyed by (parent, fork) full names."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS forks (
+                parent TEXT NOT NULL,
+                fork TEXT NOT NULL,
+                pushed_at TEXT NOT NULL,
+                parent_sha TEXT NOT NULL,
+                branches TEXT NOT NULL,
+                ahead TEXT NOT NULL,
+                branch_filter TEXT NOT NULL DEFAULT '',
+                head_cutoff TEXT,
+                PRIMARY KEY (parent, fork)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get(self, parent: str, fork: str) -> Optional[ForkState]:
+        """Return the stored state of a fork, if any."""
+        row = self._conn.execute(
+            "SELECT pushed_at, parent_sha, branches, ahead, branch_filter, head_cutoff "
+            "FROM forks "
+            "WHERE parent = ? AND fork = ?",
+            (parent, fork),
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            return ForkState(
+                pushed_at=row[0],
+                parent_sha=row[1],
+                branches=[tuple(b) for b in json.loads(row[2])],
+                ahead=[tuple(b) for b in json.loads(row[3])],
+                branch_filter=row[4],
+                head_cutoff=row[5],
+            )
+        except (ValueError, TypeError):
+            return None
+
+    def put(self, parent: str, fork: str, state: ForkState) -> None:
+        try:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO forks VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    parent,
+                    fork,
+                    state.pushed_at,
+                    state.parent_sha,
+                    json.dumps(state.branches),
+                    json.dumps(state.ahead),
+                    state.branch_filter,
+                    state.head_cutoff,
+                ),
+            )
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to store state for fork {fork}: {e}")
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ForkStateStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
@@ -0,0 +1,259 @@
+"""Batched fork discovery via the GitHub GraphQL API.
+
+A single paginated query returns a page of forks together with their branch
+refs, head SHAs, ahead/behind counts against the parent's default branch and
+associated pull requests. This costs a few GraphQL rate-limit points per page,
+rather than several REST calls per fork.
+"""
+
+from typing import Any, AsyncIterator, Dict, List, Optional
+import logging
+
+from .transport import GithubTransport
+
+logger = logging.getLogger(__name__)
+
+# Page sizes are chosen to keep the per-query cost at a handful of points:
+# GitHub charges roughly (connections requested / 100) per query, so
+# forks * refs-per-fork dominates the cost.
+FORKS_PER_PAGE = 25
+REFS_PER_FORK = 10
+REFS_PER_PAGE = 50
+PULLS_PER_REF = 5
+
+# Fork sort orders (as accepted by the REST forks endpoint, plus "triage")
+# mapped to GraphQL RepositoryOrder fields. Forks come back from GraphQL with
+# their branches already compared, so there is nothing to save by scoring
+# them first; "triage" lists the most recently pushed to forks first instead.
+FORK_ORDER = {
+    "newest": ("CREATED_AT", "DESC"),
+    "oldest": ("CREATED_AT", "ASC"),
+    "stargazers": ("STARGAZERS", "DESC"),
+    "updated": ("UPDATED_AT", "DESC"),
+    "triage": ("PUSHED_AT", "DESC"),
+}
+
+_REF_FIELDS = """
+    pageInfo { hasNextPage endCursor }
+    nodes {
+        name
+        target { oid ... on Commit { committedDate } }
+        compare(headRef: $compareHead) { aheadBy behindBy }
+        associatedPullRequests(first: %d) {
+            nodes { url baseRepository { nameWithOwner } }
+        }
+    }
+""" % PULLS_PER_REF
+
+FORKS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $after: String,
+      $refsFirst: Int!, $compareHead: String!,
+      $orderField: RepositoryOrderField!, $orderDirection: OrderDirection!) {
+    rateLimit { cost remaining resetAt }
+    repository(owner: $owner, name: $name) {
+        forks(first: $first, after: $after,
+              orderBy: {field: $orderField, direction: $orderDirection}) {
+            totalCount
+            pageInfo { hasNextPage endCursor }
+            nodes {
+                id
+                name
+                url
+                stargazerCount
+                forkCount
+                description
+                createdAt
+                pushedAt
+                updatedAt
+                owner { login }
+                defaultBranchRef { name }
+                refs(refPrefix: "refs/heads/", first: $refsFirst) {%s}
+            }
+        }
+    }
+}
+""" % _REF_FIELDS
+
+FORK_REFS_QUERY = """
+query($id: ID!, $after: String, $refsFirst: Int!, $compareHead: String!) {
+    rateLimit { cost remaining resetAt }
+    node(id: $id) {
+        ... on Repository {
+            refs(refPrefix: "refs/heads/", first: $refsFirst, after: $after) {%s}
+        }
+    }
+}
+""" % _REF_FIELDS
+
+
+class GraphQLError(Exception):
+    """Raised when a GraphQL query returns errors and no usable data."""
+
+
+class GraphQLForkDiscovery:
+    """Enumerate a repository's forks and their branches with batched GraphQL queries.
+
+    Each yielded fork is a plain dict (the GraphQL fork node) whose ``refs`` key
+    has been replaced by a list of branch dicts:
+    ``{"name", "sha", "committed_at", "ahead_by", "behind_by", "pull_request_urls"}``.
+    ``ahead_by``/``behind_by`` are None if the branch has no common history
+    with the parent.
+    """
+
+    def __init__(self, transport: GithubTransport):
+        self.transport = transport
+
+    async def _query(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a single GraphQL query and return its `data` payload."""
+        payload = await self.transport.graphql(query, variables)
+
+        errors = payload.get("errors")
+        data = payload.get("data")
+        if errors:
+            # Partial data is normal, eg. when a compare can't be computed for a
+            # branch with no common history - log and carry on with what we have
+            messages = "; ".join(e.get("message", str(e)) for e in errors)
+            if not data:
+                raise GraphQLError(messages)
+            logger.debug(f"GraphQL query returned partial errors: {messages}")
+
+        rate = data.get("rateLimit") or {}
+        logger.debug(
+            f"GraphQL query cost {rate.get('cost')} points, "
+            f"{rate.get('remaining')} remaining (resets {rate.get('resetAt')})"
+        )
+        return data
+
+    def _parse_refs(self, refs: Dict[str, Any], parent_full_name: str) -> List[Dict[str, Any]]:
+        """Flatten a refs connection into branch dicts."""
+        branches = []
+        for ref in refs.get("nodes") or []:
+            if not ref:
+                continue
+            compare = ref.get("compare")
+            prs = (ref.get("associatedPullRequests") or {}).get("nodes") or []
+            branches.append(
+                {
+                    "name": ref["name"],
+                    "sha": (ref.get("target") or {}).get("oid"),
+                    "committed_at": (ref.get("target") or {}).get("committedDate"),
+                    # The comparison is made with the fork branch as the base and
+                    # the parent as the head, so ahead/behind are swapped here
+                    "ahead_by": compare["behindBy"] if compare else None,
+                    "behind_by": compare["aheadBy"] if compare else None,
+                    "pull_request_urls": [
+                        pr["url"]
+                        for pr in prs
+                        if pr
+                        and (pr.get("baseRepository") or {}).get("nameWithOwner")
+                        == parent_full_name
+                    ],
+                }
+            )
+        return branches
+
+    async def _remaining_refs(
+        self,
+        fork_node: Dict[str, Any],
+        after: str,
+        compare_head: str,
+        parent_full_name: str,
+    ) -> List[Dict[str, Any]]:
+        """Page through the rest of a fork's branches, for forks with many branches."""
+        branches: List[Dict[str, Any]] = []
+        cursor: Optional[str] = after
+        while cursor:
+            data = await self._query(
+                FORK_REFS_QUERY,
+                {
+                    "id": fork_node["id"],
+                    "after": cursor,
+                    "refsFirst": REFS_PER_PAGE,
+                    "compareHead": compare_head,
+                },
+            )
+            refs = ((data.get("node") or {}).get("refs")) or {}
+            branches.extend(self._parse_refs(refs, parent_full_name))
+            page_info = refs.get("pageInfo") or {}
+            cursor = page_info.get("endCursor") if page_info.get("hasNextPage") else None
+        return branches
+
+    async def iter_forks(
+        self,
+        owner: str,
+        name: str,
+        default_branch: str,
+        max_forks: Optional[int] = None,
+        sort: str = "updated",
+        parent: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield forks of owner/name in `sort` order.
+
+        Args:
+            owner: Owner of the repository whose forks are listed
+            name: Name of the repository whose forks are listed
+            default_branch: Parent default branch that fork branches are compared against
+            max_forks: Stop paging once this many forks have been yielded
+            sort: One of FORK_ORDER's keys
+            parent: Full name of the repository that branches are compared against
+                and pull requests are matched to, if not owner/name itself (eg.
+                the root of the network, when listing forks of a fork)
+        """
+        listed_full_name = f"{owner}/{name}"
+        parent_full_name = parent or listed_full_name
+        compare_head = f"{parent_full_name.split('/')[0]}:{default_branch}"
+        order_field, order_direction = FORK_ORDER[sort]
+        cursor: Optional[str] = None
+        yielded = 0
+
+        while True:
+            first = FORKS_PER_PAGE
+            if max_forks:
+                first = min(first, max_forks - yielded)
+            data = await self._query(
+                FORKS_QUERY,
+                {
+                    "owner": owner,
+                    "name": name,
+                    "first": first,
+                    "after": cursor,
+                    "refsFirst": REFS_PER_FORK,
+                    "compareHead": compare_head,
+                    "orderField": order_field,
+                    "orderDirection": order_direction,
+                },
+            )
+            repository = data.get("repository")
+            if repository is None:
+                raise GraphQLError(f"Repository {listed_full_name} not found")
+            forks = repository["forks"]
+            if cursor is None:
+                logger.info(
+                    f"Found {forks['totalCount']} total forks for {listed_full_name}"
+                )
+
+            for node in forks.get("nodes") or []:
+                if not node:
+                    continue
+                refs = node.get("refs") or {}
+                branches = self._parse_refs(refs, parent_full_name)
+                page_info = refs.get("pageInfo") or {}
+                if page_info.get("hasNextPage"):
+                    branches.extend(
+                        await self._remaining_refs(
+                            node,
+                            page_info["endCursor"],
+                            compare_head,
+                            parent_full_name,
+                        )
+                    )
+                node["refs"] = branches
+                yield node
+                yielded += 1
+                if max_forks and yielded >= max_forks:
+                    return
+
+            page_info = forks.get("pageInfo") or {}
+            if not page_info.get("hasNextPage"):
+                return
+            cursor = page_info["endCursor"]
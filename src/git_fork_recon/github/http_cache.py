@@ -0,0 +1,162 @@
+"""On-disk conditional-request cache for GitHub REST responses.
+
+Each cached GET response is stored with its ETag / Last-Modified validators.
+Later requests for the same URL send If-None-Match / If-Modified-Since, and a
+304 Not Modified response is served from disk. GitHub does not count 304s
+against the rate limit, so repeated runs over the same fork network are
+mostly free.
+
+Cached bodies are only ever served after the server has confirmed them with a
+304, so entries are keyed by URL alone and can be shared between tokens.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping alongside the body (pagination needs Link)
+_KEPT_HEADERS = ("content-type", "link", "etag", "last-modified")
+
+
+@dataclass
+class CachedResponse:
+    """A cached response body with its validators."""
+
+    url: str
+    body: bytes
+    headers: Dict[str, str]
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get("etag")
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get("last-modified")
+
+
+class HttpCache:
+    """Size-bounded on-disk cache of GitHub API responses, keyed by URL.
+
+    Safe to share between processes and threads: entries are written
+    atomically, and a missing or corrupt entry is just treated as a miss.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode()).hexdigest()
+        return self.cache_dir / digest[:2] / f"{digest}.json"
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Return the cached response for a URL, if any."""
+        path = self._path(url)
+        try:
+            entry = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if entry.get("url") != url:
+            return None
+        return CachedResponse(
+            url=url, body=entry["body"].encode(), headers=entry["headers"]
+        )
+
+    def conditional_headers(self, cached: CachedResponse) -> Dict[str, str]:
+        """Request headers that revalidate a cached response."""
+        headers = {}
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def record_hit(self, url: str) -> None:
+        """Count a 304 revalidation, and mark the entry as recently used."""
+        self.hits += 1
+        try:
+            os.utime(self._path(url))
+        except OSError:
+            pass
+
+    def put(self, url: str, body: bytes, headers: Dict[str, str]) -> None:
+        """Store a 200 response, if it carries a validator."""
+        self.misses += 1
+        kept = {k: headers[k] for k in _KEPT_HEADERS if k in headers}
+        if "etag" not in kept and "last-modified" not in kept:
+            return
+
+        path = self._path(url)
+        data = json.dumps({"url": url, "headers": kept, "body": body.decode()})
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            old_size = path.stat().st_size if path.exists() else 0
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            self._size += path.stat().st_size - old_size
+        except OSError as e:
+            logger.debug(f"Failed to write HTTP cache entry for {url}: {e}")
+            return
+
+        if self._size > self.max_bytes:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under 90% of the size limit."""
+        entries = []
+        for p in self.cache_dir.glob("*/*.json"):
+            try:
+                st = p.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if self._size <= target:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._size -= size
+            self.evictions += 1
+        logger.debug(
+            f"HTTP cache evicted entries, now {self._size / 1e6:.1f} MB "
+            f"({self.evictions} evictions this run)"
+        )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size_bytes": self._size,
+        }
+
+    def log_stats(self) -> None:
+        total = self.hits + self.misses
+        if not total:
+            return
+        logger.info(
+            f"GitHub HTTP cache: {self.hits}/{total} requests served as 304 Not Modified "
+            f"({self.misses} misses, {self.evictions} evictions, "
+            f"{self._size / 1e6:.1f} MB on disk)"
+        )
@@ -0,0 +1,113 @@
+"""Index of a repository's pull requests by head label (`owner:branch`).
+
+Looking up pull requests per fork branch costs at least one request per
+branch. Listing the parent's pull requests once, 100 per page, and indexing
+them by head label answers every branch from memory instead.
+
+The index is kept on disk between runs. Pull requests are listed most
+recently updated first, so a refresh only needs the pages updated since the
+newest pull request already indexed.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from .transport import GithubTransport
+
+logger = logging.getLogger(__name__)
+
+
+class PullRequestIndex:
+    """Pull requests against one repository, looked up by head label."""
+
+    def __init__(self, full_name: str, cache_dir: Optional[Path] = None):
+        self.full_name = full_name
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # PR number -> {"label", "html_url", "updated_at"}
+        self.pulls: Dict[int, Dict[str, str]] = {}
+        self.updated_at: Optional[str] = None
+        self._by_label: Dict[str, List[str]] = {}
+
+    @property
+    def _cache_path(self) -> Optional[Path]:
+        if self.cache_dir is None:
+            return None
+        digest = hashlib.sha256(self.full_name.lower().encode()).hexdigest()[:16]
+        return self.cache_dir / f"{digest}.json"
+
+    def _load_cached(self) -> None:
+        path = self._cache_path
+        if path is None:
+            return
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("full_name") != self.full_name:
+            return
+        self.pulls = {int(number): pr for number, pr in data["pulls"].items()}
+        self.updated_at = data.get("updated_at")
+
+    def _save(self) -> None:
+        path = self._cache_path
+        if path is None:
+            return
+        data = json.dumps(
+            {"full_name": self.full_name, "updated_at": self.updated_at, "pulls": self.pulls}
+        )
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.debug(f"Failed to write pull request index for {self.full_name}: {e}")
+
+    def _add(self, pr: Dict[str, Any]) -> None:
+        self.pulls[pr["number"]] = {
+            "label": pr["head"]["label"],
+            "html_url": pr["html_url"],
+            "updated_at": pr["updated_at"],
+        }
+
+    async def refresh(self, transport: GithubTransport) -> None:
+        """Load the cached index and fetch pull requests updated since it was saved."""
+        self._load_cached()
+        since = self.updated_at
+        fetched = 0
+        async for pr in transport.paginate(
+            f"/repos/{self.full_name}/pulls",
+            {"state": "all", "sort": "updated", "direction": "desc", "per_page": 100},
+        ):
+            # Pull requests updated in the same second as the last refresh may
+            # not have been seen yet, so only stop once strictly older
+            if since is not None and pr["updated_at"] < since:
+                break
+            self._add(pr)
+            fetched += 1
+            if self.updated_at is None or pr["updated_at"] > self.updated_at:
+                self.updated_at = pr["updated_at"]
+
+        self._by_label = {}
+        for number in sorted(self.pulls, reverse=True):
+            pr = self.pulls[number]
+            self._by_label.setdefault(pr["label"], []).append(pr["html_url"])
+
+        if since is None:
+            logger.info(f"Indexed {len(self.pulls)} pull requests for {self.full_name}")
+        else:
+            logger.info(
+                f"Pull request index for {self.full_name}: {fetched} updated since "
+                f"{since}, {len(self.pulls)} total"
+            )
+        self._save()
+
+    def urls_for(self, owner: str, branch: str) -> List[str]:
+        """URLs of pull requests from `owner:branch`, newest first."""
+        return list(self._by_label.get(f"{owner}:{branch}", []))
@@ -0,0 +1,204 @@
+"""Client-side pacing of GitHub API requests from rate-limit response headers.
+
+Every GitHub response carries X-RateLimit-Remaining / -Limit / -Reset headers,
+so there is no need to poll /rate_limit. The scheduler keeps a local token
+bucket per rate-limit resource (core REST, GraphQL, ...) from those headers.
+Requests run at full speed while plenty of quota remains; once the bucket
+drops into its reserve, the remaining requests are spread evenly so that they
+run out exactly at the reset boundary, rather than hitting the limit and
+stopping.
+
+Secondary rate limits are different: they aren't reported ahead of time, and
+trip when too many requests are made concurrently or in quick succession.
+AdaptiveConcurrency finds the highest safe level of concurrency by backing
+off multiplicatively when GitHub pushes back and ramping up additively while
+responses are healthy (AIMD).
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Mapping, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _Bucket:
+    limit: int
+    remaining: int
+    reset: float
+    in_flight: int = 0
+    next_slot: float = 0.0
+    warned_reset: float = 0.0
+
+    @property
+    def available(self) -> int:
+        return self.remaining - self.in_flight
+
+
+class RateLimitScheduler:
+    """Token bucket per GitHub rate-limit resource, fed by response headers."""
+
+    def __init__(self, reserve_fraction: float = 0.1):
+        """
+        Args:
+            reserve_fraction: Fraction of the hourly limit below which requests are
+                paced evenly until the reset time, instead of being sent immediately.
+        """
+        self.reserve_fraction = reserve_fraction
+        self.buckets: Dict[str, _Bucket] = {}
+
+    @staticmethod
+    def resource_for(url: str) -> str:
+        """The rate-limit resource a request URL is charged against."""
+        return "graphql" if url.rstrip("/").endswith("/graphql") else "core"
+
+    async def acquire(self, resource: str = "core") -> None:
+        """Wait until a request against `resource` may be sent."""
+        # No awaits until the slot is claimed, so concurrent callers can't race
+        bucket = self.buckets.get(resource)
+        if bucket is None:
+            # No headers seen yet for this resource - nothing to pace against
+            return
+
+        now = time.time()
+        if now >= bucket.reset:
+            # A new window has started; headers will correct this shortly
+            bucket.remaining = bucket.limit
+
+        delay = 0.0
+        if bucket.available <= 0:
+            delay = bucket.reset - now + 1
+            if bucket.warned_reset != bucket.reset:
+                bucket.warned_reset = bucket.reset
+                logger.warning(
+                    f"GitHub {resource} rate limit exhausted, waiting {delay:.0f}s until "
+                    f"{datetime.fromtimestamp(bucket.reset, tz=timezone.utc):%H:%M:%S} UTC"
+                )
+        elif bucket.available <= bucket.limit * self.reserve_fraction:
+            interval = max(bucket.reset - now, 0) / bucket.available
+            slot = max(now, bucket.next_slot)
+            bucket.next_slot = slot + interval
+            delay = slot - now
+            if delay > 0:
+                logger.debug(
+                    f"Pacing GitHub {resource} requests: {bucket.available} remaining, "
+                    f"one every {interval:.1f}s until reset"
+                )
+        bucket.in_flight += 1
+
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled while waiting, so the request will never be released
+                bucket.in_flight -= 1
+                raise
+
+    def release(self, resource: str, headers: Optional[Mapping[str, str]] = None) -> None:
+        """Record a completed request and update the bucket from its response headers."""
+        bucket = self.buckets.get(resource)
+        if bucket is not None and bucket.in_flight > 0:
+            bucket.in_flight -= 1
+        if not headers or "x-ratelimit-remaining" not in headers:
+            return
+
+        try:
+            remaining = int(headers["x-ratelimit-remaining"])
+            limit = int(headers.get("x-ratelimit-limit", remaining))
+            reset = float(headers.get("x-ratelimit-reset", time.time() + 3600))
+        except ValueError:
+            return
+        resource = headers.get("x-ratelimit-resource", resource)
+
+        bucket = self.buckets.get(resource)
+        if bucket is None:
+            self.buckets[resource] = _Bucket(limit=limit, remaining=remaining, reset=reset)
+        elif reset > bucket.reset:
+            bucket.limit, bucket.remaining, bucket.reset = limit, remaining, reset
+            bucket.next_slot = 0.0
+        else:
+            # Responses can arrive out of order; within a window the remaining
+            # count only goes down, so the lowest value seen is the freshest
+            bucket.remaining = min(bucket.remaining, remaining)
+
+    def log_status(self, suffix: str = "") -> None:
+        for resource, bucket in self.buckets.items():
+            reset_time = datetime.fromtimestamp(bucket.reset, tz=timezone.utc)
+            message = (
+                f"GitHub API {resource} rate limit{suffix}: {bucket.remaining}/{bucket.limit} "
+                f"requests remaining. Resets at {reset_time:%Y-%m-%d %H:%M:%S} UTC"
+            )
+            if bucket.remaining < bucket.limit * self.reserve_fraction:
+                logger.warning(message)
+            else:
+                logger.info(message)
+
+
+class AdaptiveConcurrency:
+    """Additive-increase/multiplicative-decrease limit on concurrent requests.
+
+    The limit starts at `maximum`. Each secondary rate-limit response halves
+    it (at most once per back-off period) and pauses all requests for the
+    Retry-After period; each healthy response raises it by 1/limit, ie. by
+    about one per round of `limit` requests, back up to `maximum`.
+    """
+
+    def __init__(self, maximum: int, minimum: int = 1, backoff: float = 0.5):
+        self.maximum = max(maximum, 1)
+        self.minimum = max(min(minimum, self.maximum), 1)
+        self.backoff = backoff
+        self.limit = float(self.maximum)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self.lowest = self.limit
+        self._condition = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """Wait for a free slot, and for any back-off pause to end."""
+        async with self._condition:
+            while True:
+                delay = self.paused_until - time.monotonic()
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(self._condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < int(self.limit):
+                    self.in_flight += 1
+                    return
+                await self._condition.wait()
+
+    async def release(self, retry_after: Optional[float] = None) -> None:
+        """Free a slot. `retry_after` is set if the response was a secondary rate limit."""
+        async with self._condition:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if retry_after is None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            else:
+                self.throttled += 1
+                # Responses to requests already in flight when the first one
+                # was throttled shouldn't each halve the limit again
+                if now >= self.paused_until:
+                    self.limit = max(self.minimum, self.limit * self.backoff)
+                    self.lowest = min(self.lowest, self.limit)
+                    logger.warning(
+                        f"GitHub secondary rate limit hit, pausing {retry_after:.0f}s and "
+                        f"reducing concurrency to {int(self.limit)}"
+                    )
+                self.paused_until = max(self.paused_until, now + retry_after)
+            self._condition.notify_all()
+
+    def log_stats(self) -> None:
+        if self.throttled:
+            logger.info(
+                f"GitHub secondary rate limits: {self.throttled} throttled responses, "
+                f"concurrency went down to {int(self.lowest)} and is now "
+                f"{int(self.limit)} (max {self.maximum})"
+            )
@@ -0,0 +1,106 @@
+"""Pool of GitHub tokens, spreading requests by remaining quota.
+
+Each token has its own hourly rate limit, so a pool of N tokens gives roughly
+N times the request budget. Every request goes out on the token with the most
+quota left for its resource; a token that is exhausted (or rejected) is passed
+over until its limit resets, so a scan keeps going on the others.
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional
+import logging
+import time
+
+from .ratelimit import RateLimitScheduler
+
+logger = logging.getLogger(__name__)
+
+# Assumed quota for a token we haven't had a response for yet
+DEFAULT_LIMIT = 5000
+
+
+def token_label(token: str) -> str:
+    """A short, non-secret label for a token, for logging."""
+    if len(token) <= 12:
+        return "****"
+    return f"{token[:4]}…{token[-4:]}"
+
+
+class TokenPool:
+    """A set of GitHub tokens, each paced by its own RateLimitScheduler."""
+
+    def __init__(self, tokens: Iterable[str], reserve_fraction: float = 0.1):
+        # Preserve order (the first token is the primary one) but drop duplicates
+        self.tokens: List[str] = list(dict.fromkeys(t for t in tokens if t))
+        if not self.tokens:
+            raise ValueError("At least one GitHub token is required")
+        self.schedulers: Dict[str, RateLimitScheduler] = {
+            t: RateLimitScheduler(reserve_fraction) for t in self.tokens
+        }
+        self.usage: Dict[str, int] = {t: 0 for t in self.tokens}
+        self.disabled: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.tokens)
+
+    def _available(self, token: str, resource: str) -> float:
+        bucket = self.schedulers[token].buckets.get(resource)
+        if bucket is None:
+            return DEFAULT_LIMIT - self.usage[token]
+        if time.time() >= bucket.reset:
+            return bucket.limit - bucket.in_flight
+        return bucket.available
+
+    def _reset_time(self, token: str, resource: str) -> float:
+        bucket = self.schedulers[token].buckets.get(resource)
+        return bucket.reset if bucket is not None else 0.0
+
+    def pick(self, resource: str = "core") -> str:
+        """The usable token with the most remaining quota for `resource`."""
+        candidates = [t for t in self.tokens if t not in self.disabled]
+        if not candidates:
+            raise RuntimeError(
+                "No usable GitHub tokens: "
+                + ", ".join(f"{token_label(t)} ({why})" for t, why in self.disabled.items())
+            )
+        best = max(candidates, key=lambda t: self._available(t, resource))
+        if self._available(best, resource) <= 0:
+            # Everything is exhausted - wait on whichever token resets first
+            best = min(candidates, key=lambda t: self._reset_time(t, resource))
+        return best
+
+    async def acquire(self, resource: str = "core") -> str:
+        """Pick a token for a request and wait until it may be sent."""
+        token = self.pick(resource)
+        self.usage[token] += 1
+        await self.schedulers[token].acquire(resource)
+        return token
+
+    def release(
+        self, token: str, resource: str, headers: Optional[Mapping[str, str]] = None
+    ) -> None:
+        """Record a completed request on `token`."""
+        self.schedulers[token].release(resource, headers)
+
+    def disable(self, token: str, reason: str) -> None:
+        """Stop using a token, eg. because GitHub rejected its credentials."""
+        if token not in self.disabled:
+            logger.warning(f"Disabling GitHub token {token_label(token)}: {reason}")
+            self.disabled[token] = reason
+
+    def has_alternative(self, token: str, resource: str = "core") -> bool:
+        """Whether another usable token has quota left for `resource`."""
+        return any(
+            t != token and t not in self.disabled and self._available(t, resource) > 0
+            for t in self.tokens
+        )
+
+    def log_usage(self) -> None:
+        """Log requests made and quota left per token."""
+        for token in self.tokens:
+            suffix = ""
+            if len(self.tokens) > 1:
+                label = token_label(token)
+                suffix = f" for token {label}"
+                status = f" (disabled: {self.disabled[token]})" if token in self.disabled else ""
+                logger.info(f"GitHub token {label}: {self.usage[token]} requests this run{status}")
+            self.schedulers[token].log_status(suffix)
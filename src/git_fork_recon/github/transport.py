@@ -0,0 +1,249 @@
+"""Async HTTP transport for the GitHub REST and GraphQL APIs.
+
+PyGithub is synchronous, so calling it from a coroutine blocks the event loop
+and serialises work that should run concurrently. This transport wraps a
+pooled, keep-alive `httpx.AsyncClient` so fork discovery requests genuinely
+overlap.
+"""
+
+from typing import Any, AsyncIterator, Dict, Optional
+import logging
+
+import httpx
+
+from .http_cache import HttpCache
+from .ratelimit import AdaptiveConcurrency, RateLimitScheduler
+from .tokens import TokenPool, token_label
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.github.com"
+
+# How many times to wait for a rate-limit reset and retry a rejected request
+MAX_RATE_LIMIT_RETRIES = 2
+
+# How many times to back off and retry a request hitting a secondary rate limit
+MAX_SECONDARY_RETRIES = 3
+
+# GitHub asks clients to wait at least a minute when a secondary rate limit
+# response doesn't say how long to wait
+DEFAULT_SECONDARY_WAIT = 60.0
+
+
+def _secondary_retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait if a response is a secondary rate limit, otherwise None."""
+    if response.status_code not in (403, 429):
+        return None
+    if response.headers.get("x-ratelimit-remaining") == "0":
+        # The primary (hourly) limit, which is handled by switching tokens
+        return None
+    retry_after = response.headers.get("retry-after")
+    if retry_after:
+        try:
+            return max(float(retry_after), 1.0)
+        except ValueError:
+            return DEFAULT_SECONDARY_WAIT
+    if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+        return DEFAULT_SECONDARY_WAIT
+    return None
+
+
+class GithubAPIError(Exception):
+    """An error response from the GitHub API."""
+
+    def __init__(
+        self, status_code: int, message: str, url: str = "", rate_limited: bool = False
+    ):
+        super().__init__(f"{status_code} {message} ({url})" if url else f"{status_code} {message}")
+        self.status_code = status_code
+        self.message = message
+        self.url = url
+        # Whether the request was refused by a (primary or secondary) rate
+        # limit, and so may succeed if retried later
+        self.rate_limited = rate_limited
+
+
+class GithubTransport:
+    """Pooled async client for GitHub API requests.
+
+    Use as an async context manager; the underlying connection pool is bound
+    to the running event loop, so a transport should not outlive it.
+    """
+
+    def __init__(
+        self,
+        tokens: TokenPool,
+        base_url: str = API_URL,
+        max_connections: int = 10,
+        timeout: float = 30.0,
+        http_cache: Optional[HttpCache] = None,
+    ):
+        self.tokens = tokens
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.http_cache = http_cache
+        self.concurrency = AdaptiveConcurrency(max_connections)
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def graphql_url(self) -> str:
+        """The GraphQL endpoint for base_url.
+
+        GitHub Enterprise Server serves REST at <host>/api/v3 but GraphQL at
+        <host>/api/graphql, rather than under the REST base as on github.com.
+        """
+        if self.base_url.endswith("/api/v3"):
+            return f"{self.base_url.removesuffix('/v3')}/graphql"
+        return f"{self.base_url}/graphql"
+
+    async def __aenter__(self) -> "GithubTransport":
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+            timeout=self.timeout,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Any] = None,
+    ) -> httpx.Response:
+        """Make a request, raising GithubAPIError for error responses.
+
+        GET requests are revalidated against the HTTP cache, if one is set, and
+        a 304 Not Modified is returned to the caller as the cached 200 response.
+        """
+        if self._client is None:
+            raise RuntimeError("GithubTransport must be used as an async context manager")
+        request = self._client.build_request(method, url, params=params, json=json)
+
+        cached = None
+        if self.http_cache is not None and method == "GET":
+            cached = self.http_cache.get(str(request.url))
+            if cached is not None:
+                request.headers.update(self.http_cache.conditional_headers(cached))
+
+        response = await self._send(request)
+
+        if cached is not None and response.status_code == 304:
+            self.http_cache.record_hit(cached.url)
+            return httpx.Response(
+                200, headers=cached.headers, content=cached.body, request=request
+            )
+        if self.http_cache is not None and method == "GET" and response.status_code == 200:
+            self.http_cache.put(str(request.url), response.content, dict(response.headers))
+
+        if response.status_code >= 400:
+            try:
+                message = response.json().get("message", response.reason_phrase)
+            except ValueError:
+                message = response.reason_phrase
+            rate_limited = response.status_code in (403, 429) and (
+                response.headers.get("x-ratelimit-remaining") == "0"
+                or _secondary_retry_after(response) is not None
+            )
+            raise GithubAPIError(
+                response.status_code, message, str(response.url), rate_limited=rate_limited
+            )
+        return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        """Send a request on the pooled token with the most quota left.
+
+        Requests are paced by each token's rate limiter. If GitHub rejects a
+        request because a token's limit is used up, it is retried on another
+        token, or held until the limit resets if every token is exhausted.
+        Secondary rate limits reduce the number of concurrent requests and
+        pause all of them for the Retry-After period before retrying.
+        """
+        resource = RateLimitScheduler.resource_for(str(request.url))
+        reset_waits = secondary_retries = 0
+        for _ in range(len(self.tokens) + MAX_RATE_LIMIT_RETRIES + MAX_SECONDARY_RETRIES):
+            # Wait out any rate-limit pacing before taking a concurrency slot,
+            # so a request held until a reset doesn't block others meanwhile
+            token = await self.tokens.acquire(resource)
+            try:
+                await self.concurrency.acquire()
+            except BaseException:
+                self.tokens.release(token, resource)
+                raise
+            request.headers["Authorization"] = f"Bearer {token}"
+            try:
+                response = await self._client.send(request)
+            except BaseException:
+                self.tokens.release(token, resource)
+                await self.concurrency.release()
+                raise
+            self.tokens.release(token, resource, response.headers)
+            retry_after = _secondary_retry_after(response)
+            await self.concurrency.release(retry_after)
+
+            if retry_after is not None:
+                if secondary_retries >= MAX_SECONDARY_RETRIES:
+                    break
+                secondary_retries += 1
+                logger.debug(f"Secondary rate limit for {request.url}, retrying")
+                continue
+
+            if response.status_code == 401 and self.tokens.has_alternative(token, resource):
+                self.tokens.disable(token, "bad credentials")
+                continue
+
+            exhausted = (
+                response.status_code in (403, 429)
+                and response.headers.get("x-ratelimit-remaining") == "0"
+            )
+            if not exhausted:
+                break
+            if self.tokens.has_alternative(token, resource):
+                logger.info(
+                    f"GitHub token {token_label(token)} exhausted its {resource} rate limit, "
+                    "switching to another token"
+                )
+                continue
+            if reset_waits >= MAX_RATE_LIMIT_RETRIES:
+                break
+            reset_waits += 1
+            logger.warning(f"GitHub rate limit exceeded for {request.url}, retrying after reset")
+        return response
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """GET a URL and return the decoded JSON body."""
+        response = await self.request("GET", url, params=params)
+        return response.json()
+
+    async def paginate(
+        self, url: str, params: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Any]:
+        """Yield items from a paginated list endpoint, following Link headers."""
+        next_url: Optional[str] = url
+        while next_url:
+            response = await self.request("GET", next_url, params=params)
+            for item in response.json():
+                yield item
+            next_url = response.links.get("next", {}).get("url")
+            # The next link already carries the query string
+            params = None
+
+    async def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """POST a GraphQL query and return the full JSON payload."""
+        response = await self.request(
+            "POST", self.graphql_url, json={"query": query, "variables": variables}
+        )
+        return response.json()
@@ -0,0 +1,71 @@
+"""Rank forks by how likely they are to carry work of their own.
+
+With `--max-forks`, every fork processed spends requests on listing and
+comparing its branches, so the slots should go to the forks most likely to
+have diverged. A fork's `updated_at` moves whenever it is starred or its
+settings change, so on its own it is a poor guide. The fork listing already
+carries enough metadata to do better without any extra requests: how long
+the fork was pushed to after it was created, whether its size or
+description differ from the parent's, its stars and open issues.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+import heapq
+import math
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def triage_score(fork: Dict[str, Any], parent: Dict[str, Any]) -> float:
+    """Score a fork from the REST fork listing against its parent's metadata.
+
+    Higher scores are more likely to carry real work. The score is a sum of
+    log-scaled signals, so no single one (eg. a popular but idle fork's
+    stars) dominates.
+    """
+    score = 0.0
+    created_at, pushed_at = fork.get("created_at"), fork.get("pushed_at")
+    if created_at and pushed_at:
+        # Days of pushing after the fork was created; a new fork inherits the
+        # parent's pushed_at, so this is zero or negative until its own push
+        active_days = (_parse_datetime(pushed_at) - _parse_datetime(created_at)).days
+        score += math.log1p(max(active_days, 0))
+    # Sizes are in KB. A fork that was never pushed to keeps the parent's size
+    # as of forking, so a difference is a weak sign of commits either way
+    size_delta = abs(fork.get("size", 0) - parent.get("size", 0))
+    if size_delta:
+        score += 1 + math.log1p(size_delta) / 4
+    score += math.log1p(fork.get("stargazers_count", 0))
+    # Forks have issues disabled by default, so open issues mean someone
+    # turned them on and uses them
+    score += math.log1p(fork.get("open_issues_count", 0)) / 2
+    if fork.get("description") and fork.get("description") != parent.get("description"):
+        score += 1
+    return score
+
+
+class TriageQueue:
+    """Priority queue of forks, highest triage score first.
+
+    Ties keep the order in which forks were pushed.
+    """
+
+    def __init__(self, parent: Dict[str, Any]):
+        self.parent = parent
+        self._heap: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._pushed = 0
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, fork: Dict[str, Any]) -> None:
+        heapq.heappush(self._heap, (-triage_score(fork, self.parent), self._pushed, fork))
+        self._pushed += 1
+
+    def pop(self) -> Tuple[float, Dict[str, Any]]:
+        """Remove and return the highest scoring fork, with its score."""
+        score, _, fork = heapq.heappop(self._heap)
+        return -score, fork
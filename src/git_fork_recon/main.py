@@ -10,9 +10,13 @@ import shutil
 
 from .config import load_config
 from .github.api import GithubClient
+from .github.branch_filter import BranchFilter
+from .github.http_cache import HttpCache
+from .github.compare_cache import CompareCache
+from .github.fork_store import ForkStateStore
 from .git.repo import GitRepo
 from .llm.client import LLMClient
-from .report.generator import ReportGenerator
+from .report.generator import DEFAULT_API_ONLY_MAX_AHEAD, ReportGenerator
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +49,13 @@ def analyze_forks(
     github_token: Optional[str] = None,
     verbose: bool = False,
     force_fetch: bool = False,
+    use_graphql: bool = False,
+    fork_sort: str = "newest",
+    fork_depth: int = 1,
+    branch_filter: Optional[BranchFilter] = None,
+    api_only_max_ahead: int = DEFAULT_API_ONLY_MAX_AHEAD,
+    fetch_pull_refs: bool = False,
+    clone_filter: Optional[str] = None,
 ) -> AnalysisResult:
     """Analyze forks of a GitHub repository and return results."""
     # Load config and apply overrides
@@ -61,51 +72,76 @@ def analyze_forks(
         config.github_token = github_token
 
     # Initialize clients with parallel option
-    github_client = GithubClient(config.github_token, max_parallel=parallel)
-    llm_client = LLMClient(
-        config.openai_api_key,
-        model=config.model,
-        context_length=config.context_length,
-        api_base_url=config.openai_base_url,
-        max_parallel=parallel,
-        verbose=verbose,
+    http_cache = HttpCache(
+        config.cache_api / "http", max_bytes=config.cache_http_max_mb * 1024 * 1024
     )
+    # The SQLite-backed stores are closed once the analysis is done, since the
+    # server runs an analysis per request in the same process
+    compare_cache = CompareCache(config.cache_api / "compare.sqlite")
+    fork_store = ForkStateStore(config.cache_api / "forks.sqlite")
+    with compare_cache, fork_store:
+        github_client = GithubClient(
+            config.github_token,
+            max_parallel=parallel,
+            use_graphql=use_graphql,
+            http_cache=http_cache,
+            extra_tokens=config.github_tokens,
+            compare_cache=compare_cache,
+            pull_index_dir=config.cache_api / "pulls",
+            fork_store=fork_store,
+            api_url=config.github_api_url,
+        )
+        llm_client = LLMClient(
+            config.openai_api_key,
+            model=config.model,
+            context_length=config.context_length,
+            api_base_url=config.openai_base_url,
+            max_parallel=parallel,
+            verbose=verbose,
+        )
 
-    # Get repository and fork information
-    repo_info = github_client.get_repository(repo_url)
-
-    # Clear cache only if requested
-    if clear_cache and config.cache_repo:
-        repo_cache = config.cache_repo / repo_info.owner / repo_info.name
-        if repo_cache.exists():
-            logger.info(f"Clearing cache for {repo_cache}")
-            shutil.rmtree(repo_cache)
+        # Get repository and fork information
+        repo_info = github_client.get_repository(repo_url)
 
-    # Clone main repository
-    git_repo = GitRepo(repo_info, config, force_fetch=force_fetch)
+        # Clear cache only if requested
+        if clear_cache and config.cache_repo:
+            repo_cache = config.cache_repo / repo_info.owner / repo_info.name
+            if repo_cache.exists():
+                logger.info(f"Clearing cache for {repo_cache}")
+                shutil.rmtree(repo_cache)
 
-    # Get and filter forks
-    forks = github_client.get_forks(
-        repo_info, max_forks=max_forks, max_branches_per_fork=max_branches_per_fork
-    )
+        # Clone main repository, optionally as a partial clone and with the heads
+        # of all its pull requests
+        git_repo = GitRepo(
+            repo_info,
+            config,
+            force_fetch=force_fetch,
+            fetch_pull_refs=fetch_pull_refs,
+            clone_filter=clone_filter,
+        )
 
-    # Apply activity threshold if specified
-    if activity_threshold:
-        active_forks = [
-            fork
-            for fork in forks
-            if datetime.fromisoformat(fork.last_updated) >= activity_threshold
-        ]
-        logger.info(
-            f"Found {len(active_forks)} forks active since {activity_threshold} out of {len(forks)} processed forks"
+        # Get forks, skipping those with no activity since the threshold. Fork
+        # branches are listed with git ls-remote, and branch heads already fetched
+        # into the repository cache are compared locally, rather than with the
+        # GitHub API.
+        forks_to_analyze = github_client.get_forks(
+            repo_info,
+            max_forks=max_forks,
+            max_branches_per_fork=max_branches_per_fork,
+            local_compare=git_repo.compare_commits,
+            remote_branches=git_repo.list_remote_branches,
+            sort=fork_sort,
+            fork_depth=fork_depth,
+            activity_threshold=activity_threshold,
+            branch_filter=branch_filter,
         )
-        forks_to_analyze = active_forks
-    else:
-        forks_to_analyze = forks
 
-    # Generate report
-    report_gen = ReportGenerator(llm_client)
-    report = report_gen.generate(repo_info, forks_to_analyze, git_repo)
+        # Generate report. Forks only a few commits ahead are analyzed from the
+        # GitHub API rather than fetched with git.
+        report_gen = ReportGenerator(
+            llm_client, github_client=github_client, api_only_max_ahead=api_only_max_ahead
+        )
+        report = report_gen.generate(repo_info, forks_to_analyze, git_repo)
 
     return AnalysisResult(repo_info, forks_to_analyze, git_repo, report, config)
 
@@ -128,6 +164,13 @@ def analyze(
     max_branches_per_fork: Optional[int] = 3,
     force_fetch: bool = False,
     force: bool = False,
+    use_graphql: bool = False,
+    fork_sort: str = "newest",
+    fork_depth: int = 1,
+    branch_filter: Optional[BranchFilter] = None,
+    api_only_max_ahead: int = DEFAULT_API_ONLY_MAX_AHEAD,
+    fetch_pull_refs: bool = False,
+    clone_filter: Optional[str] = None,
 ) -> None:
     """Analyze forks of a GitHub repository (CLI interface)."""
     # Load config and apply overrides
@@ -143,14 +186,27 @@ def analyze(
 
     # Log final configuration
     logger.info(f"Found GITHUB_TOKEN: {'yes' if config.github_token else 'no'}")
+    if config.github_tokens:
+        logger.info(f"Pooling {len(config.github_tokens)} additional GitHub tokens")
     logger.info(f"Using API key from: {config.api_key_source}")
     logger.info(f"Found API key: {'yes' if config.openai_api_key else 'no'}")
     logger.info(f"Using API base URL: {config.openai_base_url}")
     logger.info(f"Using CACHE_REPO: {config.cache_repo}")
+    if clone_filter is not None:
+        logger.info(f"Using partial clones: --filter={clone_filter}")
     logger.info(f"Using MODEL: {config.model}")
     if config.context_length is not None:
         logger.info(f"Using CONTEXT_LENGTH override: {config.context_length}")
-    logger.info(f"Maximum forks to analyze: {max_forks}")
+    logger.info(f"Maximum forks to analyze: {max_forks} ({fork_sort} first)")
+    if fork_depth > 1:
+        logger.info(f"Including forks of forks up to depth {fork_depth}")
+    if branch_filter is not None:
+        if branch_filter.include:
+            logger.info(f"Only comparing branches matching: {', '.join(branch_filter.include)}")
+        if branch_filter.exclude:
+            logger.info(f"Not comparing branches matching: {', '.join(branch_filter.exclude)}")
+        if branch_filter.since is not None:
+            logger.info(f"Only comparing branches with commits since {branch_filter.since:%Y-%m-%d}")
 
     # Perform analysis
     result = analyze_forks(
@@ -167,6 +223,13 @@ def analyze(
         max_branches_per_fork=max_branches_per_fork,
         verbose=verbose,
         force_fetch=force_fetch,
+        use_graphql=use_graphql,
+        fork_sort=fork_sort,
+        fork_depth=fork_depth,
+        branch_filter=branch_filter,
+        api_only_max_ahead=api_only_max_ahead,
+        fetch_pull_refs=fetch_pull_refs,
+        clone_filter=clone_filter,
     )
 
     # Write report to file or stdout
@@ -1,20 +1,27 @@
-from typing import List, Dict, Any, Optional, Set
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set, Tuple
 import subprocess
 import logging
 from pathlib import Path
 import re
 import asyncio
+import contextlib
 from datetime import datetime
 
 from jinja2 import Environment, PackageLoader, select_autoescape
 
-from ..github.api import RepoInfo, ForkInfo
+from ..concurrency import bounded_as_completed
+from ..github.api import GithubClient, RepoInfo, ForkInfo
+from ..github.transport import GithubTransport
 from ..git.repo import GitRepo, CommitInfo
 from ..llm.client import LLMClient
 from .pandoc import PandocConverter
 
 logger = logging.getLogger(__name__)
 
+# Forks at most this many commits ahead are analyzed from the GitHub API by default
+DEFAULT_API_ONLY_MAX_AHEAD = 5
+
 
 def _linkify_commit_hashes(text: Optional[str], repo_url: str) -> str:
     """Convert commit hashes in text to markdown links."""
@@ -32,8 +39,29 @@ def _linkify_commit_hashes(text: Optional[str], repo_url: str) -> str:
 
 
 class ReportGenerator:
-    def __init__(self, llm_client: LLMClient):
+    def __init__(
+        self,
+        llm_client: LLMClient,
+        github_client: Optional[GithubClient] = None,
+        api_only_max_ahead: int = DEFAULT_API_ONLY_MAX_AHEAD,
+    ):
+        """Set up report generation.
+
+        Args:
+            llm_client: Client used to summarize each fork's changes
+            github_client: If given, forks at most `api_only_max_ahead` commits
+                ahead are analyzed from the GitHub API instead of being fetched
+                with git
+            api_only_max_ahead: Largest number of commits ahead to analyze from
+                the GitHub API (0 = always fetch with git)
+        """
         self.llm_client = llm_client
+        self.github_client = github_client
+        self.api_only_max_ahead = api_only_max_ahead
+        # How many forks were analyzed each way in the current report
+        self.sources: Counter = Counter()
+        # GitHub transport shared by every API-only analysis in the current report
+        self._api_transport: Optional[GithubTransport] = None
         self.pandoc = PandocConverter()
         self.env = Environment(
             loader=PackageLoader("git_fork_recon", "report/templates"),
@@ -44,16 +72,53 @@ class ReportGenerator:
             text, self.repo_url
         )
 
+    def _uses_api(self, fork: ForkInfo) -> bool:
+        """Whether a fork is analyzed from the GitHub API rather than with git."""
+        return self.github_client is not None and (
+            0 < fork.ahead_commits <= self.api_only_max_ahead
+        )
+
+    async def _changes_from_api(
+        self, fork: ForkInfo
+    ) -> Optional[Tuple[List[CommitInfo], Optional[str]]]:
+        """A small fork's commits and first-file diff from the GitHub API alone.
+
+        Returns None if the fork should be fetched with git instead.
+        """
+        if not self._uses_api(fork):
+            return None
+        try:
+            raw_commits, diffs = await self.github_client.async_get_fork_changes(
+                fork, self._api_transport
+            )
+        except Exception as e:
+            logger.warning(
+                f"Failed to get changes for {fork.repo_info.owner}/{fork.repo_info.name}:"
+                f"{fork.branch} from the GitHub API, fetching with git instead: {e}"
+            )
+            return None
+        commits = [CommitInfo.from_github(c) for c in raw_commits]
+        diff = None
+        if commits and len(commits[0].files_changed) > 0:
+            diff = diffs.get(commits[0].files_changed[0])
+        return commits, diff
+
     async def _analyze_fork(
         self, fork: ForkInfo, git_repo: GitRepo
     ) -> Optional[Dict[str, Any]]:
         """Analyze a single fork asynchronously."""
         try:
-            commits = git_repo.get_fork_commits(fork)
-
-            diff = None
-            if commits and len(commits[0].files_changed) > 0:
-                diff = git_repo.get_file_diff(fork, commits[0].files_changed[0])
+            changes = await self._changes_from_api(fork)
+            if changes is not None:
+                self.sources["from the GitHub API"] += 1
+                commits, diff = changes
+            else:
+                self.sources["fetched with git"] += 1
+                commits = git_repo.get_fork_commits(fork)
+
+                diff = None
+                if commits and len(commits[0].files_changed) > 0:
+                    diff = git_repo.get_file_diff(fork, commits[0].files_changed[0])
 
             summary = await self.llm_client.async_summarize_changes(commits, diff)
             if not summary:
@@ -65,17 +130,6 @@ class ReportGenerator:
             logger.error(f"Error analyzing fork {fork.repo_info.name}: {e}")
             return None
 
-    async def _analyze_fork_batch(
-        self, forks: List[ForkInfo], git_repo: GitRepo
-    ) -> List[Dict[str, Any]]:
-        """Analyze a batch of forks in parallel."""
-        tasks = []
-        for fork in forks:
-            tasks.append(self._analyze_fork(fork, git_repo))
-
-        results = await asyncio.gather(*tasks)
-        return [r for r in results if r is not None]
-
     async def _generate_interesting_forks_summary(
         self, analyses: List[Dict[str, Any]]
     ) -> str:
@@ -109,12 +163,43 @@ class ReportGenerator:
         # Construct GitHub repository URL and store it for the filter
         self.repo_url = f"https://github.com/{repo_info.owner}/{repo_info.name}"
 
-        # Process forks in batches
-        fork_analyses = []
-        for i in range(0, len(forks), self.llm_client.max_parallel):
-            batch = forks[i : i + self.llm_client.max_parallel]
-            batch_results = await self._analyze_fork_batch(batch, git_repo)
-            fork_analyses.extend(batch_results)
+        # Fetch the forks analyzed with git up front and concurrently, rather
+        # than one at a time as each analysis gets to them
+        await asyncio.to_thread(
+            git_repo.fetch_forks,
+            [fork for fork in forks if not self._uses_api(fork)],
+        )
+
+        # Analyze forks with max_parallel in flight, then restore the original
+        # (most significant first) order
+        self.sources = Counter()
+        results = {}
+        # One transport for all the API-only analyses, so they share a
+        # connection pool and back off together on secondary rate limits
+        async with (
+            self.github_client.open_transport()
+            if self.github_client is not None
+            else contextlib.nullcontext()
+        ) as transport:
+            self._api_transport = transport
+            try:
+                async for (i, _), analysis in bounded_as_completed(
+                    list(enumerate(forks)),
+                    lambda item: self._analyze_fork(item[1], git_repo),
+                    self.llm_client.max_parallel,
+                    describe=lambda item: f"{item[1].repo_info.owner}/{item[1].repo_info.name}:{item[1].branch}",
+                    unit="fork analyses",
+                ):
+                    if analysis is not None:
+                        results[i] = analysis
+            finally:
+                self._api_transport = None
+        fork_analyses = [results[i] for i in sorted(results)]
+        if self.sources:
+            logger.info(
+                "Analyzed forks: "
+                + ", ".join(f"{count} {how}" for how, count in self.sources.most_common())
+            )
 
         # If no forks to analyze, set a fixed summary
         if not fork_analyses:
@@ -95,6 +95,9 @@ def main(
     if config.server_allowed_models:
         console.print(f"Allowed models: {', '.join(config.server_allowed_models)}")
 
+    token_count = len({config.github_token, *config.github_tokens})
+    console.print(f"GitHub tokens: {token_count}")
+
     cache_dir = config.server_cache_dir or config.cache_report
     console.print(f"Cache directory: {cache_dir}")
     console.print(f"Max parallel tasks: {config.server_parallel_tasks}")
@@ -0,0 +1,843 @@
+"""Fake GitHub API serving a synthetic fork network, for offline benchmarking.
+
+Serves the REST endpoints and GraphQL queries that fork discovery uses, over a
+deterministic, randomly generated fork network of configurable size, with
+configurable latency, pagination and rate limiting. Point git-fork-recon at it
+with `[github] api_url` (or GITHUB_API_URL), or run `bench` to time discovery
+against an in-process instance:
+
+    git-fork-recon-fake-github serve --forks 3000 --latency-ms 50
+    git-fork-recon-fake-github bench --forks 3000 --latency-ms 50 --parallel 10
+
+With --max-concurrent, requests beyond that many in flight get a secondary
+rate limit 403 with a Retry-After header, as GitHub does for bursts.
+
+Only the parts of the API that git-fork-recon reads are modelled. Cloning
+the fake repositories is not supported, so it is only useful up to the end
+of fork discovery.
+"""
+
+from collections import Counter
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import random
+import sys
+import threading
+import time
+
+import typer
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+
+from git_fork_recon.github.graphql import FORK_ORDER
+
+ForkSort = Enum("ForkSort", {sort: sort for sort in FORK_ORDER}, type=str)
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _sha(*parts: Any) -> str:
+    return hashlib.sha1("/".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def _iso(when: datetime) -> str:
+    return when.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+@dataclass
+class FakeBranch:
+    name: str
+    sha: str
+    ahead_by: int
+    behind_by: int
+    committed_at: datetime
+    pull_request: Optional[int] = None
+
+
+@dataclass
+class FakeRepo:
+    id: int
+    owner: str
+    name: str
+    created_at: datetime
+    pushed_at: datetime
+    stars: int
+    parent: Optional[str] = None
+    branches: List[FakeBranch] = field(default_factory=list)
+    forks: List[str] = field(default_factory=list)
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.owner}/{self.name}"
+
+
+@dataclass
+class FakeNetworkSettings:
+    """Shape of the synthetic fork network and behaviour of the fake API."""
+
+    owner: str = "upstream"
+    name: str = "project"
+    forks: int = 500
+    # Share of forks never pushed to after forking
+    never_pushed: float = 0.6
+    # Share of pushed forks with branches ahead of the parent
+    diverged: float = 0.5
+    max_branches: int = 5
+    # Every Nth fork has sub_forks forks of its own
+    sub_forks_every: int = 20
+    sub_forks: int = 2
+    # Share of diverged branches with a pull request to the parent
+    pull_requests: float = 0.2
+    # Share of non-default branches named like bot or GitHub Pages branches
+    bot_branches: float = 0.3
+    latency_ms: float = 0.0
+    rate_limit: int = 5000
+    rate_limit_window: int = 3600
+    # Requests in flight beyond this get a secondary rate limit (0 = no limit)
+    max_concurrent: int = 0
+    secondary_retry_after: int = 1
+    seed: int = 0
+
+
+class FakeNetwork:
+    """A deterministic synthetic fork network built from FakeNetworkSettings."""
+
+    def __init__(self, settings: FakeNetworkSettings):
+        self.settings = settings
+        rng = random.Random(settings.seed)
+        self.repos: Dict[str, FakeRepo] = {}
+        self.commits: Dict[str, FakeBranch] = {}
+        self.pulls: List[Dict[str, Any]] = []
+
+        self.root = self._add_repo(settings.owner, settings.name, BASE_TIME, BASE_TIME, 1000)
+        self.head = _sha("root", "head")
+        self.root.branches = [
+            FakeBranch("main", self.head, 0, 0, BASE_TIME + timedelta(days=200))
+        ]
+
+        for i in range(settings.forks):
+            fork = self._add_fork(rng, self.root, f"user{i:05d}", i)
+            if settings.sub_forks_every and i % settings.sub_forks_every == 0:
+                for j in range(settings.sub_forks):
+                    self._add_fork(rng, fork, f"user{i:05d}-{j}", i)
+
+    def _add_repo(
+        self, owner: str, name: str, created_at: datetime, pushed_at: datetime, stars: int
+    ) -> FakeRepo:
+        repo = FakeRepo(len(self.repos) + 1, owner, name, created_at, pushed_at, stars)
+        self.repos[repo.full_name.lower()] = repo
+        return repo
+
+    def _add_fork(self, rng: random.Random, parent: FakeRepo, owner: str, i: int) -> FakeRepo:
+        s = self.settings
+        created_at = BASE_TIME + timedelta(minutes=i * 7 + rng.randint(0, 6))
+        pushed = rng.random() >= s.never_pushed
+        pushed_at = created_at + timedelta(days=rng.randint(1, 300)) if pushed else BASE_TIME
+        fork = self._add_repo(owner, parent.name, created_at, pushed_at, rng.randint(0, 20))
+        fork.parent = parent.full_name
+        parent.forks.append(fork.full_name)
+
+        fork.branches = [FakeBranch("main", self.head, 0, 0, BASE_TIME + timedelta(days=200))]
+        if pushed and rng.random() < s.diverged:
+            for b in range(rng.randint(1, s.max_branches)):
+                name = "main" if b == 0 else f"feature-{b}"
+                if b > 0 and rng.random() < s.bot_branches:
+                    name = rng.choice(
+                        [
+                            "gh-pages" if b == 1 else f"dependabot/npm/dep-{b}",
+                            f"dependabot/pip/dep-{b}",
+                            f"renovate/dep-{b}",
+                        ]
+                    )
+                branch = FakeBranch(
+                    name=name,
+                    sha=_sha(owner, b),
+                    ahead_by=rng.randint(1, 60),
+                    behind_by=rng.randint(0, 30),
+                    committed_at=min(pushed_at, created_at + timedelta(days=rng.randint(0, 300))),
+                )
+                if rng.random() < s.pull_requests:
+                    branch.pull_request = len(self.pulls) + 1
+                    self.pulls.append(
+                        {
+                            "number": branch.pull_request,
+                            "html_url": f"https://github.com/{self.root.full_name}/pull/{branch.pull_request}",
+                            "state": "open",
+                            "updated_at": _iso(branch.committed_at),
+                            "head": {"label": f"{owner}:{branch.name}", "sha": branch.sha},
+                        }
+                    )
+                self.commits[branch.sha] = branch
+                if b == 0:
+                    fork.branches[0] = branch
+                else:
+                    fork.branches.append(branch)
+        return fork
+
+    def repo(self, owner: str, name: str) -> Optional[FakeRepo]:
+        return self.repos.get(f"{owner}/{name}".lower())
+
+    def rest_repo(self, repo: FakeRepo, base_url: str) -> Dict[str, Any]:
+        return {
+            "id": repo.id,
+            "name": repo.name,
+            "full_name": repo.full_name,
+            "owner": {"login": repo.owner},
+            "description": None,
+            "default_branch": "main",
+            "clone_url": f"{base_url}/fake-git/{repo.full_name}.git",
+            # As on GitHub, the clone URL is the HTML URL with .git appended
+            "html_url": f"{base_url}/fake-git/{repo.full_name}",
+            "stargazers_count": repo.stars,
+            "watchers_count": repo.stars,
+            "forks_count": len(repo.forks),
+            "fork": repo.parent is not None,
+            "created_at": _iso(repo.created_at),
+            "updated_at": _iso(repo.pushed_at),
+            "pushed_at": _iso(repo.pushed_at),
+            # Forks that carry commits of their own grow
+            "size": 100 + sum(b.ahead_by for b in repo.branches),
+            "open_issues_count": 0,
+        }
+
+    def sorted_forks(self, repo: FakeRepo, sort: str) -> List[FakeRepo]:
+        forks = [self.repos[f.lower()] for f in repo.forks]
+        if sort in ("stargazers", "watchers"):
+            return sorted(forks, key=lambda f: (-f.stars, f.id))
+        if sort == "oldest":
+            return sorted(forks, key=lambda f: f.created_at)
+        if sort == "updated":
+            return sorted(forks, key=lambda f: f.pushed_at, reverse=True)
+        return sorted(forks, key=lambda f: f.created_at, reverse=True)
+
+    def commit(self, sha: str) -> Dict[str, Any]:
+        branch = self.commits.get(sha)
+        date = _iso(branch.committed_at if branch else BASE_TIME + timedelta(days=200))
+        return {
+            "sha": sha,
+            "commit": {
+                "message": f"Synthetic commit {sha[:7]}",
+                "author": {"name": "Fake Author", "email": "fake@example.com", "date": date},
+                "committer": {"name": "Fake Author", "email": "fake@example.com", "date": date},
+            },
+        }
+
+
+class _RateLimiter:
+    """Per-token request quota, reported in X-RateLimit-* headers like GitHub's."""
+
+    def __init__(self, limit: int, window: int):
+        self.limit = limit
+        self.window = window
+        self.used: Dict[Tuple[str, str], int] = {}
+        self.reset: Dict[Tuple[str, str], float] = {}
+
+    def charge(self, token: str, resource: str, cost: int = 1) -> Dict[str, str]:
+        key = (token, resource)
+        now = time.time()
+        if self.reset.get(key, 0) <= now:
+            self.reset[key] = now + self.window
+            self.used[key] = 0
+        self.used[key] = min(self.used[key] + cost, self.limit)
+        return self.headers(token, resource)
+
+    def headers(self, token: str, resource: str) -> Dict[str, str]:
+        key = (token, resource)
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.limit - self.used.get(key, 0)),
+            "X-RateLimit-Reset": str(int(self.reset.get(key, time.time() + self.window))),
+            "X-RateLimit-Resource": resource,
+        }
+
+    def exhausted(self, token: str, resource: str) -> bool:
+        key = (token, resource)
+        return self.reset.get(key, 0) > time.time() and self.used.get(key, 0) >= self.limit
+
+
+def create_fake_github_app(settings: Optional[FakeNetworkSettings] = None) -> FastAPI:
+    """Create an ASGI app serving a fake GitHub API over a synthetic fork network."""
+    settings = settings or FakeNetworkSettings()
+    network = FakeNetwork(settings)
+    limiter = _RateLimiter(settings.rate_limit, settings.rate_limit_window)
+    app = FastAPI(title="Fake GitHub API")
+    app.state.network = network
+    app.state.requests = 0
+    # Requests to the fake git server, which don't count against API quota
+    app.state.git_requests = 0
+    app.state.in_flight = 0
+    app.state.secondary_limited = 0
+    # API requests by path and query string
+    app.state.paths = Counter()
+
+    def base_url(request: Request) -> str:
+        return str(request.base_url).rstrip("/")
+
+    def respond(
+        request: Request,
+        data: Any,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        resource: str = "core",
+        cost: int = 1,
+    ) -> Response:
+        """JSON response with rate-limit headers, an ETag and 304 revalidation."""
+        token = request.headers.get("authorization", "")
+        body = json.dumps(data).encode()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+        headers = dict(headers or {})
+        if status_code == 200 and request.headers.get("if-none-match") == etag:
+            # Like GitHub, conditional hits don't count against the rate limit
+            headers.update(limiter.headers(token, resource))
+            headers["ETag"] = etag
+            return Response(status_code=304, headers=headers)
+        headers.update(limiter.charge(token, resource, cost))
+        if status_code == 200:
+            headers["ETag"] = etag
+        return Response(body, status_code, headers, media_type="application/json")
+
+    def not_found(request: Request) -> Response:
+        return respond(request, {"message": "Not Found"}, 404)
+
+    def paginate(request: Request, items: List[Any], default: int = 30) -> Response:
+        params = dict(request.query_params)
+        per_page = min(int(params.get("per_page", default)), 100)
+        page = max(int(params.get("page", 1)), 1)
+        chunk = items[(page - 1) * per_page : page * per_page]
+        headers = {}
+        if page * per_page < len(items):
+            params["page"] = str(page + 1)
+            next_url = request.url.include_query_params(**params)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return respond(request, chunk, headers=headers)
+
+    @app.middleware("http")
+    async def latency_and_quota(request: Request, call_next):
+        if settings.latency_ms:
+            await asyncio.sleep(settings.latency_ms / 1000)
+        if request.url.path.startswith("/fake-git/"):
+            app.state.git_requests += 1
+            return await call_next(request)
+        app.state.requests += 1
+        query = request.url.query
+        app.state.paths[f"{request.url.path}?{query}" if query else request.url.path] += 1
+        token = request.headers.get("authorization", "")
+        resource = "graphql" if request.url.path == "/graphql" else "core"
+        if limiter.exhausted(token, resource):
+            return Response(
+                json.dumps({"message": "API rate limit exceeded"}),
+                403,
+                limiter.headers(token, resource),
+                media_type="application/json",
+            )
+        if settings.max_concurrent and app.state.in_flight >= settings.max_concurrent:
+            app.state.secondary_limited += 1
+            return Response(
+                json.dumps({"message": "You have exceeded a secondary rate limit."}),
+                403,
+                {
+                    **limiter.headers(token, resource),
+                    "Retry-After": str(settings.secondary_retry_after),
+                },
+                media_type="application/json",
+            )
+        app.state.in_flight += 1
+        try:
+            return await call_next(request)
+        finally:
+            app.state.in_flight -= 1
+
+    @app.get("/rate_limit")
+    async def rate_limit(request: Request) -> Response:
+        token = request.headers.get("authorization", "")
+        core = limiter.headers(token, "core")
+        return Response(
+            json.dumps(
+                {
+                    "resources": {
+                        "core": {
+                            "limit": int(core["X-RateLimit-Limit"]),
+                            "remaining": int(core["X-RateLimit-Remaining"]),
+                            "reset": int(core["X-RateLimit-Reset"]),
+                        }
+                    }
+                }
+            ),
+            headers=core,
+            media_type="application/json",
+        )
+
+    @app.get("/fake-git/{owner}/{repo_git}/info/refs")
+    async def git_info_refs(owner: str, repo_git: str) -> Response:
+        """Ref advertisement of git's smart HTTP protocol (v0), enough for ls-remote."""
+        repo = network.repo(owner, repo_git.removesuffix(".git"))
+        if repo is None:
+            return Response("Repository not found", 404, media_type="text/plain")
+
+        def pkt_line(line: str) -> bytes:
+            data = line.encode()
+            return f"{len(data) + 4:04x}".encode() + data
+
+        body = pkt_line("# service=git-upload-pack\n") + b"0000"
+        for n, branch in enumerate(repo.branches):
+            capabilities = "\0side-band-64k ofs-delta agent=fake-github" if n == 0 else ""
+            body += pkt_line(f"{branch.sha} refs/heads/{branch.name}{capabilities}\n")
+        body += b"0000"
+        return Response(body, media_type="application/x-git-upload-pack-advertisement")
+
+    @app.get("/repos/{owner}/{name}")
+    async def get_repo(request: Request, owner: str, name: str) -> Response:
+        repo = network.repo(owner, name)
+        if repo is None:
+            return not_found(request)
+        return respond(request, network.rest_repo(repo, base_url(request)))
+
+    @app.get("/repos/{owner}/{name}/forks")
+    async def list_forks(request: Request, owner: str, name: str) -> Response:
+        repo = network.repo(owner, name)
+        if repo is None:
+            return not_found(request)
+        sort = request.query_params.get("sort", "newest")
+        forks = [network.rest_repo(f, base_url(request)) for f in network.sorted_forks(repo, sort)]
+        return paginate(request, forks)
+
+    @app.get("/repos/{owner}/{name}/branches")
+    async def list_branches(request: Request, owner: str, name: str) -> Response:
+        repo = network.repo(owner, name)
+        if repo is None:
+            return not_found(request)
+        return paginate(
+            request, [{"name": b.name, "commit": {"sha": b.sha}} for b in repo.branches]
+        )
+
+    @app.get("/repos/{owner}/{name}/branches/{branch:path}")
+    async def get_branch(request: Request, owner: str, name: str, branch: str) -> Response:
+        repo = network.repo(owner, name)
+        match = [b for b in repo.branches if b.name == branch] if repo else []
+        if not match:
+            return not_found(request)
+        return respond(request, {"name": branch, "commit": network.commit(match[0].sha)})
+
+    @app.get("/repos/{owner}/{name}/compare/{spec}")
+    async def compare(request: Request, owner: str, name: str, spec: str) -> Response:
+        _, _, head = spec.partition("...")
+        if network.repo(owner, name) is None or not head:
+            return not_found(request)
+        if head == network.head:
+            ahead_by, behind_by = 0, 0
+        elif head in network.commits:
+            branch = network.commits[head]
+            ahead_by, behind_by = branch.ahead_by, branch.behind_by
+        else:
+            return not_found(request)
+        commits = [network.commit(_sha(head, n)) for n in range(min(ahead_by, 250) - 1)]
+        if ahead_by:
+            commits.append(network.commit(head))
+        return respond(
+            request,
+            {
+                "status": "diverged" if ahead_by and behind_by else "ahead",
+                "ahead_by": ahead_by,
+                "behind_by": behind_by,
+                "total_commits": ahead_by,
+                "commits": commits,
+                "files": [
+                    {"filename": f"src/module_{n}.py", "additions": 3, "deletions": 1,
+                     "changes": 4, "patch": "@@ -1 +1,3 @@\n-x\n+y\n+z\n+w"}
+                    for n in range(min(ahead_by, 5))
+                ],
+            },
+        )
+
+    @app.get("/repos/{owner}/{name}/commits/{sha}")
+    async def get_commit(request: Request, owner: str, name: str, sha: str) -> Response:
+        if network.repo(owner, name) is None:
+            return not_found(request)
+        files = [
+            {"filename": f"src/module_{n}.py", "additions": 3, "deletions": 1,
+             "changes": 4, "patch": "@@ -1 +1,3 @@\n-x\n+y\n+z\n+w"}
+            for n in range(int(sha[0], 16) % 3 + 1)
+        ]
+        stats = {"additions": 3 * len(files), "deletions": len(files), "total": 4 * len(files)}
+        return respond(request, {**network.commit(sha), "stats": stats, "files": files})
+
+    @app.get("/repos/{owner}/{name}/pulls")
+    async def list_pulls(request: Request, owner: str, name: str) -> Response:
+        repo = network.repo(owner, name)
+        if repo is None:
+            return not_found(request)
+        pulls = network.pulls if repo is network.root else []
+        head = request.query_params.get("head")
+        if head:
+            pulls = [p for p in pulls if p["head"]["label"] == head]
+        if request.query_params.get("sort") == "updated":
+            reverse = request.query_params.get("direction", "desc") == "desc"
+            pulls = sorted(pulls, key=lambda p: p["updated_at"], reverse=reverse)
+        return paginate(request, pulls)
+
+    def graphql_refs(repo: FakeRepo, first: int, after: Optional[str], parent: str) -> Dict[str, Any]:
+        start = int(after) if after else 0
+        refs = repo.branches[start : start + first]
+        pulls = {p["number"]: p for p in network.pulls}
+        return {
+            "pageInfo": {
+                "hasNextPage": start + first < len(repo.branches),
+                "endCursor": str(start + len(refs)),
+            },
+            "nodes": [
+                {
+                    "name": b.name,
+                    "target": {"oid": b.sha, "committedDate": _iso(b.committed_at)},
+                    # The fork ref is the base of this comparison, so it is reversed
+                    "compare": {"aheadBy": b.behind_by, "behindBy": b.ahead_by},
+                    "associatedPullRequests": {
+                        "nodes": [
+                            {
+                                "url": pulls[b.pull_request]["html_url"],
+                                "baseRepository": {"nameWithOwner": parent},
+                            }
+                        ]
+                        if b.pull_request
+                        else []
+                    },
+                }
+                for b in refs
+            ],
+        }
+
+    @app.post("/graphql")
+    async def graphql(request: Request) -> Response:
+        # Only the fork discovery queries are understood, told apart by their
+        # variables rather than by parsing the query
+        variables = (await request.json()).get("variables") or {}
+        rate = {"cost": 1, "remaining": settings.rate_limit, "resetAt": _iso(datetime.now(timezone.utc))}
+        parent = network.root.full_name
+
+        if "id" in variables:
+            repo = network.repos.get(variables["id"].lower())
+            node = {"refs": graphql_refs(repo, variables["refsFirst"], variables.get("after"), parent)} if repo else None
+            return respond(request, {"data": {"rateLimit": rate, "node": node}}, resource="graphql")
+
+        repo = network.repo(variables.get("owner", ""), variables.get("name", ""))
+        if repo is None:
+            return respond(request, {"data": {"rateLimit": rate, "repository": None}}, resource="graphql")
+        sort = {
+            ("CREATED_AT", "DESC"): "newest",
+            ("CREATED_AT", "ASC"): "oldest",
+            ("STARGAZERS", "DESC"): "stargazers",
+        }.get((variables.get("orderField"), variables.get("orderDirection")), "updated")
+        forks = network.sorted_forks(repo, sort)
+        start = int(variables["after"]) if variables.get("after") else 0
+        page = forks[start : start + variables["first"]]
+        nodes = [
+            {
+                "id": f.full_name,
+                "name": f.name,
+                "url": f"{base_url(request)}/fake-git/{f.full_name}",
+                "stargazerCount": f.stars,
+                "forkCount": len(f.forks),
+                "description": None,
+                "createdAt": _iso(f.created_at),
+                "pushedAt": _iso(f.pushed_at),
+                "updatedAt": _iso(f.pushed_at),
+                "owner": {"login": f.owner},
+                "defaultBranchRef": {"name": "main"},
+                "refs": graphql_refs(f, variables["refsFirst"], None, parent),
+            }
+            for f in page
+        ]
+        data = {
+            "rateLimit": rate,
+            "repository": {
+                "forks": {
+                    "totalCount": len(forks),
+                    "pageInfo": {
+                        "hasNextPage": start + len(page) < len(forks),
+                        "endCursor": str(start + len(page)),
+                    },
+                    "nodes": nodes,
+                }
+            },
+        }
+        return respond(request, {"data": data}, resource="graphql")
+
+    return app
+
+
+cli = typer.Typer(help="Fake GitHub API serving a synthetic fork network.")
+
+
+def _settings(
+    forks: int,
+    latency_ms: float,
+    rate_limit: int,
+    never_pushed: float,
+    max_concurrent: int,
+    seed: int,
+) -> FakeNetworkSettings:
+    return FakeNetworkSettings(
+        forks=forks,
+        latency_ms=latency_ms,
+        rate_limit=rate_limit,
+        never_pushed=never_pushed,
+        max_concurrent=max_concurrent,
+        seed=seed,
+    )
+
+
+@cli.command()
+def serve(
+    host: str = typer.Option("127.0.0.1", "--host"),
+    port: int = typer.Option(9000, "--port"),
+    forks: int = typer.Option(500, "--forks", help="Number of direct forks"),
+    latency_ms: float = typer.Option(0.0, "--latency-ms", help="Added latency per request"),
+    rate_limit: int = typer.Option(5000, "--rate-limit", help="Requests per token per hour"),
+    never_pushed: float = typer.Option(0.6, "--never-pushed", help="Share of forks never pushed to"),
+    max_concurrent: int = typer.Option(
+        0, "--max-concurrent", help="Requests in flight before secondary rate limits (0 = off)"
+    ),
+    seed: int = typer.Option(0, "--seed"),
+) -> None:
+    """Serve the fake API. Point git-fork-recon at it with GITHUB_API_URL."""
+    import uvicorn
+
+    settings = _settings(forks, latency_ms, rate_limit, never_pushed, max_concurrent, seed)
+    typer.echo(
+        f"Fake GitHub API for {settings.owner}/{settings.name} ({forks} forks) "
+        f"at http://{host}:{port}"
+    )
+    uvicorn.run(create_fake_github_app(settings), host=host, port=port, log_level="warning")
+
+
+@cli.command()
+def bench(
+    forks: int = typer.Option(500, "--forks", help="Number of direct forks"),
+    latency_ms: float = typer.Option(50.0, "--latency-ms", help="Added latency per request"),
+    rate_limit: int = typer.Option(5000, "--rate-limit", help="Requests per token per hour"),
+    never_pushed: float = typer.Option(0.6, "--never-pushed", help="Share of forks never pushed to"),
+    max_concurrent: int = typer.Option(
+        0, "--max-concurrent", help="Requests in flight before secondary rate limits (0 = off)"
+    ),
+    seed: int = typer.Option(0, "--seed"),
+    parallel: int = typer.Option(5, "--parallel", "-p"),
+    max_forks: Optional[int] = typer.Option(None, "--max-forks"),
+    fork_sort: ForkSort = typer.Option(ForkSort.newest, "--fork-sort"),
+    fork_depth: int = typer.Option(1, "--fork-depth"),
+    graphql: bool = typer.Option(False, "--graphql"),
+    all_branches: bool = typer.Option(
+        False, "--all-branches", help="Compare bot and GitHub Pages branches too"
+    ),
+    port: int = typer.Option(9000, "--port"),
+) -> None:
+    """Time fork discovery against an in-process fake API (no caches)."""
+    import uvicorn
+
+    from git_fork_recon.github.api import GithubClient
+    from git_fork_recon.github.branch_filter import BranchFilter
+
+    settings = _settings(forks, latency_ms, rate_limit, never_pushed, max_concurrent, seed)
+    app = create_fake_github_app(settings)
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        client = GithubClient(
+            "fake-token",
+            max_parallel=parallel,
+            use_graphql=graphql,
+            api_url=f"http://127.0.0.1:{port}",
+        )
+        repo_info = client.get_repository(f"{settings.owner}/{settings.name}")
+        requests_before = app.state.requests
+        started = time.monotonic()
+        results = client.get_forks(
+            repo_info,
+            max_forks=max_forks,
+            sort=fork_sort.value,
+            fork_depth=fork_depth,
+            branch_filter=BranchFilter(exclude=()) if all_branches else None,
+        )
+        elapsed = time.monotonic() - started
+    finally:
+        server.should_exit = True
+        thread.join()
+
+    requests = app.state.requests - requests_before
+    typer.echo(
+        f"Discovered {len(results)} diverged fork branches in {elapsed:.2f}s "
+        f"using {requests} requests ({requests / elapsed:.0f} requests/s, "
+        f"{app.state.secondary_limited} secondary rate limited)"
+    )
+
+
+
+def _record_payloads(
+    forks: int, branches: int, commits: int, files: int, seed: int
+) -> Tuple[bytes, bytes]:
+    """JSON for a fork network's branches and commits, as the GitHub API returns them.
+
+    Owners' branch names, authors and file paths repeat across records as they
+    do in real networks, but are separate strings once parsed.
+    """
+    rng = random.Random(seed)
+    authors = [(f"Author {i}", f"author{i}@example.com") for i in range(200)]
+    paths = [f"src/package/module_{i}.py" for i in range(2000)]
+    fork_list = [
+        {
+            "owner": {"login": f"user{i:05d}"},
+            "name": "project",
+            "clone_url": f"https://github.com/user{i:05d}/project.git",
+            "default_branch": "main",
+            "stargazers_count": rng.randint(0, 20),
+            "description": None,
+            "pushed_at": _iso(BASE_TIME + timedelta(days=rng.randint(1, 300))),
+            "branches": [
+                {
+                    "name": "main" if b == 0 else f"feature-{b}",
+                    "sha": _sha(i, b),
+                    "ahead_by": rng.randint(1, 60),
+                    "behind_by": rng.randint(0, 30),
+                    "pull_request_urls": [],
+                }
+                for b in range(branches)
+            ],
+        }
+        for i in range(forks)
+    ]
+    commit_list = []
+    for i in range(commits):
+        name, email = rng.choice(authors)
+        date = _iso(BASE_TIME + timedelta(minutes=i))
+        commit_list.append(
+            {
+                "sha": _sha("commit", i),
+                "commit": {
+                    "message": f"Change {i}",
+                    "author": {"name": name, "email": email, "date": date},
+                    "committer": {"name": name, "email": email, "date": date},
+                },
+                "stats": {"additions": rng.randint(0, 100), "deletions": rng.randint(0, 100)},
+                "files": [{"filename": path} for path in rng.sample(paths, files)],
+            }
+        )
+    return json.dumps(fork_list).encode(), json.dumps(commit_list).encode()
+
+
+def _unslotted(cls: type) -> type:
+    """A plain mutable dataclass with the same fields as `cls`, as the records were
+    before they were slotted and frozen."""
+    return make_dataclass(
+        cls.__name__,
+        [
+            (f.name, f.type) if f.default is MISSING else (f.name, f.type, f.default)
+            for f in fields(cls)
+        ],
+    )
+
+
+def _build_records(fork_json: bytes, commit_json: bytes, compact: bool) -> List[Any]:
+    """Parse the payloads into ForkInfo and CommitInfo records.
+
+    With `compact`, the records are built as git-fork-recon builds them: slotted,
+    frozen, with tuples and interned strings. Otherwise as they used to be.
+    """
+    from git_fork_recon.git.repo import CommitInfo
+    from git_fork_recon.github.api import ForkInfo, RepoInfo
+
+    intern = sys.intern if compact else str
+    sequence: Any = tuple if compact else list
+    repo_cls, fork_cls, commit_cls = (
+        (RepoInfo, ForkInfo, CommitInfo)
+        if compact
+        else (_unslotted(RepoInfo), _unslotted(ForkInfo), _unslotted(CommitInfo))
+    )
+    parent = repo_cls("upstream", "project", "https://github.com/upstream/project.git", "main", 0)
+    records: List[Any] = []
+    for fork in json.loads(fork_json):
+        repo = repo_cls(
+            owner=fork["owner"]["login"],
+            name=intern(fork["name"]),
+            clone_url=fork["clone_url"],
+            default_branch=intern(fork["default_branch"]),
+            stars=fork["stargazers_count"],
+            description=fork["description"],
+        )
+        for branch in fork["branches"]:
+            records.append(
+                fork_cls(
+                    repo_info=repo,
+                    parent_repo=parent,
+                    ahead_commits=branch["ahead_by"],
+                    behind_commits=branch["behind_by"],
+                    has_pull_requests=bool(branch["pull_request_urls"]),
+                    pull_request_urls=sequence(branch["pull_request_urls"]),
+                    last_updated=datetime.fromisoformat(
+                        fork["pushed_at"].replace("Z", "+00:00")
+                    ).isoformat(),
+                    branch=intern(branch["name"]),
+                    head_sha=branch["sha"],
+                    base_sha=None,
+                )
+            )
+    for commit in json.loads(commit_json):
+        if compact:
+            records.append(CommitInfo.from_github(commit))
+            continue
+        author = commit["commit"]["author"]
+        records.append(
+            commit_cls(
+                hash=commit["sha"],
+                message=commit["commit"]["message"].strip(),
+                author=f"{author['name']} <{author['email']}>",
+                date=datetime.fromisoformat(
+                    commit["commit"]["committer"]["date"].replace("Z", "+00:00")
+                ).isoformat(),
+                files_changed=[f["filename"] for f in commit["files"]],
+                insertions=commit["stats"]["additions"],
+                deletions=commit["stats"]["deletions"],
+            )
+        )
+    return records
+
+
+@cli.command("bench-memory")
+def bench_memory(
+    forks: int = typer.Option(2000, "--forks", help="Number of forks"),
+    branches: int = typer.Option(3, "--branches", help="Diverged branches per fork"),
+    commits: int = typer.Option(100_000, "--commits", help="Number of commits"),
+    files: int = typer.Option(8, "--files", help="Files changed per commit"),
+    seed: int = typer.Option(0, "--seed"),
+) -> None:
+    """Measure the memory held by fork and commit records, compared with
+    unslotted, mutable records holding lists and uninterned strings."""
+    import gc
+    import tracemalloc
+
+    fork_json, commit_json = _record_payloads(forks, branches, commits, files, seed)
+    held = {}
+    for label, compact in (("plain dataclasses", False), ("slotted records", True)):
+        gc.collect()
+        tracemalloc.start()
+        records = _build_records(fork_json, commit_json, compact)
+        # Only what the records keep alive counts, not the parsed payloads
+        gc.collect()
+        held[label] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del records
+    typer.echo(f"{forks} forks x {branches} branches, {commits} commits x {files} files:")
+    for label, size in held.items():
+        typer.echo(f"  {label}: {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    cli()
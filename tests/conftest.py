@@ -0,0 +1,38 @@
+import contextlib
+import socket
+import threading
+import time
+
+import pytest
+
+
+@contextlib.contextmanager
+def _serve_fake_github(settings):
+    import uvicorn
+
+    from git_fork_recon_server.fake_github import create_fake_github_app
+
+    app = create_fake_github_app(settings)
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    try:
+        yield app, f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+@pytest.fixture(scope="session")
+def serve_fake_github():
+    """Runs the fake GitHub API for given FakeNetworkSettings in a background
+    thread, as a context manager yielding (app, base_url)."""
+    # The fake API needs the `server` extra
+    pytest.importorskip("uvicorn")
+    pytest.importorskip("fastapi")
+    return _serve_fake_github
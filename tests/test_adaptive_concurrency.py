@@ -0,0 +1,81 @@
+import asyncio
+
+from git_fork_recon.github.ratelimit import AdaptiveConcurrency
+
+
+def test_limits_concurrent_slots():
+    concurrency = AdaptiveConcurrency(maximum=2)
+
+    async def run():
+        await concurrency.acquire()
+        await concurrency.acquire()
+        third = asyncio.ensure_future(concurrency.acquire())
+        await asyncio.sleep(0.01)
+        assert not third.done()
+        await concurrency.release()
+        await asyncio.wait_for(third, 1)
+
+    asyncio.run(run())
+    assert concurrency.in_flight == 2
+
+
+def test_throttling_halves_limit_once_per_pause():
+    concurrency = AdaptiveConcurrency(maximum=8)
+
+    async def run():
+        for _ in range(3):
+            await concurrency.acquire()
+        # Three responses to requests that were in flight together
+        for _ in range(3):
+            await concurrency.release(retry_after=0.05)
+
+    asyncio.run(run())
+    assert concurrency.limit == 4
+    assert concurrency.lowest == 4
+    assert concurrency.throttled == 3
+    assert concurrency.in_flight == 0
+
+
+def test_throttling_respects_minimum():
+    concurrency = AdaptiveConcurrency(maximum=2, minimum=1)
+
+    async def run():
+        for _ in range(3):
+            await concurrency.acquire()
+            await concurrency.release(retry_after=0)
+
+    asyncio.run(run())
+    assert concurrency.limit == 1
+
+
+def test_healthy_responses_recover_up_to_maximum():
+    concurrency = AdaptiveConcurrency(maximum=4)
+
+    async def run():
+        await concurrency.acquire()
+        await concurrency.release(retry_after=0)
+        assert concurrency.limit == 2
+        # Additive increase of 1/limit per response
+        await concurrency.acquire()
+        await concurrency.release()
+        assert concurrency.limit == 2.5
+        for _ in range(20):
+            await concurrency.acquire()
+            await concurrency.release()
+
+    asyncio.run(run())
+    assert concurrency.limit == 4
+
+
+def test_acquire_waits_for_pause():
+    concurrency = AdaptiveConcurrency(maximum=4)
+
+    async def run():
+        await concurrency.acquire()
+        await concurrency.release(retry_after=0.1)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await concurrency.acquire()
+        return loop.time() - start
+
+    assert asyncio.run(run()) >= 0.09
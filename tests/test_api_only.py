@@ -0,0 +1,152 @@
+"""Analyzing small forks from the GitHub API instead of fetching them with git."""
+
+import asyncio
+import inspect
+from dataclasses import replace
+
+import pytest
+
+from git_fork_recon import main
+
+from git_fork_recon.git.repo import CommitInfo
+from git_fork_recon.github.api import GithubClient
+from git_fork_recon.report.generator import DEFAULT_API_ONLY_MAX_AHEAD, ReportGenerator
+
+pytest.importorskip("fastapi")
+
+from git_fork_recon_server.fake_github import FakeNetworkSettings  # noqa: E402
+
+
+class RecordingGitRepo:
+    """Records which forks analysis fell back to git for."""
+
+    def __init__(self):
+        self.fetched = []
+
+    def get_fork_commits(self, fork):
+        self.fetched.append(fork)
+        return []
+
+    def get_file_diff(self, fork, path):
+        return None
+
+
+class CountingLLM:
+    async def async_summarize_changes(self, commits, diff):
+        return f"{len(commits)} commits, diff: {diff is not None}"
+
+
+@pytest.fixture(scope="module")
+def discovered(serve_fake_github):
+    settings = FakeNetworkSettings(forks=60, never_pushed=0, diverged=1, sub_forks_every=0)
+    with serve_fake_github(settings) as (app, base_url):
+        client = GithubClient("fake-token", api_url=base_url, max_parallel=4)
+        forks = client.get_forks(client.get_repository("upstream/project"))
+        yield app, client, forks
+
+
+def _analyze(generator, fork):
+    git_repo = RecordingGitRepo()
+    analysis = asyncio.run(generator._analyze_fork(fork, git_repo))
+    return analysis, git_repo.fetched
+
+
+def test_default_max_ahead_is_shared():
+    generator = ReportGenerator(CountingLLM())
+    assert generator.api_only_max_ahead == DEFAULT_API_ONLY_MAX_AHEAD
+    for entry_point in (main.analyze, main.analyze_forks):
+        default = inspect.signature(entry_point).parameters["api_only_max_ahead"].default
+        assert default == DEFAULT_API_ONLY_MAX_AHEAD
+    # Without a GitHub client everything is fetched with git
+    assert generator.github_client is None
+
+
+@pytest.mark.parametrize("ahead", [1, 2])
+def test_small_fork_analyzed_without_git(discovered, ahead):
+    app, client, forks = discovered
+    fork = next(f for f in forks if f.ahead_commits == ahead)
+    generator = ReportGenerator(CountingLLM(), github_client=client)
+    assert generator._uses_api(fork)
+
+    git_requests = app.state.git_requests
+    analysis, fetched = _analyze(generator, fork)
+
+    assert fetched == []
+    assert app.state.git_requests == git_requests
+    assert generator.sources == {"from the GitHub API": 1}
+    commits = analysis["commits"]
+    assert len(commits) == ahead
+    # Newest first, as git log lists them
+    assert commits[0].hash == fork.head_sha
+    assert all(commit.files_changed for commit in commits)
+    assert analysis["summary"] == f"{ahead} commits, diff: True"
+
+
+def test_large_fork_still_fetched(discovered):
+    _, client, forks = discovered
+    fork = next(f for f in forks if f.ahead_commits > DEFAULT_API_ONLY_MAX_AHEAD)
+    generator = ReportGenerator(CountingLLM(), github_client=client)
+    assert not generator._uses_api(fork)
+
+    _, fetched = _analyze(generator, fork)
+    assert fetched == [fork]
+    assert generator.sources == {"fetched with git": 1}
+
+
+def test_zero_always_fetches(discovered):
+    _, client, forks = discovered
+    fork = next(f for f in forks if f.ahead_commits == 1)
+    generator = ReportGenerator(CountingLLM(), github_client=client, api_only_max_ahead=0)
+    _, fetched = _analyze(generator, fork)
+    assert fetched == [fork]
+
+
+def test_api_failure_falls_back_to_git(discovered):
+    _, client, forks = discovered
+    fork = next(f for f in forks if f.ahead_commits == 1)
+    # A head the API doesn't know
+    missing = replace(fork, head_sha="0" * 40)
+    generator = ReportGenerator(CountingLLM(), github_client=client)
+    _, fetched = _analyze(generator, missing)
+    assert fetched == [missing]
+
+
+def test_commit_info_from_github():
+    commit = CommitInfo.from_github(
+        {
+            "sha": "a" * 40,
+            "commit": {
+                "message": "Fix things\n\nLonger description\n",
+                "author": {"name": "Ada", "email": "ada@example.com", "date": "2024-10-01T00:00:00Z"},
+                "committer": {"name": "Bob", "email": "bob@example.com", "date": "2024-10-02T12:00:00Z"},
+            },
+            "files": [
+                {"filename": "README.md", "additions": 2, "deletions": 1},
+                {"filename": "src/main.py", "additions": 5, "deletions": 0},
+            ],
+        }
+    )
+    assert commit == CommitInfo(
+        hash="a" * 40,
+        message="Fix things\n\nLonger description",
+        author="Ada <ada@example.com>",
+        date="2024-10-02T12:00:00+00:00",
+        files_changed=("README.md", "src/main.py"),
+        # Summed from the files when the payload has no stats
+        insertions=7,
+        deletions=1,
+    )
+
+    # Stats, when present, cover files beyond those listed
+    with_stats = CommitInfo.from_github(
+        {
+            "sha": "b" * 40,
+            "commit": {
+                "message": "x",
+                "author": {"name": "Ada", "email": "ada@example.com", "date": "2024-10-01T00:00:00Z"},
+                "committer": {"name": "Ada", "email": "ada@example.com", "date": "2024-10-01T00:00:00Z"},
+            },
+            "stats": {"additions": 500, "deletions": 20},
+        }
+    )
+    assert (with_stats.files_changed, with_stats.insertions, with_stats.deletions) == ((), 500, 20)
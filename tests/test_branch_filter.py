@@ -0,0 +1,34 @@
+import json
+
+from git_fork_recon.github.branch_filter import DEFAULT_EXCLUDED_BRANCHES, BranchFilter
+
+
+def test_default_excludes_bot_and_site_branches():
+    branch_filter = BranchFilter()
+    assert branch_filter.skip_reason("main") is None
+    assert branch_filter.skip_reason("feature/x") is None
+    assert branch_filter.skip_reason("dependabot/pip/httpx-0.28") == "excluded by name"
+    assert branch_filter.skip_reason("renovate/all") == "excluded by name"
+    assert branch_filter.skip_reason("gh-pages") == "excluded by name"
+    # Globs are anchored and case sensitive
+    assert branch_filter.skip_reason("gh-pages-old") is None
+    assert branch_filter.skip_reason("Dependabot/x") is None
+
+
+def test_include_patterns():
+    branch_filter = BranchFilter(include=("feature/*", "main"))
+    assert branch_filter.skip_reason("main") is None
+    assert branch_filter.skip_reason("feature/x") is None
+    assert branch_filter.skip_reason("bugfix/y") == "not included by name"
+
+
+def test_exclude_wins_over_include():
+    branch_filter = BranchFilter(include=("*",), exclude=("wip/*",))
+    assert branch_filter.skip_reason("wip/x") == "excluded by name"
+    assert branch_filter.skip_reason("gh-pages") is None
+
+
+def test_key_reflects_patterns():
+    assert json.loads(BranchFilter().key) == [[], list(DEFAULT_EXCLUDED_BRANCHES)]
+    assert BranchFilter(include=("a",)).key != BranchFilter().key
+    assert BranchFilter(exclude=()).key != BranchFilter().key
@@ -0,0 +1,36 @@
+import sqlite3
+
+import pytest
+
+from git_fork_recon.github.compare_cache import CompareCache
+
+
+def test_comparisons_persist(tmp_path):
+    path = tmp_path / "cache" / "compare.sqlite"
+    with CompareCache(path) as cache:
+        assert cache.get("base", "head") is None
+        cache.put("base", "head", 3, 1)
+        cache.put("base", "head", 4, 2)
+        assert cache.get("base", "head") == (4, 2)
+        # Direction matters
+        assert cache.get("head", "base") is None
+
+    with CompareCache(path) as cache:
+        assert cache.get("base", "head") == (4, 2)
+
+
+def test_commit_dates_persist(tmp_path):
+    path = tmp_path / "compare.sqlite"
+    with CompareCache(path) as cache:
+        assert cache.get_date("abc") is None
+        cache.put_date("abc", "2024-10-01T12:00:00Z")
+
+    with CompareCache(path) as cache:
+        assert cache.get_date("abc") == "2024-10-01T12:00:00Z"
+
+
+def test_context_manager_closes_connection(tmp_path):
+    with CompareCache(tmp_path / "compare.sqlite") as cache:
+        pass
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.get("base", "head")
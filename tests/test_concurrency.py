@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from git_fork_recon.concurrency import bounded_as_completed
+
+
+def _collect(items, worker, limit):
+    async def run():
+        return [pair async for pair in bounded_as_completed(items, worker, limit)]
+
+    return asyncio.run(run())
+
+
+def test_limits_work_in_flight():
+    running = 0
+    peak = 0
+
+    async def worker(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item * 2
+
+    results = _collect(range(10), worker, limit=3)
+    assert sorted(results) == [(i, i * 2) for i in range(10)]
+    assert peak == 3
+
+
+def test_yields_in_completion_order():
+    async def worker(item):
+        await asyncio.sleep(item / 100)
+        return item
+
+    # The slow first item doesn't hold up the ones started after it
+    results = _collect([8, 1, 2, 3], worker, limit=2)
+    assert [item for item, _ in results] == [1, 2, 3, 8]
+
+
+def test_async_iterable_advanced_only_with_free_slot():
+    produced = []
+    running = 0
+
+    async def source():
+        for i in range(5):
+            produced.append((i, running))
+            yield i
+
+    async def worker(item):
+        nonlocal running
+        running += 1
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    results = _collect(source(), worker, limit=2)
+    assert sorted(item for item, _ in results) == list(range(5))
+    assert all(in_flight < 2 for _, in_flight in produced)
+
+
+def test_zero_limit_still_makes_progress():
+    async def worker(item):
+        return item
+
+    assert _collect([1, 2], worker, limit=0) == [(1, 1), (2, 2)]
+
+
+def test_failure_cancels_remaining_work():
+    cancelled = []
+
+    async def worker(item):
+        if item == 0:
+            raise ValueError("boom")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+
+    async def run():
+        async for _ in bounded_as_completed(range(3), worker, limit=3):
+            pass
+
+    with pytest.raises(ValueError, match="boom"):
+        asyncio.run(run())
+    assert sorted(cancelled) == [1, 2]
@@ -0,0 +1,158 @@
+"""Fork discovery end to end, against the fake GitHub API."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from git_fork_recon.github.api import GithubClient
+from git_fork_recon.github.branch_filter import BranchFilter
+from git_fork_recon.github.compare_cache import CompareCache
+from git_fork_recon.github.fork_store import ForkStateStore
+from git_fork_recon.github.http_cache import HttpCache
+
+pytest.importorskip("fastapi")
+
+from git_fork_recon_server.fake_github import FakeNetworkSettings  # noqa: E402
+
+SETTINGS = FakeNetworkSettings(forks=40, latency_ms=0)
+
+
+@pytest.fixture(scope="module")
+def fake_github(serve_fake_github):
+    with serve_fake_github(SETTINGS) as served:
+        yield served
+
+
+def _expected(app, branch_filter=BranchFilter()):
+    """Diverged branches of direct forks, from the fake network itself."""
+    network = app.state.network
+    expected = set()
+    for full_name in network.root.forks:
+        fork = network.repos[full_name.lower()]
+        for branch in fork.branches:
+            if branch.ahead_by and branch_filter.skip_reason(branch.name) is None:
+                expected.add((fork.full_name, branch.name, branch.ahead_by, branch.behind_by))
+    return expected
+
+
+def _discover(base_url, branch_filter=None, **client_args):
+    client = GithubClient("fake-token", api_url=base_url, max_parallel=4, **client_args)
+    repo_info = client.get_repository(f"{SETTINGS.owner}/{SETTINGS.name}")
+    forks = client.get_forks(repo_info, max_branches_per_fork=None, branch_filter=branch_filter)
+    return {
+        (
+            f"{f.repo_info.owner}/{f.repo_info.name}",
+            f.branch,
+            f.ahead_commits,
+            f.behind_commits,
+        )
+        for f in forks
+    }
+
+
+def test_rest_discovery_finds_diverged_branches(fake_github):
+    app, base_url = fake_github
+    expected = _expected(app)
+    assert expected
+    assert _discover(base_url) == expected
+
+
+def test_graphql_discovery_matches_rest(fake_github):
+    app, base_url = fake_github
+    assert _discover(base_url, use_graphql=True) == _expected(app)
+
+    def fork_infos(**client_args):
+        client = GithubClient("fake-token", api_url=base_url, max_parallel=4, **client_args)
+        return client.get_forks(client.get_repository(f"{SETTINGS.owner}/{SETTINGS.name}"))
+
+    rest, graphql = fork_infos(), fork_infos(use_graphql=True)
+    # Same branches, in the same order, compared against the same parent commit
+    assert graphql == rest
+    assert {f.base_sha for f in graphql} == {app.state.network.head}
+
+
+def test_graphql_discovery_updates_caches(fake_github, tmp_path):
+    app, base_url = fake_github
+    with CompareCache(tmp_path / "compare.sqlite") as compare_cache, ForkStateStore(
+        tmp_path / "forks.sqlite"
+    ) as fork_store:
+        found = _discover(
+            base_url, use_graphql=True, compare_cache=compare_cache, fork_store=fork_store
+        )
+        network = app.state.network
+        for owner, branch, ahead_by, behind_by in found:
+            state = fork_store.get(network.root.full_name, owner)
+            assert state.parent_sha == network.head
+            head_sha = next(sha for name, sha in state.branches if name == branch)
+            assert compare_cache.get(network.head, head_sha) == (ahead_by, behind_by)
+
+        # A REST run can reuse them without comparing anything
+        requests = app.state.requests
+        assert _discover(base_url, compare_cache=compare_cache, fork_store=fork_store) == found
+        assert app.state.requests - requests < 10
+
+
+def test_branch_filter_applies(fake_github):
+    app, base_url = fake_github
+    branch_filter = BranchFilter(exclude=())
+    found = _discover(base_url, branch_filter=branch_filter)
+    assert found == _expected(app, branch_filter)
+    assert found > _expected(app)
+
+
+def test_repeat_discovery_revalidates_from_http_cache(fake_github, tmp_path):
+    _, base_url = fake_github
+    first_cache = HttpCache(tmp_path)
+    first = _discover(base_url, http_cache=first_cache)
+    assert first_cache.stats()["hits"] == 0
+
+    second_cache = HttpCache(tmp_path)
+    assert _discover(base_url, http_cache=second_cache) == first
+    stats = second_cache.stats()
+    assert stats["hits"] > 0
+    assert stats["misses"] == 0
+
+
+def test_graphql_discovery_when_parent_moves(fake_github, tmp_path, monkeypatch):
+    _, base_url = fake_github
+    heads = iter(["a" * 40, "b" * 40])
+
+    async def moving_head(transport, repo_info):
+        return next(heads)
+
+    client = GithubClient("fake-token", api_url=base_url, use_graphql=True)
+    monkeypatch.setattr(client, "_parent_head", moving_head)
+    with ForkStateStore(tmp_path / "forks.sqlite") as fork_store:
+        client.fork_store = fork_store
+        forks = client.get_forks(client.get_repository(f"{SETTINGS.owner}/{SETTINGS.name}"))
+        assert forks
+        # Not tied to either parent commit, and nothing kept for later runs
+        assert {f.base_sha for f in forks} == {None}
+        assert fork_store.get(f"{SETTINGS.owner}/{SETTINGS.name}", forks[0].repo_info.owner) is None
+
+
+def test_inactive_forks_cost_no_requests(fake_github):
+    app, base_url = fake_github
+    network = app.state.network
+    threshold = datetime(2024, 6, 1, tzinfo=timezone.utc)
+    inactive = [
+        network.repos[name.lower()]
+        for name in network.root.forks
+        if network.repos[name.lower()].pushed_at < threshold
+    ]
+    assert inactive
+
+    client = GithubClient("fake-token", api_url=base_url, max_parallel=4)
+    repo_info = client.get_repository(f"{SETTINGS.owner}/{SETTINGS.name}")
+    app.state.paths.clear()
+    forks = client.get_forks(repo_info, max_branches_per_fork=None, activity_threshold=threshold)
+
+    assert {f.repo_info.owner for f in forks}.isdisjoint(f.owner for f in inactive)
+    requested = " ".join(app.state.paths)
+    # Active forks' branches are still listed
+    assert f"/repos/{forks[0].repo_info.owner}/{SETTINGS.name}/branches" in requested
+    for fork in inactive:
+        assert f"/repos/{fork.full_name}/" not in requested
+        for branch in fork.branches:
+            if branch.sha != network.head:
+                assert branch.sha not in requested
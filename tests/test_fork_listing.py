@@ -0,0 +1,157 @@
+"""Which forks discovery lists and visits, counted in requests to the fake GitHub API."""
+
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+from git_fork_recon.github.api import GithubClient, _walk_fork_network
+from git_fork_recon.github.branch_filter import BranchFilter
+
+pytest.importorskip("fastapi")
+
+from git_fork_recon_server.fake_github import FakeNetworkSettings  # noqa: E402
+
+ROOT = "upstream/project"
+
+
+def _client(base_url):
+    return GithubClient("fake-token", api_url=base_url, max_parallel=4)
+
+
+def _pushed(repo):
+    return repo.pushed_at > repo.created_at
+
+
+def _branch_listings(app):
+    """Repositories whose branches were listed, by full name."""
+    return {
+        path.split("?")[0].removeprefix("/repos/").removesuffix("/branches")
+        for path in app.state.paths
+        if path.split("?")[0].endswith("/branches")
+    }
+
+
+def _fork_listings(app):
+    return [path for path in app.state.paths.elements() if "/forks" in path]
+
+
+def test_max_forks_stops_listing_early(serve_fake_github):
+    with serve_fake_github(FakeNetworkSettings(forks=250, sub_forks_every=0)) as (app, base_url):
+        client = _client(base_url)
+        repo_info = client.get_repository(ROOT)
+        app.state.paths.clear()
+        client.get_forks(repo_info, max_forks=5, sort="newest")
+
+        network = app.state.network
+        listed = network.sorted_forks(network.root, "newest")
+        first_pushed = [f.full_name for f in listed if _pushed(f)][:5]
+        # Only the first page of 100 forks is listed
+        assert _fork_listings(app) == [f"/repos/{ROOT}/forks?per_page=100&sort=newest"]
+        # Never pushed forks are passed over without any requests, and don't count
+        assert _branch_listings(app) == set(first_pushed)
+        last = listed.index(network.repos[first_pushed[-1].lower()])
+        assert any(not _pushed(f) for f in listed[:last])
+
+
+def test_updated_sort_lists_every_page(serve_fake_github):
+    with serve_fake_github(FakeNetworkSettings(forks=250, sub_forks_every=0)) as (app, base_url):
+        client = _client(base_url)
+        repo_info = client.get_repository(ROOT)
+        app.state.paths.clear()
+        client.get_forks(repo_info, max_forks=5, sort="updated")
+        assert len(_fork_listings(app)) == 3
+
+
+def test_fork_depth_visits_each_sub_fork_once(serve_fake_github):
+    settings = FakeNetworkSettings(forks=40, sub_forks_every=20, sub_forks=2)
+    with serve_fake_github(settings) as (app, base_url):
+        network = app.state.network
+        with_forks = [
+            name for name in network.root.forks if network.repos[name.lower()].forks
+        ]
+        sub_forks = [
+            network.repos[sub.lower()]
+            for name in with_forks
+            for sub in network.repos[name.lower()].forks
+        ]
+        assert len(with_forks) == 2
+
+        client = _client(base_url)
+        repo_info = client.get_repository(ROOT)
+        app.state.paths.clear()
+        forks = client.get_forks(repo_info, max_branches_per_fork=None, fork_depth=2)
+
+        listings = [path.split("?")[0] for path in _fork_listings(app)]
+        # The root and the forks with forks of their own, once each
+        assert sorted(listings) == sorted(
+            f"/repos/{name}/forks" for name in [ROOT, *with_forks]
+        )
+        listed_branches = _branch_listings(app)
+        for sub_fork in sub_forks:
+            assert (sub_fork.full_name in listed_branches) == _pushed(sub_fork)
+            assert app.state.paths[f"/repos/{sub_fork.full_name}/branches"] <= 1
+        assert {f.repo_info.owner for f in forks} & {f.owner for f in sub_forks}
+
+        # With depth 1, sub-forks aren't visited at all
+        app.state.paths.clear()
+        client.get_forks(repo_info, max_branches_per_fork=None)
+        assert [path.split("?")[0] for path in _fork_listings(app)] == [f"/repos/{ROOT}/forks"]
+
+
+def test_shared_heads_are_compared_and_reported_once(serve_fake_github):
+    settings = FakeNetworkSettings(forks=40, never_pushed=0, diverged=1, sub_forks_every=0)
+    with serve_fake_github(settings) as (app, base_url):
+        network = app.state.network
+        first, second = (network.repos[name.lower()] for name in network.root.forks[:2])
+        # The second fork carries the first fork's branches, eg. as a mirror
+        second.branches = [replace(b) for b in first.branches]
+        shared = [
+            b for b in first.branches if b.ahead_by and BranchFilter().skip_reason(b.name) is None
+        ]
+        assert shared
+
+        client = _client(base_url)
+        repo_info = client.get_repository(ROOT)
+        app.state.paths.clear()
+        forks = client.get_forks(repo_info, max_branches_per_fork=None, sort="newest")
+
+        reported = [(f.repo_info.owner, f.head_sha) for f in forks]
+        for branch in shared:
+            owners = [owner for owner, sha in reported if sha == branch.sha]
+            assert len(owners) == 1 and owners[0] in (first.owner, second.owner)
+            compares = [path for path in app.state.paths.elements() if branch.sha in path]
+            assert len(compares) == 1
+
+
+def test_walk_yields_each_repository_once():
+    # b is a fork of both a and the root, and c's fork points back at a
+    network = {
+        "root": [("a", 1), ("b", 0)],
+        "a": [("b", 0), ("c", 1)],
+        "c": [("a", 1)],
+    }
+    listed = []
+
+    async def list_forks(full_name):
+        listed.append(full_name)
+        for name, fork_count in network.get(full_name, []):
+            yield {"id": name, "full_name": name, "forks_count": fork_count}
+
+    async def walk(max_depth):
+        listed.clear()
+        return [
+            fork["full_name"]
+            async for fork in _walk_fork_network(
+                "root",
+                list_forks,
+                lambda fork: (fork["id"], fork["full_name"], fork["forks_count"]),
+                max_depth,
+            )
+        ]
+
+    assert asyncio.run(walk(1)) == ["a", "b"]
+    assert listed == ["root"]
+    assert asyncio.run(walk(3)) == ["a", "b", "c"]
+    # b has no forks, so is never listed, and nothing is listed twice
+    assert listed == ["root", "a", "c"]
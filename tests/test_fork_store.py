@@ -0,0 +1,47 @@
+import sqlite3
+
+from git_fork_recon.github.fork_store import ForkState, ForkStateStore
+
+
+def _state(**kwargs):
+    fields = dict(
+        pushed_at="2024-10-01T00:00:00Z",
+        parent_sha="p" * 40,
+        branches=[("main", "a" * 40), ("feature", "b" * 40)],
+        ahead=[("feature", 2, 0, "b" * 40)],
+    )
+    fields.update(kwargs)
+    return ForkState(**fields)
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "forks.sqlite"
+    state = _state(branch_filter='[[], ["gh-pages"]]', head_cutoff="2024-01-01T00:00:00Z")
+    with ForkStateStore(path) as store:
+        assert store.get("upstream/project", "someone/project") is None
+        store.put("upstream/project", "someone/project", state)
+
+    with ForkStateStore(path) as store:
+        assert store.get("upstream/project", "someone/project") == state
+        # Keyed by parent as well as fork
+        assert store.get("other/project", "someone/project") is None
+
+
+def test_put_replaces(tmp_path):
+    with ForkStateStore(tmp_path / "forks.sqlite") as store:
+        store.put("upstream/project", "someone/project", _state())
+        store.put("upstream/project", "someone/project", _state(ahead=[]))
+        assert store.get("upstream/project", "someone/project").ahead == []
+
+
+def test_corrupt_row_is_ignored(tmp_path):
+    path = tmp_path / "forks.sqlite"
+    with ForkStateStore(path) as store:
+        store.put("upstream/project", "someone/project", _state())
+    conn = sqlite3.connect(path)
+    conn.execute("UPDATE forks SET branches = 'not json'")
+    conn.commit()
+    conn.close()
+
+    with ForkStateStore(path) as store:
+        assert store.get("upstream/project", "someone/project") is None
@@ -0,0 +1,223 @@
+import json
+import subprocess
+from dataclasses import replace
+from types import SimpleNamespace
+
+import pytest
+from git import GitCommandError
+
+from git_fork_recon.git.repo import FORK_INDEX, FORK_REFS, PULL_REFS, GitRepo
+from git_fork_recon.github.api import ForkInfo, RepoInfo
+
+
+def git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, check=True, capture_output=True, text=True
+    ).stdout.strip()
+
+
+def commit(cwd, message, date):
+    git(cwd, "commit", "--allow-empty", "-m", message, "--date", date)
+    return git(cwd, "rev-parse", "HEAD")
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "test@example.com")
+    monkeypatch.setenv("GIT_COMMITTER_DATE", "2024-01-01T00:00:00Z")
+
+
+@pytest.fixture
+def network(tmp_path, monkeypatch):
+    """An upstream repository, and a fork with two commits of its own."""
+    upstream = tmp_path / "upstream"
+    upstream.mkdir()
+    git(upstream, "init", "-q", "-b", "main")
+    commit(upstream, "first", "2024-01-01T00:00:00Z")
+    base = commit(upstream, "second", "2024-01-02T00:00:00Z")
+
+    fork = tmp_path / "fork"
+    git(tmp_path, "clone", "-q", str(upstream), str(fork))
+    git(fork, "checkout", "-q", "-b", "feature")
+    commit(fork, "fork work", "2024-02-01T00:00:00Z")
+    monkeypatch.setenv("GIT_COMMITTER_DATE", "2024-02-02T00:00:00Z")
+    head = commit(fork, "more fork work", "2024-02-02T00:00:00Z")
+
+    # A file:// URL, so cloning copies only what a real remote would send
+    repo_info = RepoInfo(
+        owner="upstream",
+        name="project",
+        clone_url=upstream.as_uri(),
+        default_branch="main",
+        stars=0,
+    )
+    config = SimpleNamespace(cache_repo=tmp_path / "cache")
+    return SimpleNamespace(
+        repo_info=repo_info,
+        config=config,
+        upstream=upstream,
+        fork=fork,
+        base=base,
+        head=head,
+    )
+
+
+def test_migrates_fork_remotes_into_fork_refs(network):
+    repo = GitRepo(network.repo_info, network.config)
+    clone = repo.repo_dir
+    # As left behind by versions that added a remote per fork
+    git(clone, "remote", "add", "fork-alice", str(network.fork))
+    git(clone, "fetch", "-q", "fork-alice")
+    assert git(clone, "rev-parse", "refs/remotes/fork-alice/feature") == network.head
+
+    repo = GitRepo(network.repo_info, network.config)
+
+    assert git(clone, "rev-parse", f"{FORK_REFS}/alice/feature") == network.head
+    assert git(clone, "for-each-ref", "refs/remotes/fork-alice/") == ""
+    assert "fork-alice" not in git(clone, "remote").split()
+    assert repo.fork_index == {"alice": str(network.fork)}
+    assert json.loads((clone / ".git" / FORK_INDEX).read_text()) == repo.fork_index
+
+    # Nothing left to migrate the next time
+    assert GitRepo(network.repo_info, network.config).fork_index == repo.fork_index
+
+
+def test_compare_commits_locally(network):
+    repo = GitRepo(network.repo_info, network.config)
+    missing = "0" * 40
+    # The fork's commits aren't in the clone yet
+    assert network.head not in repo.compare_commits(network.base, [network.head])
+
+    git(repo.repo_dir, "fetch", "-q", str(network.fork), f"feature:{FORK_REFS}/alice/feature")
+    result = repo.compare_commits(network.base, [network.head, network.base, missing])
+
+    assert result[network.head] == (2, 0, "2024-02-02T00:00:00+00:00")
+    assert result[network.base][:2] == (0, 0)
+    assert missing not in result
+
+
+def _fork_info(network, **fields):
+    fork_repo = RepoInfo(
+        owner="alice", name="project", clone_url=str(network.fork), default_branch="main", stars=0
+    )
+    fork = ForkInfo(
+        repo_info=fork_repo,
+        parent_repo=network.repo_info,
+        ahead_commits=2,
+        behind_commits=0,
+        has_pull_requests=False,
+        pull_request_urls=(),
+        last_updated="2024-02-02T00:00:00+00:00",
+        branch="feature",
+        head_sha=network.head,
+        base_sha=network.base,
+    )
+    return replace(fork, **fields)
+
+
+def test_fetch_pull_refs_makes_pull_request_heads_local(network):
+    # The fork's branch has a pull request against the parent
+    git(network.upstream, "fetch", "-q", str(network.fork), "feature:refs/pull/7/head")
+
+    repo = GitRepo(network.repo_info, network.config, fetch_pull_refs=True)
+
+    assert git(repo.repo_dir, "rev-parse", f"{PULL_REFS}/7") == network.head
+    assert repo.compare_commits(network.base, [network.head])[network.head][:2] == (2, 0)
+    # Analysis reads the head locally, without fetching the fork
+    fork = _fork_info(network)
+    fork = replace(fork, repo_info=replace(fork.repo_info, clone_url="/nonexistent"))
+    assert [c.message for c in repo.get_fork_commits(fork)] == ["more fork work", "fork work"]
+    assert repo.fork_index == {}
+    assert git(repo.repo_dir, "for-each-ref", FORK_REFS) == ""
+
+
+def test_without_fetch_pull_refs_the_fork_is_fetched(network):
+    git(network.upstream, "fetch", "-q", str(network.fork), "feature:refs/pull/7/head")
+
+    repo = GitRepo(network.repo_info, network.config)
+
+    assert git(repo.repo_dir, "for-each-ref", PULL_REFS) == ""
+    commits = repo.get_fork_commits(_fork_info(network))
+    assert [c.hash for c in commits][0] == network.head
+    assert git(repo.repo_dir, "rev-parse", f"{FORK_REFS}/alice/feature") == network.head
+
+
+@pytest.fixture
+def diverged(network):
+    """The cached clone, with the parent moved on since the fork and a second
+    fork branch, fetched locally: returns (repo, new parent head, fork heads)."""
+    git(network.fork, "checkout", "-q", "-b", "other", "main")
+    other = commit(network.fork, "other work", "2024-02-03T00:00:00Z")
+    repo = GitRepo(network.repo_info, network.config)
+    git(network.upstream, "checkout", "-q", "main")
+    parent = commit(network.upstream, "third", "2024-03-01T00:00:00Z")
+    git(repo.repo_dir, "fetch", "-q", "origin")
+    git(
+        repo.repo_dir,
+        "fetch",
+        "-q",
+        str(network.fork),
+        f"feature:{FORK_REFS}/alice/feature",
+        f"other:{FORK_REFS}/alice/other",
+    )
+    return repo, parent, [network.head, other, network.base]
+
+
+EXPECTED_COUNTS = [(2, 1), (1, 1), (0, 1)]
+
+
+def test_compare_commits_one_head_at_a_time(diverged, monkeypatch):
+    repo, parent, heads = diverged
+    # As on git < 2.41, without %(ahead-behind)
+    monkeypatch.setattr(type(repo.repo.git), "version_info", property(lambda self: (2, 40)))
+    result = repo.compare_commits(parent, heads)
+    assert [result[sha][:2] for sha in heads] == EXPECTED_COUNTS
+
+
+def test_compare_commits_with_for_each_ref(diverged):
+    repo, parent, heads = diverged
+    if repo.repo.git.version_info < (2, 41):
+        pytest.skip("for-each-ref %(ahead-behind) needs git 2.41")
+    result = repo.compare_commits(parent, heads)
+    assert [result[sha][:2] for sha in heads] == EXPECTED_COUNTS
+    assert repo._compare_with_for_each_ref(parent, heads) == dict(zip(heads, EXPECTED_COUNTS))
+    # The temporary refs are removed again
+    assert git(repo.repo_dir, "for-each-ref", "refs/fork-recon/compare") == ""
+
+
+def test_fetch_forks_concurrently(network, tmp_path):
+    forks = []
+    for owner in ("bob", "carol", "dave"):
+        path = tmp_path / owner
+        git(tmp_path, "clone", "-q", network.repo_info.clone_url, str(path))
+        git(path, "checkout", "-q", "-b", f"{owner}-feature")
+        head = commit(path, f"{owner}'s work", "2024-02-01T00:00:00Z")
+        fork = _fork_info(network, head_sha=head, branch=f"{owner}-feature")
+        fork_repo = replace(fork.repo_info, owner=owner, clone_url=path.as_uri())
+        forks.append(replace(fork, repo_info=fork_repo))
+    bad = _fork_info(network)
+    bad_repo = replace(bad.repo_info, owner="eve", clone_url=(tmp_path / "gone").as_uri())
+    bad = replace(bad, repo_info=bad_repo)
+
+    repo = GitRepo(network.repo_info, network.config)
+    results = repo.fetch_forks([*forks, bad], max_workers=4, per_host=2)
+
+    assert set(results) == {"bob", "carol", "dave", "eve"}
+    for fork in forks:
+        owner = fork.repo_info.owner
+        assert results[owner].error is None
+        ref = f"{FORK_REFS}/{owner}/{fork.branch}"
+        assert git(repo.repo_dir, "rev-parse", ref) == fork.head_sha
+        assert repo.fork_index[owner] == fork.repo_info.clone_url
+    # The failure is recorded rather than raised, and not retried this run
+    assert results["eve"].error
+    assert repo.fetch_errors == {"eve": results["eve"].error}
+    assert "eve" not in repo.fork_index
+    assert repo.fetch_forks([bad]) == {}
+    with pytest.raises(GitCommandError):
+        repo.get_fork_commits(bad)
+
+    # Forks already fetched aren't fetched again
+    assert repo.fetch_forks(forks) == {}
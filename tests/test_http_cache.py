@@ -0,0 +1,69 @@
+import os
+
+from git_fork_recon.github.http_cache import HttpCache
+
+URL = "https://api.github.com/repos/owner/repo"
+
+
+def test_round_trip_and_conditional_headers(tmp_path):
+    cache = HttpCache(tmp_path)
+    assert cache.get(URL) is None
+
+    cache.put(URL, b'{"id": 1}', {"etag": 'W/"abc"', "link": "<next>", "x-other": "1"})
+    cached = cache.get(URL)
+    assert cached.body == b'{"id": 1}'
+    assert cached.headers == {"etag": 'W/"abc"', "link": "<next>"}
+    assert cache.conditional_headers(cached) == {"If-None-Match": 'W/"abc"'}
+
+    # A second instance sees the same entries
+    assert HttpCache(tmp_path).get(URL).etag == 'W/"abc"'
+
+
+def test_last_modified_validator(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put(URL, b"[]", {"last-modified": "Tue, 01 Oct 2024 00:00:00 GMT"})
+    assert cache.conditional_headers(cache.get(URL)) == {
+        "If-Modified-Since": "Tue, 01 Oct 2024 00:00:00 GMT"
+    }
+
+
+def test_responses_without_validators_are_not_stored(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put(URL, b"[]", {"content-type": "application/json"})
+    assert cache.get(URL) is None
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["size_bytes"] == 0
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put(URL, b"[]", {"etag": '"x"'})
+    cache._path(URL).write_text("{not json")
+    assert cache.get(URL) is None
+
+
+def test_record_hit_counts(tmp_path):
+    cache = HttpCache(tmp_path)
+    cache.put(URL, b"[]", {"etag": '"x"'})
+    cache.record_hit(URL)
+    assert cache.stats()["hits"] == 1
+
+
+def test_evicts_least_recently_used(tmp_path):
+    body = b"x" * 1000
+    cache = HttpCache(tmp_path, max_bytes=3500)
+    urls = [f"{URL}/{i}" for i in range(3)]
+    for i, url in enumerate(urls):
+        cache.put(url, body, {"etag": f'"{i}"'})
+        os.utime(cache._path(url), (1000 + i, 1000 + i))
+    # Using the oldest entry makes the second one the least recently used
+    cache.record_hit(urls[0])
+
+    cache.put(f"{URL}/3", body, {"etag": '"3"'})
+
+    assert cache.get(urls[1]) is None
+    assert cache.get(urls[0]) is not None
+    assert cache.get(f"{URL}/3") is not None
+    stats = cache.stats()
+    assert stats["evictions"] >= 1
+    assert stats["size_bytes"] <= 3500 * 0.9
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+
+from git_fork_recon.github import ratelimit
+from git_fork_recon.github.ratelimit import RateLimitScheduler
+
+
+def _headers(remaining, limit=5000, reset=None, resource=None):
+    headers = {
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-reset": str(reset if reset is not None else time.time() + 3600),
+    }
+    if resource is not None:
+        headers["x-ratelimit-resource"] = resource
+    return headers
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record the delays the scheduler sleeps for, without sleeping."""
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", fake_sleep)
+    return delays
+
+
+def test_resource_for():
+    assert RateLimitScheduler.resource_for("https://api.github.com/graphql") == "graphql"
+    assert RateLimitScheduler.resource_for("https://api.github.com/repos/a/b") == "core"
+
+
+def test_no_pacing_before_any_headers(sleeps):
+    scheduler = RateLimitScheduler()
+    asyncio.run(scheduler.acquire())
+    assert sleeps == []
+    assert scheduler.buckets == {}
+
+
+def test_release_tracks_lowest_remaining_within_window():
+    scheduler = RateLimitScheduler()
+    reset = time.time() + 3600
+    scheduler.release("core", _headers(4000, reset=reset))
+    scheduler.release("core", _headers(3990, reset=reset))
+    # A response that was overtaken by a later one
+    scheduler.release("core", _headers(3995, reset=reset))
+    assert scheduler.buckets["core"].remaining == 3990
+
+    # A new window replaces the counts
+    scheduler.release("core", _headers(4999, reset=reset + 3600))
+    assert scheduler.buckets["core"].remaining == 4999
+
+
+def test_release_uses_resource_header():
+    scheduler = RateLimitScheduler()
+    scheduler.release("core", _headers(100, resource="search"))
+    assert set(scheduler.buckets) == {"search"}
+
+
+def test_full_speed_outside_reserve(sleeps):
+    scheduler = RateLimitScheduler(reserve_fraction=0.1)
+    scheduler.release("core", _headers(4000))
+
+    async def burst():
+        for _ in range(10):
+            await scheduler.acquire()
+
+    asyncio.run(burst())
+    assert sleeps == []
+    assert scheduler.buckets["core"].in_flight == 10
+
+
+def test_paced_evenly_inside_reserve(sleeps):
+    scheduler = RateLimitScheduler(reserve_fraction=0.1)
+    scheduler.release("core", _headers(100, limit=5000, reset=time.time() + 1000))
+
+    async def burst():
+        for _ in range(3):
+            await scheduler.acquire()
+
+    asyncio.run(burst())
+    # About one request per (time to reset / remaining) seconds
+    assert len(sleeps) == 2
+    assert 9 < sleeps[0] < 11
+    assert sleeps[1] > sleeps[0]
+
+
+def test_waits_for_reset_when_exhausted(sleeps):
+    scheduler = RateLimitScheduler()
+    scheduler.release("core", _headers(0, reset=time.time() + 60))
+    asyncio.run(scheduler.acquire())
+    assert len(sleeps) == 1
+    assert 59 < sleeps[0] <= 61
+
+
+def test_cancelled_wait_is_not_counted_in_flight():
+    scheduler = RateLimitScheduler()
+    scheduler.release("core", _headers(0, reset=time.time() + 60))
+
+    async def cancel_while_waiting():
+        task = asyncio.ensure_future(scheduler.acquire())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_waiting())
+    assert scheduler.buckets["core"].in_flight == 0
@@ -0,0 +1,52 @@
+import re
+from dataclasses import FrozenInstanceError
+
+import pytest
+
+from git_fork_recon.git.repo import CommitInfo
+from git_fork_recon.github.api import ForkInfo, RepoInfo
+
+REPO = RepoInfo("owner", "project", "https://github.com/owner/project.git", "main", 3)
+FORK = ForkInfo(
+    repo_info=REPO,
+    parent_repo=REPO,
+    ahead_commits=2,
+    behind_commits=0,
+    has_pull_requests=False,
+    pull_request_urls=(),
+    last_updated="2024-10-01T00:00:00+00:00",
+    branch="main",
+)
+COMMIT = CommitInfo(
+    hash="a" * 40,
+    message="Change",
+    author="Author <author@example.com>",
+    date="2024-10-01T00:00:00+00:00",
+    files_changed=("README.md",),
+    insertions=1,
+    deletions=0,
+)
+
+
+@pytest.mark.parametrize("record", [REPO, FORK, COMMIT], ids=lambda r: type(r).__name__)
+def test_records_are_frozen_and_slotted(record):
+    field = next(iter(record.__dataclass_fields__))
+    with pytest.raises(FrozenInstanceError):
+        setattr(record, field, None)
+    assert not hasattr(record, "__dict__")
+    assert hash(record) == hash(record)
+
+
+def test_memory_benchmark_shows_reduction():
+    pytest.importorskip("fastapi")
+    from typer.testing import CliRunner
+
+    from git_fork_recon_server.fake_github import cli
+
+    result = CliRunner().invoke(
+        cli, ["bench-memory", "--forks", "50", "--commits", "500"], catch_exceptions=False
+    )
+    plain, slotted = (
+        float(size) for size in re.findall(r": ([\d.]+) MB", result.output)
+    )
+    assert slotted < plain
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import pytest
+
+from git_fork_recon.github.tokens import TokenPool, token_label
+
+A = "ghp_aaaaaaaaaaaaaaaaaaaa"
+B = "ghp_bbbbbbbbbbbbbbbbbbbb"
+
+
+def _headers(remaining, reset):
+    return {
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": "5000",
+        "x-ratelimit-reset": str(reset),
+    }
+
+
+def test_tokens_are_deduplicated_and_required():
+    pool = TokenPool([A, "", B, A])
+    assert pool.tokens == [A, B]
+    assert len(pool) == 2
+    with pytest.raises(ValueError):
+        TokenPool(["", ""])
+
+
+def test_token_label_hides_secret():
+    assert token_label(A) == "ghp_…aaaa"
+    assert token_label("short") == "****"
+
+
+def test_picks_token_with_most_quota():
+    pool = TokenPool([A, B])
+    reset = time.time() + 3600
+    pool.release(A, "core", _headers(100, reset))
+    pool.release(B, "core", _headers(3000, reset))
+    assert pool.pick("core") == B
+    # Quota is per resource
+    pool.release(B, "graphql", _headers(10, reset))
+    assert pool.pick("graphql") == A
+
+
+def test_unused_token_assumed_to_have_full_quota():
+    pool = TokenPool([A, B])
+    pool.release(A, "core", _headers(4000, time.time() + 3600))
+    assert pool.pick("core") == B
+
+
+def test_exhausted_pool_picks_earliest_reset():
+    pool = TokenPool([A, B])
+    now = time.time()
+    pool.release(A, "core", _headers(0, now + 600))
+    pool.release(B, "core", _headers(0, now + 60))
+    assert pool.pick("core") == B
+    assert not pool.has_alternative(B, "core")
+
+
+def test_acquire_counts_usage():
+    pool = TokenPool([A])
+    token = asyncio.run(pool.acquire("core"))
+    assert token == A
+    assert pool.usage[A] == 1
+
+
+def test_disabled_tokens_are_skipped():
+    pool = TokenPool([A, B])
+    assert pool.has_alternative(A)
+    pool.disable(B, "bad credentials")
+    assert pool.pick() == A
+    assert not pool.has_alternative(A)
+    pool.disable(A, "bad credentials")
+    with pytest.raises(RuntimeError, match="No usable GitHub tokens"):
+        pool.pick()
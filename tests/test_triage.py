@@ -0,0 +1,66 @@
+from git_fork_recon.github.triage import TriageQueue, triage_score
+
+PARENT = {"size": 1000, "description": "The project"}
+
+
+def _fork(name, **fields):
+    fork = {
+        "full_name": name,
+        "created_at": "2024-01-01T00:00:00Z",
+        "pushed_at": "2023-12-01T00:00:00Z",
+        "size": 1000,
+        "description": "The project",
+        "stargazers_count": 0,
+        "open_issues_count": 0,
+    }
+    fork.update(fields)
+    return fork
+
+
+def test_untouched_fork_scores_zero():
+    assert triage_score(_fork("idle/project"), PARENT) == 0
+    assert triage_score({}, {}) == 0
+
+
+def test_each_signal_raises_score():
+    idle = triage_score(_fork("idle/project"), PARENT)
+    for fields in (
+        {"pushed_at": "2024-03-01T00:00:00Z"},
+        {"size": 1200},
+        {"stargazers_count": 5},
+        {"open_issues_count": 2},
+        {"description": "A different take"},
+    ):
+        assert triage_score(_fork("x/project", **fields), PARENT) > idle, fields
+
+
+def test_longer_activity_scores_higher():
+    short = _fork("a/project", pushed_at="2024-01-10T00:00:00Z")
+    long = _fork("b/project", pushed_at="2024-06-01T00:00:00Z")
+    assert triage_score(long, PARENT) > triage_score(short, PARENT)
+
+
+def test_queue_pops_highest_score_first():
+    queue = TriageQueue(PARENT)
+    queue.push(_fork("idle/project"))
+    queue.push(_fork("active/project", pushed_at="2024-06-01T00:00:00Z", size=1500))
+    queue.push(_fork("starred/project", stargazers_count=3))
+    assert len(queue) == 3
+
+    names = []
+    while queue:
+        score, fork = queue.pop()
+        names.append(fork["full_name"])
+    assert names == ["active/project", "starred/project", "idle/project"]
+    assert score == 0
+
+
+def test_queue_ties_keep_push_order():
+    queue = TriageQueue(PARENT)
+    for name in ("a/project", "b/project", "c/project"):
+        queue.push(_fork(name))
+    assert [queue.pop()[1]["full_name"] for _ in range(3)] == [
+        "a/project",
+        "b/project",
+        "c/project",
+    ]